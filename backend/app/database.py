@@ -1,8 +1,10 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from urllib.parse import quote
 import os
 import logging
+import sqlite3
 
 logger = logging.getLogger(__name__)
 
@@ -13,13 +15,85 @@ SQLALCHEMY_DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
 
 logger.info(f"Database path: {DATABASE_PATH}")
 
+# Pragmas applied to every new SQLite connection. WAL lets readers run while
+# an import is writing; with WAL, synchronous=NORMAL only syncs at checkpoints.
+# A negative cache_size is in KiB. Set a variable to an empty string to keep
+# SQLite's default for that pragma.
+SQLITE_PRAGMAS = {
+    "journal_mode": os.getenv("SQLITE_JOURNAL_MODE", "WAL"),
+    "synchronous": os.getenv("SQLITE_SYNCHRONOUS", "NORMAL"),
+    "mmap_size": os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)),
+    "cache_size": os.getenv("SQLITE_CACHE_SIZE", str(-64 * 1024)),
+    "temp_store": os.getenv("SQLITE_TEMP_STORE", "MEMORY"),
+    "foreign_keys": os.getenv("SQLITE_FOREIGN_KEYS", "ON"),
+    "busy_timeout": os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"),
+}
+
+# Read-only connections leave the persistent journal mode and the write-side
+# checks to the write engine, and refuse writes even if a handler attempts one
+SQLITE_READ_PRAGMAS = {
+    **{name: value for name, value in SQLITE_PRAGMAS.items() if name not in ("journal_mode", "foreign_keys")},
+    "query_only": "ON",
+}
+
+# Connections kept open by the read-only pool used by the GET endpoints
+SQLITE_READ_POOL_SIZE = int(os.getenv("SQLITE_READ_POOL_SIZE", "8"))
+
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas=SQLITE_PRAGMAS):
+    """Run ``PRAGMA name=value`` for every configured pragma on a raw
+    sqlite3 connection."""
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            if value is None or str(value).strip() == "":
+                continue
+            try:
+                cursor.execute(f"PRAGMA {name}={value}")
+            except sqlite3.OperationalError as e:
+                # e.g. journal_mode cannot change while another connection holds a lock
+                logger.warning(f"Could not set PRAGMA {name}={value}: {str(e)}")
+    finally:
+        cursor.close()
+
+
+def configure_sqlite_engine(target_engine, pragmas=SQLITE_PRAGMAS):
+    """Apply ``pragmas`` to every connection ``target_engine`` opens."""
+    @event.listens_for(target_engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        apply_sqlite_pragmas(dbapi_connection, pragmas)
+
+    return target_engine
+
+
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL,
     connect_args={"check_same_thread": False},
     # echo=True  # This will log all SQL statements
 )
+configure_sqlite_engine(engine)
+
+
+def create_read_engine(database_path=DATABASE_PATH, pool_size=SQLITE_READ_POOL_SIZE):
+    """Engine opening ``database_path`` read-only (``mode=ro``) with its own
+    connection pool, so dashboard reads do not queue behind the write pool."""
+    return configure_sqlite_engine(
+        create_engine(
+            f"sqlite:///file:{quote(database_path)}?mode=ro&uri=true",
+            connect_args={"check_same_thread": False},
+            pool_size=pool_size,
+            max_overflow=pool_size,
+        ),
+        SQLITE_READ_PRAGMAS,
+    )
+
+
+read_engine = create_read_engine()
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Nothing is ever flushed or committed through a read session, and objects
+# are not expired when the request's transaction ends
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine)
 
 Base = declarative_base()
 
@@ -28,4 +102,14 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+def get_read_db():
+    """Session for GET endpoints that only read; writes raise
+    ``attempt to write a readonly database``."""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
@@ -2,7 +2,7 @@ from sqlalchemy import inspect
 import logging
 from .database import engine, Base
 from .models.transaction import Transaction
-from .models.statistics import FinancialStatistics, CategoryStatistics
+from .models.statistics import FinancialStatistics, CategoryStatistics, ExpenseTypeStatistics, StatisticsDirtyMonth
 from .models.financial_health import FinancialHealth, FinancialRecommendation
 from .models.financial_projection import ProjectionScenario, ProjectionParameter, ProjectionResult
 from .models.anomaly import TransactionAnomaly, AnomalyPattern, AnomalyRule
@@ -10,6 +10,7 @@ from .models.budget import Budget
 from .services.statistics_service import StatisticsService
 from .services.financial_health_service import FinancialHealthService
 from .services.projection_service import ProjectionService
+from .services.data_version import data_version
 from sqlalchemy.orm import Session
 
 logging.basicConfig(level=logging.INFO)
@@ -24,7 +25,7 @@ def init_database():
     existing_tables = inspector.get_table_names()
     logger.info(f"Existing tables: {existing_tables}")
 
-    tables_to_check = ["transactions", "financial_statistics", "category_statistics", "financial_health", "financial_recommendations", "projection_scenarios", "projection_parameters", "projection_results", "transaction_anomalies", "anomaly_patterns", "anomaly_rules", "budgets"]
+    tables_to_check = ["transactions", "financial_statistics", "category_statistics", "expense_type_statistics", "statistics_dirty_months", "financial_health", "financial_recommendations", "projection_scenarios", "projection_parameters", "projection_results", "transaction_anomalies", "anomaly_patterns", "anomaly_rules", "budgets"]
     missing_tables = [table for table in tables_to_check if table not in existing_tables]
 
     if missing_tables:
@@ -47,6 +48,7 @@ def init_database():
             # Initialize statistics if transactions table already existed
             need_stats_init = False
             need_category_stats_init = False
+            need_expense_type_backfill = False
             need_financial_health_init = False
             need_projection_init = False
             
@@ -55,12 +57,15 @@ def init_database():
                     need_stats_init = True
                 if "category_statistics" in missing_tables:
                     need_category_stats_init = True
+                elif "expense_type_statistics" in missing_tables:
+                    # Category rows exist: only their rollup is new
+                    need_expense_type_backfill = True
                 if "financial_health" in missing_tables:
                     need_financial_health_init = True
                 if "projection_scenarios" in missing_tables:
                     need_projection_init = True
             
-            if need_stats_init or need_category_stats_init or need_financial_health_init or need_projection_init:
+            if need_stats_init or need_category_stats_init or need_expense_type_backfill or need_financial_health_init or need_projection_init:
                 logger.info("Initializing statistics and financial health for existing transactions...")
                 with Session(engine) as db:
                     if need_stats_init:
@@ -69,6 +74,10 @@ def init_database():
                     if need_category_stats_init:
                         logger.info("Initializing category statistics...")
                         StatisticsService.initialize_category_statistics(db)
+                    if need_expense_type_backfill:
+                        logger.info("Backfilling expense type statistics...")
+                        StatisticsService.refresh_expense_type_statistics(db)
+                        db.commit()
                     if need_financial_health_init:
                         logger.info("Initializing financial health scores...")
                         FinancialHealthService.initialize_financial_health(db)
@@ -94,8 +103,8 @@ def reset_database(reset_type: str = "all"):
             Base.metadata.drop_all(bind=engine, tables=[Transaction.__table__])
             Base.metadata.create_all(bind=engine, tables=[Transaction.__table__])
         elif reset_type == "statistics":
-            Base.metadata.drop_all(bind=engine, tables=[FinancialStatistics.__table__, CategoryStatistics.__table__])
-            Base.metadata.create_all(bind=engine, tables=[FinancialStatistics.__table__, CategoryStatistics.__table__])
+            Base.metadata.drop_all(bind=engine, tables=[FinancialStatistics.__table__, CategoryStatistics.__table__, ExpenseTypeStatistics.__table__, StatisticsDirtyMonth.__table__])
+            Base.metadata.create_all(bind=engine, tables=[FinancialStatistics.__table__, CategoryStatistics.__table__, ExpenseTypeStatistics.__table__, StatisticsDirtyMonth.__table__])
         elif reset_type == "financial_health":
             Base.metadata.drop_all(bind=engine, tables=[FinancialHealth.__table__, FinancialRecommendation.__table__])
             Base.metadata.create_all(bind=engine, tables=[FinancialHealth.__table__, FinancialRecommendation.__table__])
@@ -108,7 +117,51 @@ def reset_database(reset_type: str = "all"):
         elif reset_type == "budgets":
             Base.metadata.drop_all(bind=engine, tables=[Budget.__table__])
             Base.metadata.create_all(bind=engine, tables=[Budget.__table__])
+        # DDL bypasses the session events that track writes
+        data_version.bump()
         logger.info("Database reset successfully!")
     except Exception as e:
         logger.error(f"Error resetting database: {str(e)}")
-        raise 
\ No newline at end of file
+        raise 
+
+def optimize_database(full: bool = False, bind=None):
+    """Refresh the query planner statistics and checkpoint the WAL.
+
+    ``PRAGMA optimize`` only re-analyzes tables whose statistics are stale and
+    is cheap enough to run on every shutdown; ``full`` runs a complete
+    ``ANALYZE`` instead, e.g. after a large import or a new index.
+    """
+    bind = bind if bind is not None else engine
+    logger.info("Optimizing database (full analyze)..." if full else "Optimizing database...")
+    try:
+        with bind.connect() as conn:
+            if full:
+                conn.exec_driver_sql("ANALYZE")
+            else:
+                # Bound the rows sampled per index so optimize stays fast on large tables
+                conn.exec_driver_sql("PRAGMA analysis_limit=1000")
+                conn.exec_driver_sql("PRAGMA optimize")
+            conn.commit()
+            journal_mode = conn.exec_driver_sql("PRAGMA journal_mode").scalar()
+            checkpoint = None
+            if journal_mode == "wal":
+                busy, wal_frames, checkpointed = conn.exec_driver_sql("PRAGMA wal_checkpoint(TRUNCATE)").fetchone()
+                checkpoint = {"busy": bool(busy), "wal_frames": wal_frames, "checkpointed_frames": checkpointed}
+        logger.info("Database optimized successfully!")
+        return {"analyzed": "full" if full else "optimize", "journal_mode": journal_mode, "checkpoint": checkpoint}
+    except Exception as e:
+        logger.error(f"Error optimizing database: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Database maintenance")
+    parser.add_argument("command", choices=["init", "optimize"])
+    parser.add_argument("--full", action="store_true", help="run a complete ANALYZE instead of PRAGMA optimize")
+    args = parser.parse_args()
+    if args.command == "init":
+        init_database()
+    else:
+        print(optimize_database(full=args.full))
@@ -0,0 +1,102 @@
+from datetime import date
+from hashlib import sha1
+from typing import Iterable, Optional
+import logging
+
+from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import Request
+from starlette.responses import Response
+
+from .services.data_version import DataVersion, data_version
+from .services.result_cache import ResultCache, statistics_result_cache
+
+logger = logging.getLogger(__name__)
+
+# Read endpoints whose responses only change when the data does
+CACHED_PREFIXES = (
+    "/statistics", "/financial-health", "/projections", "/financial-summary",
+    "/budgets", "/anomalies", "/transactions",
+)
+# Responses that change without a write (queue and cache status), and
+# streamed exports, which must not be buffered
+UNCACHED_PATHS = ("/statistics/refresh-status", "/statistics/cache-stats", "/transactions/export")
+# Headers recomputed for every response served from the cache
+_DROPPED_HEADERS = {"content-length", "etag"}
+
+
+def _normalized_query(request: Request) -> str:
+    return "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+
+
+def make_etag(epoch: str, version: int, day: str, path: str, query: str) -> str:
+    """Strong ETag of the response to ``path?query`` at data ``version`` on ``day``."""
+    digest = sha1(f"{path}?{query}@{day}".encode()).hexdigest()[:16]
+    return f'"{epoch}-{version}-{digest}"'
+
+
+def _matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    candidates = [candidate.strip() for candidate in if_none_match.split(",")]
+    # Weak comparison, as RFC 9110 prescribes for If-None-Match
+    return "*" in candidates or etag in (candidate.removeprefix("W/") for candidate in candidates)
+
+
+class ConditionalGetMiddleware(BaseHTTPMiddleware):
+    """ETag / ``304 Not Modified`` and response memoization for read endpoints.
+
+    Responses are tagged with the data version they were computed at (see
+    ``DataVersion``), the day, since endpoints default their period or month
+    to the current date, and the request's path and query. A poll repeating the
+    tag in ``If-None-Match`` gets an empty 304 while nothing was written; a
+    request without it gets the body computed earlier at the same version,
+    if any, without running the endpoint again.
+    """
+
+    def __init__(
+        self,
+        app,
+        prefixes: Iterable[str] = CACHED_PREFIXES,
+        excluded: Iterable[str] = UNCACHED_PATHS,
+        cache: Optional[ResultCache] = None,
+        version: DataVersion = data_version,
+    ):
+        super().__init__(app)
+        self.prefixes = tuple(prefixes)
+        self.excluded = tuple(excluded)
+        self.version = version
+        # The one response cache of the read endpoints, reported by /statistics/cache-stats
+        self.cache = cache if cache is not None else statistics_result_cache
+
+    def applies_to(self, request: Request) -> bool:
+        path = request.url.path
+        return request.method == "GET" and path.startswith(self.prefixes) and not path.startswith(self.excluded)
+
+    async def dispatch(self, request: Request, call_next):
+        if not self.applies_to(request):
+            return await call_next(request)
+
+        # Read before the endpoint runs: its data is at least this new
+        version = self.version.value
+        path, query = request.url.path, _normalized_query(request)
+        day = date.today().isoformat()
+        etag = make_etag(self.version.epoch, version, day, path, query)
+        headers = {"ETag": etag, "Cache-Control": "no-cache"}
+        if _matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        found, cached = self.cache.get(path, {"query": query, "day": day}, version)
+        if found:
+            body, cached_headers = cached
+            return Response(content=body, headers={**cached_headers, **headers})
+
+        response = await call_next(request)
+        if response.status_code != 200:
+            return response
+
+        body = b"".join([chunk async for chunk in response.body_iterator])
+        kept_headers = {
+            name: value for name, value in response.headers.items() if name.lower() not in _DROPPED_HEADERS
+        }
+        self.cache.put(path, {"query": query, "day": day}, version, (body, kept_headers))
+        return Response(content=body, headers={**kept_headers, **headers})
@@ -1,5 +1,7 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+import threading
 import logging
 
 logging.basicConfig(
@@ -8,16 +10,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-from .database import get_db
-from .database_manager import init_database, reset_database
+from .database import get_db, SessionLocal, DATABASE_PATH
+from .database_manager import init_database, reset_database, optimize_database
 
-# Initialize the database BEFORE importing routers to ensure tables exist
-init_database()
+from .http_cache import ConditionalGetMiddleware
+from .services.data_version import data_version
+from .services.statistics_refresh_queue import statistics_refresh_queue
 
 # Import routers
 from .routers import transactions, statistics, suggestions, financial_health, projections, anomalies, financial_summary, budgets
 
-app = FastAPI(title="MyFinance API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Make sure all tables exist before serving requests
+    init_database()
+    # Cached responses must also go stale when another process writes
+    data_version.watch(DATABASE_PATH)
+    # Rebuild the statistics if the last process stopped before applying
+    # its deferred refresh
+    try:
+        statistics_refresh_queue.recover()
+    except Exception as e:
+        logger.error(f"Error recovering pending statistics changes: {str(e)}")
+    # Load the suggestion model and sync its index without blocking startup;
+    # progress is reported by GET /suggestions/ready
+    threading.Thread(
+        target=suggestions.category_suggestion_service.warm_up,
+        args=(SessionLocal,),
+        name="suggestion-warmup",
+        daemon=True,
+    ).start()
+    yield
+    # Apply edits still waiting for the deferred statistics refresh
+    statistics_refresh_queue.flush()
+    data_version.unwatch()
+    # Keep the query planner statistics current for the next start
+    try:
+        optimize_database()
+    except Exception as e:
+        logger.warning(f"Could not optimize the database on shutdown: {str(e)}")
+
+
+app = FastAPI(title="MyFinance API", lifespan=lifespan)
+
+# ETags, 304s and memoized bodies for the read endpoints; added before CORS so
+# the CORS headers wrap it and are never cached
+app.add_middleware(ConditionalGetMiddleware)
 
 # Configure CORS
 app.add_middleware(
@@ -48,3 +87,11 @@ def debug_reset_database(reset_type: str = "all"):
         return {"message": "Database reset successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+# Refresh the query planner statistics; pass full=true to run a complete ANALYZE
+@app.post("/debug/optimize-database")
+def debug_optimize_database(full: bool = False):
+    try:
+        return optimize_database(full=full)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,40 @@
+"""
+Migration: Add the composite indexes of the transactions and statistics tables.
+Databases created before these indexes were declared on the models only have
+the single-column ones.
+"""
+import logging
+from sqlalchemy import text, inspect
+from ..database import engine
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+# (index name, table, columns); kept in sync with the models' __table_args__
+COMPOSITE_INDEXES = [
+    ("ix_transactions_type_date", "transactions", ("transaction_type", "transaction_date")),
+    ("ix_transactions_expense_category_type_date", "transactions",
+     ("expense_category", "transaction_type", "transaction_date")),
+    ("ix_transactions_counterparty_type_date", "transactions",
+     ("counterparty_account", "transaction_type", "transaction_date")),
+    ("ix_transactions_dedup", "transactions",
+     ("source_bank", "transaction_date", "account_number", "amount", "description")),
+    ("ix_financial_statistics_period_date", "financial_statistics", ("period", "date")),
+    ("ix_category_statistics_period_date_type_name", "category_statistics",
+     ("period", "date", "transaction_type", "category_name")),
+]
+
+
+def migrate_composite_indexes(bind=None):
+    """Create any missing composite index; tables that do not exist yet are skipped."""
+    bind = bind if bind is not None else engine
+    tables = set(inspect(bind).get_table_names())
+
+    with bind.begin() as conn:
+        for name, table, columns in COMPOSITE_INDEXES:
+            if table not in tables:
+                logger.info(f"{table} table does not exist yet, skipping {name}")
+                continue
+            conn.execute(text(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({', '.join(columns)})"))
+
+    logger.info("Migration completed: composite indexes created")
@@ -0,0 +1,44 @@
+"""
+Migration: Create the expense_type_statistics rollup table and backfill it from
+category_statistics. Databases created before the rollup existed only have the
+category rows, which the expense type endpoints used to re-sum per request.
+
+Run directly to rebuild the rollup of an existing database:
+
+    python -m app.migrations.migrate_expense_type_statistics
+"""
+import logging
+from sqlalchemy import inspect
+from sqlalchemy.orm import Session
+from ..database import engine
+from ..models.statistics import ExpenseTypeStatistics
+from ..services.statistics_service import StatisticsService
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def migrate_expense_type_statistics(bind=None, force: bool = False):
+    """Create the rollup table if missing and fill it when it is empty (or
+    always with ``force``); skipped until category_statistics exists."""
+    bind = bind if bind is not None else engine
+    if "category_statistics" not in inspect(bind).get_table_names():
+        logger.info("category_statistics table does not exist yet, skipping migration")
+        return 0
+
+    ExpenseTypeStatistics.__table__.create(bind=bind, checkfirst=True)
+
+    with Session(bind) as db:
+        if not force and db.query(ExpenseTypeStatistics.id).first() is not None:
+            logger.info("expense_type_statistics already populated, skipping backfill")
+            return 0
+        StatisticsService.refresh_expense_type_statistics(db)
+        db.commit()
+        count = db.query(ExpenseTypeStatistics).count()
+
+    logger.info(f"Migration completed: {count} expense type statistics rows backfilled")
+    return count
+
+
+if __name__ == "__main__":
+    migrate_expense_type_statistics(force=True)
@@ -7,6 +7,8 @@ from app.migrations.migrate_expense_type_values import migrate_expense_type_valu
 from app.migrations.migrate_financial_health_unique import migrate_financial_health_unique
 from app.migrations.migrate_anomaly_config import migrate_anomaly_config
 from app.migrations.migrate_budgets import migrate_budgets
+from app.migrations.migrate_composite_indexes import migrate_composite_indexes
+from app.migrations.migrate_expense_type_statistics import migrate_expense_type_statistics
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -22,6 +24,8 @@ def run_migrations():
         # migrate_financial_health_unique()
         migrate_anomaly_config()
         migrate_budgets()
+        migrate_composite_indexes()
+        migrate_expense_type_statistics()
         logger.info("All migrations completed successfully")
     except Exception as e:
         logger.error(f"Migration failed: {str(e)}")
@@ -1,6 +1,6 @@
 from ..database import Base
 from .transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
-from .statistics import FinancialStatistics, CategoryStatistics, StatisticsPeriod
+from .statistics import FinancialStatistics, CategoryStatistics, ExpenseTypeStatistics, StatisticsDirtyMonth, StatisticsPeriod
 from .financial_health import FinancialHealth, FinancialRecommendation
 from .financial_projection import ProjectionScenario, ProjectionParameter, ProjectionResult
 from .anomaly import TransactionAnomaly, AnomalyPattern, AnomalyRule, AnomalyType, AnomalySeverity, AnomalyStatus
@@ -11,6 +11,8 @@ __all__ = [
     'Base',
     'FinancialStatistics',
     'CategoryStatistics',
+    'ExpenseTypeStatistics',
+    'StatisticsDirtyMonth',
     'StatisticsPeriod',
     'Transaction',
     'TransactionType',
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, Float, String, Date, Enum, ForeignKey
+from sqlalchemy import Column, Integer, Float, String, Date, Enum, ForeignKey, Index
 from ..database import Base
 from .transaction import TransactionType, ExpenseCategory, IncomeCategory, ExpenseType
 import enum
@@ -10,6 +10,9 @@ class StatisticsPeriod(enum.Enum):
 
 class FinancialStatistics(Base):
     __tablename__ = "financial_statistics"
+    __table_args__ = (
+        Index('ix_financial_statistics_period_date', 'period', 'date'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     period = Column(Enum(StatisticsPeriod), nullable=False)
@@ -68,6 +71,51 @@ class CategoryStatistics(Base):
     
     # Unique constraint
     __table_args__ = (
+        Index('ix_category_statistics_period_date_type_name', 'period', 'date', 'transaction_type', 'category_name'),
         # unique constraint for category, transaction_type, period, and date
         {'sqlite_autoincrement': True},
-    )
\ No newline at end of file
+    )
+
+
+class ExpenseTypeStatistics(Base):
+    """Expense category statistics summed per expense type (essential or
+    discretionary); kept in sync with ``CategoryStatistics`` by the
+    statistics service."""
+    __tablename__ = "expense_type_statistics"
+    __table_args__ = (
+        Index('ix_expense_type_statistics_period_date_type', 'period', 'date', 'expense_type'),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    period = Column(Enum(StatisticsPeriod), nullable=False)
+    date = Column(Date, nullable=True)  # Null for ALL_TIME
+    expense_type = Column(Enum(ExpenseType), nullable=False)
+
+    # Period-specific metrics
+    period_amount = Column(Float, default=0)
+    period_transaction_count = Column(Integer, default=0)
+    period_percentage = Column(Float, default=0)  # Percentage of the period's expenses
+
+    # Cumulative metrics
+    total_amount = Column(Float, default=0)
+    total_transaction_count = Column(Integer, default=0)
+
+    # Averages
+    average_transaction_amount = Column(Float, default=0)
+
+    # Yearly metrics
+    yearly_amount = Column(Float, default=0)
+    yearly_transaction_count = Column(Integer, default=0)
+
+
+class StatisticsDirtyMonth(Base):
+    """A month whose transactions changed in a committed edit that the
+    statistics tables may not reflect yet; written in the edit's transaction
+    and deleted when the change is applied (see the statistics refresh queue)."""
+    __tablename__ = "statistics_dirty_months"
+    # Ids are never reused: a deleted row means its change is applied
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    id = Column(Integer, primary_key=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Enum
+from sqlalchemy import Column, Integer, String, Float, Date, Enum, Index
 from ..database import Base
 import enum
 
@@ -118,6 +118,18 @@ class IncomeCategory(enum.Enum):
 
 class Transaction(Base):
     __tablename__ = "transactions"
+    # Composite indexes for the hot query shapes; existing databases get them
+    # from migrations/migrate_composite_indexes.py
+    __table_args__ = (
+        # Per-type totals over a date range (statistics, anomaly lookbacks)
+        Index('ix_transactions_type_date', 'transaction_type', 'transaction_date'),
+        # Category spend over a date range (budgets, anomaly category history)
+        Index('ix_transactions_expense_category_type_date', 'expense_category', 'transaction_type', 'transaction_date'),
+        # Merchant history (anomaly frequency and new-merchant checks)
+        Index('ix_transactions_counterparty_type_date', 'counterparty_account', 'transaction_type', 'transaction_date'),
+        # Covers the import dedup fingerprint lookup
+        Index('ix_transactions_dedup', 'source_bank', 'transaction_date', 'account_number', 'amount', 'description'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     account_number = Column(String(50), index=True)
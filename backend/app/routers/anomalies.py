@@ -7,7 +7,7 @@ from dateutil.relativedelta import relativedelta
 import calendar
 import logging
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.anomaly import TransactionAnomaly, AnomalyRule, AnomalyStatus, AnomalySeverity, AnomalyType
 from ..models.transaction import Transaction
 from ..schemas import anomaly as schemas
@@ -59,7 +59,7 @@ def detect_anomalies(
 
 @router.get("/", response_model=schemas.AnomalyPage)
 def get_anomalies(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     page: int = Query(1, gt=0),
     page_size: int = Query(20, gt=0, le=100),
     status: Optional[str] = Query(None),
@@ -155,7 +155,7 @@ def get_anomalies(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/statistics", response_model=schemas.AnomalyStatistics)
-def get_anomaly_statistics(db: Session = Depends(get_db)):
+def get_anomaly_statistics(db: Session = Depends(get_read_db)):
     """Get anomaly detection statistics"""
     try:
         stats = AnomalyDetectionService.get_anomaly_statistics(db)
@@ -191,7 +191,7 @@ def update_anomaly_status(
 @router.get("/{anomaly_id}", response_model=schemas.AnomalyWithTransaction)
 def get_anomaly_detail(
     anomaly_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get detailed information about a specific anomaly"""
     try:
@@ -268,7 +268,7 @@ def delete_anomaly(
 
 # Anomaly Rules endpoints
 @router.get("/rules/", response_model=List[schemas.AnomalyRule])
-def get_anomaly_rules(db: Session = Depends(get_db)):
+def get_anomaly_rules(db: Session = Depends(get_read_db)):
     """Get all anomaly detection rules"""
     try:
         rules = db.query(AnomalyRule).filter(AnomalyRule.is_active == True).all()
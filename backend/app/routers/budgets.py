@@ -4,7 +4,7 @@ from typing import List, Optional
 from datetime import date, datetime
 import logging
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..schemas import budget as schemas
 from ..services.budget_service import (
     BudgetService,
@@ -25,7 +25,7 @@ router = APIRouter(
 
 
 @router.get("/", response_model=List[schemas.Budget])
-def get_budgets(db: Session = Depends(get_db)):
+def get_budgets(db: Session = Depends(get_read_db)):
     """Get all active budgets."""
     try:
         return BudgetService.get_budgets(db)
@@ -52,7 +52,7 @@ def create_budget(data: schemas.BudgetCreate, db: Session = Depends(get_db)):
 @router.get("/progress", response_model=List[schemas.BudgetProgress])
 def get_progress(
     target_date: Optional[str] = Query(None, description="Target date (YYYY-MM-DD)"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get spending progress against each active budget for the target month."""
     try:
@@ -72,7 +72,7 @@ def get_suggestion(
     category: str = Query(..., description="Expense category to suggest a limit for"),
     percentile: float = Query(DEFAULT_SUGGESTION_PERCENTILE, ge=0, le=100),
     months: int = Query(DEFAULT_LOOKBACK_MONTHS, gt=0, le=36),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Suggest a monthly limit based on a percentile of historical monthly spend."""
     try:
@@ -4,7 +4,7 @@ from typing import List, Optional
 from datetime import date, datetime
 import logging
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.transaction import Transaction
 from ..schemas import financial_health as schemas
 from ..services.financial_health_service import FinancialHealthService
@@ -21,7 +21,7 @@ router = APIRouter(
 @router.get("/score", response_model=schemas.FinancialHealth)
 def get_health_score(
     target_date: Optional[str] = Query(None, description="Target date (YYYY-MM-DD)"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get the pre-computed financial health score for a specific date.
@@ -52,7 +52,7 @@ def get_health_score(
 @router.get("/history", response_model=schemas.FinancialHealthHistory)
 def get_health_history(
     months: int = Query(12, gt=0, le=60, description="Number of months of history to retrieve"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get historical financial health scores for the specified number of months.
@@ -67,7 +67,7 @@ def get_health_history(
 @router.get("/recommendations", response_model=List[schemas.Recommendation])
 def get_recommendations(
     active_only: bool = Query(True, description="Only return active (not completed) recommendations"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get personalized financial recommendations.
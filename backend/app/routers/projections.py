@@ -4,7 +4,7 @@ from typing import List, Optional, Dict, Any
 from datetime import date, datetime
 import logging
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.financial_projection import ProjectionScenario, ProjectionParameter, ProjectionResult
 from ..schemas import financial_projection as schemas
 from ..services.projection_service import ProjectionService
@@ -73,7 +73,7 @@ def create_scenario(
 @router.get("/scenarios/{scenario_id}", response_model=schemas.ProjectionScenarioDetail)
 def get_scenario_detail(
     scenario_id: int = Path(..., description="ID of the scenario to retrieve"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get detailed information about a specific scenario including parameters"""
     try:
@@ -191,7 +191,7 @@ def delete_scenario(
 @router.get("/scenarios/{scenario_id}/parameters", response_model=List[schemas.ProjectionParameter])
 def get_scenario_parameters(
     scenario_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get parameters for a specific scenario"""
     try:
@@ -249,7 +249,7 @@ def calculate_projection(
 @router.get("/scenarios/{scenario_id}/results", response_model=schemas.ProjectionTimeseries)
 def get_projection_results(
     scenario_id: int,
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get projection results for a scenario"""
     try:
@@ -1,18 +1,21 @@
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract, case, and_
+from sqlalchemy import func, case, and_
 from typing import List, Dict
+from collections import defaultdict
 import logging
 from datetime import date, datetime, timedelta
-from dateutil.relativedelta import relativedelta
 import calendar
-import numpy as np
 from enum import Enum
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.transaction import Transaction, TransactionType, ExpenseType
-from ..models.statistics import FinancialStatistics, CategoryStatistics, StatisticsPeriod
-from ..services.statistics_service import StatisticsService
+from ..models.statistics import FinancialStatistics, CategoryStatistics, ExpenseTypeStatistics, StatisticsPeriod
+from ..services.statistics_delta_service import StatisticsDeltaService
+from ..services.statistics_query_service import StatisticsQueryService
+from ..services.statistics_refresh_queue import statistics_refresh_queue
+from ..services.period_resolver import PeriodResolver
+from ..services.result_cache import statistics_result_cache
 from ..schemas.statistics import (
     FinancialStatisticsResponse,
     CategoryStatisticsResponse,
@@ -31,9 +34,25 @@ router = APIRouter(
     tags=["statistics"]
 )
 
+def get_statistics_db(
+    response: Response,
+    db: Session = Depends(get_read_db),
+    fresh: bool = Query(False, description="Apply pending edits to the statistics before reading them")
+):
+    """Session for endpoints that read the statistics tables.
+
+    Edits reach those tables through the deferred refresh queue; ``fresh``
+    applies them first, otherwise the response may lag and the
+    ``X-Statistics-Stale`` header tells whether it does.
+    """
+    if fresh:
+        statistics_refresh_queue.flush()
+    response.headers["X-Statistics-Stale"] = "true" if statistics_refresh_queue.status()["stale"] else "false"
+    return db
+
 @router.get("/by-expense-type")
 def get_expense_type_statistics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_statistics_db),
     period: str = Query("monthly", description="Statistics period (monthly, yearly, all_time)"),
     date: str = Query(None, description="Target date in ISO format (YYYY-MM-DD). Required for monthly/yearly periods.")
 ):
@@ -78,8 +97,10 @@ def get_expense_type_statistics(
         elif stat_period == StatisticsPeriod.YEARLY and target_date:
             target_date = datetime(target_date.year, 12, 31).date()
             
-        # Query category statistics from the database
-        query = db.query(CategoryStatistics).filter(
+        # The expense type sums come precomputed from the rollup table; the
+        # category rows only provide the breakdown
+        rollup_query = db.query(ExpenseTypeStatistics).filter(ExpenseTypeStatistics.period == stat_period)
+        category_query = db.query(CategoryStatistics).filter(
             CategoryStatistics.period == stat_period,
             CategoryStatistics.transaction_type == TransactionType.EXPENSE,
             CategoryStatistics.expense_type != None  # Only get records with expense_type
@@ -87,12 +108,12 @@ def get_expense_type_statistics(
         
         # Add date filter if needed
         if target_date and stat_period != StatisticsPeriod.ALL_TIME:
-            query = query.filter(CategoryStatistics.date == target_date)
+            rollup_query = rollup_query.filter(ExpenseTypeStatistics.date == target_date)
+            category_query = category_query.filter(CategoryStatistics.date == target_date)
         
-        # Execute query
-        stats = query.all()
+        rollups = {row.expense_type: row for row in rollup_query.all()}
         
-        if not stats:
+        if not rollups:
             # Return empty results for each expense type
             return [
                 {
@@ -129,66 +150,36 @@ def get_expense_type_statistics(
                 }
             ]
         
-        # Group by expense type
-        essential_stats = [s for s in stats if s.expense_type == ExpenseType.FIXED_ESSENTIAL]
-        discretionary_stats = [s for s in stats if s.expense_type == ExpenseType.GUILT_FREE_DISCRETIONARY]
+        categories = defaultdict(list)
+        for s in category_query.all():
+            categories[s.expense_type].append({
+                "category": s.category_name,
+                "period_amount": float(s.period_amount),
+                "period_transaction_count": s.period_transaction_count,
+                "period_percentage": float(s.period_percentage)
+            })
         
-        # Aggregate results by expense type
         results = []
-        
-        # Process essential expenses
-        if essential_stats:
-            essential_result = {
-                "expense_type": ExpenseType.FIXED_ESSENTIAL.value,
-                "period": stat_period.value,
-                "date": essential_stats[0].date.isoformat() if essential_stats[0].date else None,
-                "period_amount": sum(float(s.period_amount) for s in essential_stats),
-                "period_transaction_count": sum(s.period_transaction_count for s in essential_stats),
-                "period_percentage": sum(float(s.period_percentage) for s in essential_stats),
-                "total_amount": sum(float(s.period_amount) for s in essential_stats),
-                "transaction_count": sum(s.period_transaction_count for s in essential_stats),
-                "total_amount_cumulative": sum(float(s.total_amount) for s in essential_stats),
-                "total_transaction_count": sum(s.total_transaction_count for s in essential_stats),
-                "average_transaction_amount": (sum(float(s.period_amount) for s in essential_stats) / 
-                                             sum(s.period_transaction_count for s in essential_stats)) 
-                                             if sum(s.period_transaction_count for s in essential_stats) > 0 else 0.0,
-                "yearly_amount": sum(float(s.yearly_amount) for s in essential_stats),
-                "yearly_transaction_count": sum(s.yearly_transaction_count for s in essential_stats),
-                "categories": [{
-                    "category": s.category_name,
-                    "period_amount": float(s.period_amount),
-                    "period_transaction_count": s.period_transaction_count,
-                    "period_percentage": float(s.period_percentage)
-                } for s in essential_stats]
-            }
-            results.append(essential_result)
-        
-        # Process discretionary expenses
-        if discretionary_stats:
-            discretionary_result = {
-                "expense_type": ExpenseType.GUILT_FREE_DISCRETIONARY.value,
+        for expense_type in (ExpenseType.FIXED_ESSENTIAL, ExpenseType.GUILT_FREE_DISCRETIONARY):
+            rollup = rollups.get(expense_type)
+            if rollup is None:
+                continue
+            results.append({
+                "expense_type": expense_type.value,
                 "period": stat_period.value,
-                "date": discretionary_stats[0].date.isoformat() if discretionary_stats[0].date else None,
-                "period_amount": sum(float(s.period_amount) for s in discretionary_stats),
-                "period_transaction_count": sum(s.period_transaction_count for s in discretionary_stats),
-                "period_percentage": sum(float(s.period_percentage) for s in discretionary_stats),
-                "total_amount": sum(float(s.period_amount) for s in discretionary_stats),
-                "transaction_count": sum(s.period_transaction_count for s in discretionary_stats),
-                "total_amount_cumulative": sum(float(s.total_amount) for s in discretionary_stats),
-                "total_transaction_count": sum(s.total_transaction_count for s in discretionary_stats),
-                "average_transaction_amount": (sum(float(s.period_amount) for s in discretionary_stats) / 
-                                             sum(s.period_transaction_count for s in discretionary_stats)) 
-                                             if sum(s.period_transaction_count for s in discretionary_stats) > 0 else 0.0,
-                "yearly_amount": sum(float(s.yearly_amount) for s in discretionary_stats),
-                "yearly_transaction_count": sum(s.yearly_transaction_count for s in discretionary_stats),
-                "categories": [{
-                    "category": s.category_name,
-                    "period_amount": float(s.period_amount),
-                    "period_transaction_count": s.period_transaction_count,
-                    "period_percentage": float(s.period_percentage)
-                } for s in discretionary_stats]
-            }
-            results.append(discretionary_result)
+                "date": rollup.date.isoformat() if rollup.date else None,
+                "period_amount": float(rollup.period_amount),
+                "period_transaction_count": rollup.period_transaction_count,
+                "period_percentage": float(rollup.period_percentage),
+                "total_amount": float(rollup.period_amount),
+                "transaction_count": rollup.period_transaction_count,
+                "total_amount_cumulative": float(rollup.total_amount),
+                "total_transaction_count": rollup.total_transaction_count,
+                "average_transaction_amount": float(rollup.average_transaction_amount),
+                "yearly_amount": float(rollup.yearly_amount),
+                "yearly_transaction_count": rollup.yearly_transaction_count,
+                "categories": categories[expense_type]
+            })
         
         return results
     except Exception as e:
@@ -197,7 +188,7 @@ def get_expense_type_statistics(
 
 @router.get("/by-category")
 def get_category_statistics(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_statistics_db),
     period: str = Query("monthly", description="Statistics period (monthly, yearly, all_time)"),
     date: str = Query(None, description="Target date in ISO format (YYYY-MM-DD). Required for monthly/yearly periods.")
 ):
@@ -294,7 +285,7 @@ def get_category_statistics(
         raise HTTPException(status_code=500, detail=str(e))
 
 @router.get("/overview")
-def get_statistics_overview(db: Session = Depends(get_db)):
+def get_statistics_overview(db: Session = Depends(get_statistics_db)):
     try:
         # Get latest transaction date
         latest_transaction = db.query(Transaction).order_by(Transaction.transaction_date.desc()).first()
@@ -397,54 +388,68 @@ def get_statistics_overview(db: Session = Depends(get_db)):
 @router.post("/initialize")
 def initialize_statistics(db: Session = Depends(get_db)):
     try:
-        StatisticsService.initialize_statistics(db)
-        StatisticsService.initialize_category_statistics(db)
+        # Rebuilt under the refresh lock so pending edits are not counted again
+        statistics_refresh_queue.rebuild(db)
         return {"message": "Statistics initialized successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/refresh-status")
+def get_statistics_refresh_status():
+    """Pending edits not yet applied to the statistics tables"""
+    return statistics_refresh_queue.status()
+
+@router.get("/cache-stats")
+def get_statistics_cache_stats():
+    """Hit/miss counters of the response cache of the read endpoints"""
+    return statistics_result_cache.stats()
+
+@router.post("/refresh")
+def refresh_statistics():
+    """Apply pending edits to the statistics tables now"""
+    try:
+        applied = statistics_refresh_queue.flush()
+        return {"applied_changes": applied, **statistics_refresh_queue.status()}
+    except Exception as e:
+        logger.error(f"Error refreshing statistics: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/consistency")
+def check_statistics_consistency(db: Session = Depends(get_read_db)):
+    """Compare the incrementally maintained statistics with a full rebuild"""
+    try:
+        statistics_refresh_queue.flush()
+        return StatisticsDeltaService.check_consistency(db)
+    except Exception as e:
+        logger.error(f"Error checking statistics consistency: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.get("/weekday-distribution")
 def get_weekday_distribution(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     transaction_type: TransactionType = Query(None, description="Filter by transaction type (expense, income, or both)"),
     start_date: str = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: str = Query(None, description="End date (YYYY-MM-DD)")
 ):
     try:
-        # Build base query
-        query = db.query(
-            # Extract weekday (0=Monday, 6=Sunday in PostgreSQL)
-            extract('dow', Transaction.transaction_date).label('weekday'),
-            Transaction.amount,
-            Transaction.transaction_type
-        )
-        
+        start = end = None
         # Apply date filters if provided
         if start_date:
             try:
                 start = datetime.strptime(start_date, "%Y-%m-%d").date()
-                query = query.filter(Transaction.transaction_date >= start)
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid start date format. Use YYYY-MM-DD")
         
         if end_date:
             try:
                 end = datetime.strptime(end_date, "%Y-%m-%d").date()
-                query = query.filter(Transaction.transaction_date <= end)
             except ValueError:
                 raise HTTPException(status_code=400, detail="Invalid end date format. Use YYYY-MM-DD")
         
-        # Apply transaction type filter if provided
-        if transaction_type:
-            if transaction_type == TransactionType.EXPENSE:
-                query = query.filter(Transaction.transaction_type == TransactionType.EXPENSE)
-            elif transaction_type == TransactionType.INCOME:
-                query = query.filter(Transaction.transaction_type == TransactionType.INCOME)
-        
-        # Execute query to get all transactions with weekday
-        transactions = query.all()
+        # Count, total, min, max and median per weekday and type, aggregated in SQL
+        groups = StatisticsQueryService.weekday_distribution(db, transaction_type, start, end)
         
-        if not transactions:
+        if not groups:
             return {
                 "weekdays": [],
                 "message": "No transactions found for the specified criteria"
@@ -454,66 +459,27 @@ def get_weekday_distribution(
         weekday_names = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
         
         # Initialize results structure
-        results = {}
-        for i, day in enumerate(weekday_names):
-            results[day] = {
-                "expense": {
-                    "count": 0,
-                    "total": 0,
-                    "average": 0,
-                    "median": 0,
-                    "min": 0,
-                    "max": 0,
-                    "amounts": []
-                },
-                "income": {
-                    "count": 0,
-                    "total": 0,
-                    "average": 0,
-                    "median": 0,
-                    "min": 0,
-                    "max": 0,
-                    "amounts": []
-                }
+        empty = {"count": 0, "total": 0, "average": 0, "median": 0, "min": 0, "max": 0}
+        results = {day: {"expense": dict(empty), "income": dict(empty)} for day in weekday_names}
+        
+        for group in groups:
+            # Convert SQLite's Sunday=0 to Monday=0 format
+            weekday = weekday_names[(int(group["weekday"]) + 6) % 7]
+            results[weekday][group["kind"]] = {
+                "count": group["count"],
+                "total": round(group["total"], 2),
+                "average": round(group["total"] / group["count"], 2),
+                "median": round(group["median"], 2),
+                "min": round(group["min"], 2),
+                "max": round(group["max"], 2),
             }
         
-        # Group transactions by weekday and type
-        for t in transactions:
-            # Convert PostgreSQL's Sunday=0 to Monday=0 format
-            weekday_idx = (int(t.weekday) + 6) % 7
-            weekday = weekday_names[weekday_idx]
-            
-            # Determine transaction type and amount
-            t_type = "expense" if t.transaction_type == TransactionType.EXPENSE else "income"
-            amount = abs(t.amount)  # Use absolute value for calculations
-            
-            # Add to appropriate category
-            results[weekday][t_type]["count"] += 1
-            results[weekday][t_type]["total"] += amount
-            results[weekday][t_type]["amounts"].append(amount)
-        
-        # Calculate statistics for each weekday and type
-        for day in weekday_names:
-            for t_type in ["expense", "income"]:
-                amounts = results[day][t_type]["amounts"]
-                count = results[day][t_type]["count"]
-                
-                if count > 0:
-                    results[day][t_type]["average"] = round(results[day][t_type]["total"] / count, 2)
-                    results[day][t_type]["median"] = round(float(np.median(amounts)), 2) if amounts else 0
-                    results[day][t_type]["min"] = round(min(amounts), 2) if amounts else 0
-                    results[day][t_type]["max"] = round(max(amounts), 2) if amounts else 0
-                
-                # Remove the raw amounts array from the response
-                del results[day][t_type]["amounts"]
-                
-                # Round total for better display
-                results[day][t_type]["total"] = round(results[day][t_type]["total"], 2)
-        
         return {
             "weekdays": results,
-            "transaction_count": len(transactions)
+            "transaction_count": sum(group["count"] for group in groups)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_weekday_distribution: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -521,59 +487,36 @@ def get_weekday_distribution(
 
 @router.get("/timeseries", response_model=List[FinancialStatisticsResponse])
 def get_statistics_timeseries(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_statistics_db),
     start_date: str = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: str = Query(None, description="End date (YYYY-MM-DD)"),
-    time_period: TimePeriod = Query(None, description="Relative time period (3M, 6M, YTD, 1Y, 2Y, ALL_TIME)")
+    time_period: TimePeriod = Query(None, description="Relative time period (3M, 6M, YTD, 1Y, 2Y, ALL_TIME)"),
+    live: bool = Query(False, description="Compute the series from the transactions instead of the stored statistics")
 ):
     try:
-        # Get the latest transaction date to use as reference for relative time periods
-        latest_transaction = db.query(func.max(Transaction.transaction_date)).scalar()
-        reference_date = latest_transaction if latest_transaction else date.today()
-
-        # Push the reference date the the last day of the month
-        reference_date = reference_date.replace(day=calendar.monthrange(reference_date.year, reference_date.month)[1])
-        
-        end = reference_date
-        # Handle relative time period if provided
-        if time_period and not (start_date or end_date):
-            if time_period == TimePeriod.THREE_MONTHS:
-                start = reference_date - relativedelta(months=3)
-                start = start.replace(day=calendar.monthrange(start.year, start.month)[1]) + timedelta(days=1)
-            elif time_period == TimePeriod.SIX_MONTHS:
-                start = reference_date - relativedelta(months=6)
-                start = start.replace(day=calendar.monthrange(start.year, start.month)[1]) + timedelta(days=1)
-            elif time_period == TimePeriod.YEAR_TO_DATE:
-                start = date(reference_date.year, 1, 1)
-            elif time_period == TimePeriod.ONE_YEAR:
-                start = reference_date - relativedelta(years=1)
-                start = start.replace(day=calendar.monthrange(start.year, start.month)[1]) + timedelta(days=1)
-            elif time_period == TimePeriod.TWO_YEARS:
-                start = reference_date - relativedelta(years=2)
-                start = start.replace(day=calendar.monthrange(start.year, start.month)[1]) + timedelta(days=1)
-            else:
-                start = db.query(Transaction).order_by(Transaction.transaction_date.asc()).first().transaction_date
-        else:
-            # Parse dates
-            try:
-                if start_date:
-                    start = datetime.strptime(start_date, "%Y-%m-%d").date()
-                else: # default to the date of the first transaction
-                    start = db.query(Transaction).order_by(Transaction.transaction_date.asc()).first().transaction_date
-                if end_date:
-                    end = datetime.strptime(end_date, "%Y-%m-%d").date()
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        extent = PeriodResolver.data_extent(db)
+        try:
+            start, end = PeriodResolver.resolve(extent, time_period, start_date, end_date)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        # Default to the first transaction and the end of the latest month
+        start = start or extent.first
+        end = end or extent.reference_date
 
-        if start > end:
+        if start and start > end:
             raise HTTPException(status_code=400, detail="Start date must be before end date")
         
+        if live:
+            # One windowed query over the transactions; never stale
+            return StatisticsQueryService.financial_timeseries(db, start, end)
+
         # Query FinancialStatistics in the date range
         query = db.query(FinancialStatistics).filter(
             FinancialStatistics.period == StatisticsPeriod.MONTHLY,
-            FinancialStatistics.date >= start,
             FinancialStatistics.date <= end
         )
+        if start:
+            query = query.filter(FinancialStatistics.date >= start)
                     
         monthly_stats = query.order_by(FinancialStatistics.date).all()
         
@@ -583,13 +526,15 @@ def get_statistics_timeseries(
                 stat.date = stat.date.isoformat()
                 
         return monthly_stats
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
 @router.get("/category/averages", response_model=CategoryAveragesResponse)
 def get_category_averages(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_statistics_db),
     transaction_type: TransactionType = Query(None, description="Filter by transaction type (expense, income, or both)"),
     start_date: str = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: str = Query(None, description="End date (YYYY-MM-DD)"),
@@ -600,45 +545,14 @@ def get_category_averages(
     Calculates monthly averages for each category between start_date and end_date.
     """
     try:
-        # Get the latest transaction date to use as reference for relative time periods
-        latest_transaction = db.query(func.max(Transaction.transaction_date)).scalar()
-        reference_date = latest_transaction if latest_transaction else date.today()
-
-        # Push the reference date to the last day of the month
-        reference_date = reference_date.replace(day=calendar.monthrange(reference_date.year, reference_date.month)[1])
-        
-        # Handle relative time period if provided
-        if time_period and not (start_date or end_date):
-            end = reference_date
-            if time_period == TimePeriod.THREE_MONTHS:
-                start = reference_date - relativedelta(months=3)
-                start = start.replace(day=calendar.monthrange(start.year, start.month)[1]) + timedelta(days=1)
-            elif time_period == TimePeriod.SIX_MONTHS:
-                start = reference_date - relativedelta(months=6)
-                start = start.replace(day=calendar.monthrange(start.year, start.month)[1]) + timedelta(days=1)
-            elif time_period == TimePeriod.YEAR_TO_DATE:
-                start = date(reference_date.year, 1, 1)
-            elif time_period == TimePeriod.ONE_YEAR:
-                start = reference_date - relativedelta(years=1)
-                start = start.replace(day=calendar.monthrange(start.year, start.month)[1]) + timedelta(days=1)
-            elif time_period == TimePeriod.TWO_YEARS:
-                start = reference_date - relativedelta(years=2)
-                start = start.replace(day=calendar.monthrange(start.year, start.month)[1]) + timedelta(days=1)
-            else: # ALL_TIME
-                start = db.query(Transaction).order_by(Transaction.transaction_date.asc()).first().transaction_date
-        else:
-            # Parse dates
-            try:
-                if start_date:
-                    start = datetime.strptime(start_date, "%Y-%m-%d").date()
-                else: # default to the date of the first transaction
-                    start = db.query(Transaction).order_by(Transaction.transaction_date.asc()).first().transaction_date
-                if end_date:
-                    end = datetime.strptime(end_date, "%Y-%m-%d").date()
-                else: # default to the date of the last transaction
-                    end = db.query(Transaction).order_by(Transaction.transaction_date.desc()).first().transaction_date
-            except ValueError:
-                raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        extent = PeriodResolver.data_extent(db)
+        try:
+            start, end = PeriodResolver.resolve(extent, time_period, start_date, end_date)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        # Default to the dates of the first and the last transaction
+        end = end or extent.last or extent.reference_date
+        start = start or extent.first or end
             
         if start > end:
             raise HTTPException(status_code=400, detail="Start date must be before end date")
@@ -730,7 +644,7 @@ def get_category_averages(
 
 @router.get("/category/timeseries", response_model=List[CategoryStatisticsResponse])
 def get_category_statistics_timeseries(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_statistics_db),
     transaction_type: TransactionType = Query(None, description="Filter by transaction type (expense, income, or both)"),
     category_name: str = Query(None, description="Filter by category name"),
     start_date: str = Query(None, description="Start date (YYYY-MM-DD)"),
@@ -754,46 +668,15 @@ def get_category_statistics_timeseries(
         if category_name:
             query = query.filter(CategoryStatistics.category_name == category_name)
             
-        # Get the latest transaction date to use as reference for relative time periods
-        latest_transaction = db.query(func.max(Transaction.transaction_date)).scalar()
-        reference_date = latest_transaction if latest_transaction else date.today()
-
-        # Push the reference date to the last day of the month
-        reference_date = reference_date.replace(day=calendar.monthrange(reference_date.year, reference_date.month)[1])
-        
-        # Handle relative time period if provided
-        if time_period and not (start_date or end_date):
-            if time_period == TimePeriod.THREE_MONTHS:
-                start = reference_date - relativedelta(months=3)
-                query = query.filter(CategoryStatistics.date > start.replace(day=calendar.monthrange(start.year, start.month)[1]))
-            elif time_period == TimePeriod.SIX_MONTHS:
-                start = reference_date - relativedelta(months=6)
-                query = query.filter(CategoryStatistics.date > start.replace(day=calendar.monthrange(start.year, start.month)[1]))
-            elif time_period == TimePeriod.YEAR_TO_DATE:
-                start = date(reference_date.year, 1, 1)
-                query = query.filter(CategoryStatistics.date > start)
-            elif time_period == TimePeriod.ONE_YEAR:
-                start = reference_date - relativedelta(years=1)
-                query = query.filter(CategoryStatistics.date > start.replace(day=calendar.monthrange(start.year, start.month)[1]))
-            elif time_period == TimePeriod.TWO_YEARS:
-                start = reference_date - relativedelta(years=2)
-                query = query.filter(CategoryStatistics.date > start.replace(day=calendar.monthrange(start.year, start.month)[1]))
-            # ALL_TIME doesn't need filtering
-        else:
-            # Apply explicit date filters if provided
-            if start_date:
-                try:
-                    start = datetime.strptime(start_date, "%Y-%m-%d").date()
-                    query = query.filter(CategoryStatistics.date >= start)
-                except Exception:
-                    pass
-                    
-            if end_date:
-                try:
-                    end = datetime.strptime(end_date, "%Y-%m-%d").date()
-                    query = query.filter(CategoryStatistics.date <= end)
-                except Exception:
-                    pass
+        extent = PeriodResolver.data_extent(db)
+        try:
+            start, end = PeriodResolver.resolve(extent, time_period, start_date, end_date)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        if start:
+            query = query.filter(CategoryStatistics.date >= start)
+        if end:
+            query = query.filter(CategoryStatistics.date <= end)
                 
         # Get results ordered by date
         monthly_stats = query.order_by(CategoryStatistics.date).all()
@@ -804,6 +687,8 @@ def get_category_statistics_timeseries(
                 stat.date = stat.date.isoformat()
                 
         return monthly_stats
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_category_statistics_timeseries: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -811,7 +696,7 @@ def get_category_statistics_timeseries(
 
 @router.get("/expense-type/timeseries", response_model=ExpenseTypeTimeseriesResponse)
 def get_expense_type_statistics_timeseries(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_statistics_db),
     expense_type: ExpenseType = Query(None, description="Filter by expense type (essential or discretionary)"),
     start_date: str = Query(None, description="Start date (YYYY-MM-DD)"),
     end_date: str = Query(None, description="End date (YYYY-MM-DD)"),
@@ -822,68 +707,26 @@ def get_expense_type_statistics_timeseries(
     Returns monthly expense type statistics within the specified date range.
     """
     try:
-        # Build the base query for expense transactions only
-        query = db.query(
-            CategoryStatistics.date,
-            CategoryStatistics.expense_type,
-            func.sum(CategoryStatistics.period_amount).label("period_amount"),
-            func.sum(CategoryStatistics.period_transaction_count).label("period_transaction_count")
-        ).filter(
-            CategoryStatistics.period == StatisticsPeriod.MONTHLY,
-            CategoryStatistics.transaction_type == TransactionType.EXPENSE,
-            CategoryStatistics.expense_type != None  # Only get records with expense_type
+        # Monthly rows of the expense type rollup
+        query = db.query(ExpenseTypeStatistics).filter(
+            ExpenseTypeStatistics.period == StatisticsPeriod.MONTHLY
         )
         
         # Apply expense type filter if provided
         if expense_type:
-            query = query.filter(CategoryStatistics.expense_type == expense_type)
+            query = query.filter(ExpenseTypeStatistics.expense_type == expense_type)
             
-        # Get the latest transaction date to use as reference for relative time periods
-        latest_transaction = db.query(func.max(Transaction.transaction_date)).scalar()
-        reference_date = latest_transaction if latest_transaction else date.today()
-
-        # Push the reference date to the last day of the month
-        reference_date = reference_date.replace(day=calendar.monthrange(reference_date.year, reference_date.month)[1])
-        
-        # Handle relative time period if provided
-        if time_period and not (start_date or end_date):
-            if time_period == TimePeriod.THREE_MONTHS:
-                start = reference_date - relativedelta(months=3)
-                query = query.filter(CategoryStatistics.date > start.replace(day=calendar.monthrange(start.year, start.month)[1]))
-            elif time_period == TimePeriod.SIX_MONTHS:
-                start = reference_date - relativedelta(months=6)
-                query = query.filter(CategoryStatistics.date > start.replace(day=calendar.monthrange(start.year, start.month)[1]))
-            elif time_period == TimePeriod.YEAR_TO_DATE:
-                start = date(reference_date.year, 1, 1)
-                query = query.filter(CategoryStatistics.date > start)
-            elif time_period == TimePeriod.ONE_YEAR:
-                start = reference_date - relativedelta(years=1)
-                query = query.filter(CategoryStatistics.date > start.replace(day=calendar.monthrange(start.year, start.month)[1]))
-            elif time_period == TimePeriod.TWO_YEARS:
-                start = reference_date - relativedelta(years=2)
-                query = query.filter(CategoryStatistics.date > start.replace(day=calendar.monthrange(start.year, start.month)[1]))
-            # ALL_TIME doesn't need filtering
-        else:
-            # Apply explicit date filters if provided
-            if start_date:
-                try:
-                    start = datetime.strptime(start_date, "%Y-%m-%d").date()
-                    query = query.filter(CategoryStatistics.date >= start)
-                except Exception:
-                    pass
-                    
-            if end_date:
-                try:
-                    end = datetime.strptime(end_date, "%Y-%m-%d").date()
-                    query = query.filter(CategoryStatistics.date <= end)
-                except Exception:
-                    pass
+        extent = PeriodResolver.data_extent(db)
+        try:
+            start, end = PeriodResolver.resolve(extent, time_period, start_date, end_date)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid date format. Use YYYY-MM-DD")
+        if start:
+            query = query.filter(ExpenseTypeStatistics.date >= start)
+        if end:
+            query = query.filter(ExpenseTypeStatistics.date <= end)
                 
-        # Group by date and expense type, then order by date
-        monthly_stats = query.group_by(
-            CategoryStatistics.date,
-            CategoryStatistics.expense_type
-        ).order_by(CategoryStatistics.date).all()
+        monthly_stats = query.order_by(ExpenseTypeStatistics.date, ExpenseTypeStatistics.expense_type).all()
         
         # Convert to a list of ExpenseTypeTimeseriesItem objects
         result = [
@@ -898,6 +741,8 @@ def get_expense_type_statistics_timeseries(
         
         # Return wrapped in the response model
         return ExpenseTypeTimeseriesResponse(root=result)
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error in get_expense_type_statistics_timeseries: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
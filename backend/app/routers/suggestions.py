@@ -1,4 +1,5 @@
 from fastapi import APIRouter, Depends, HTTPException, Body
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 import logging
 from pydantic import BaseModel
@@ -16,13 +17,10 @@ router = APIRouter(
     tags=["suggestions"]
 )
 
-# Initialize the service
+# Initialize the service; the model is loaded and the index synced by the
+# background warm-up started in main.py (or lazily on first use)
 category_suggestion_service = CategorySuggestionService()
 
-# Initialize category suggestions
-with next(get_db()) as db:
-    category_suggestion_service.train_on_existing_transactions(db)
-
 # Schema for the request body
 class CategorySuggestionRequest(BaseModel):
     description: str
@@ -52,6 +50,17 @@ def suggest_category(
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/ready")
+def get_suggestions_readiness():
+    """Warm-up state of the suggestion service; 503 until it is ready"""
+    status = category_suggestion_service.status()
+    return JSONResponse(status_code=200 if status["ready"] else 503, content=status)
+
+@router.get("/cache-stats")
+def get_embedding_cache_stats():
+    """Hit/miss counters of the description embedding cache"""
+    return category_suggestion_service.embedding_cache.stats()
+
 @router.post("/initialize")
 def initialize_category_suggestions(db: Session = Depends(get_db)):
     try:
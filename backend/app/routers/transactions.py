@@ -1,19 +1,21 @@
 from fastapi import APIRouter, UploadFile, File, Depends, HTTPException, Query, Body, Request
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import func, or_
 import pandas as pd
 from typing import List, Dict
-import tempfile
-import os
 import logging
 import time
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models.transaction import Transaction, ExpenseCategory, IncomeCategory, TransactionType
 from ..models.anomaly import TransactionAnomaly
 from ..schemas import transaction as schemas
 from ..services.csv_parser import CSVParser
-from ..services.statistics_service import StatisticsService
+from ..services.transaction_ingest_service import TransactionIngestService
+from ..services.transaction_export import TransactionExportService, EXPORT_FORMATS
+from ..services.statistics_delta_service import StatisticsDeltaService
+from ..services.statistics_refresh_queue import statistics_refresh_queue
 from ..services.anomaly_detection_service import AnomalyDetectionService
 from ..routers.suggestions import category_suggestion_service
 from datetime import date, datetime
@@ -41,6 +43,7 @@ ALLOWED_CONTENT_TYPES = {
 }
 MAX_ROWS_PER_UPLOAD = 5000
 MAX_NEW_TRANSACTIONS_PER_UPLOAD = 2000
+MAX_CATEGORY_UPDATES_PER_REQUEST = 5000
 
 # Simple in-memory rate limiting (per-IP)
 RATE_LIMIT_WINDOW_SECONDS = 60
@@ -67,11 +70,13 @@ SORT_FIELD_MAPPING = {
 }
 
 @router.post("/upload/", response_model=List[schemas.Transaction])
-async def upload_csv(
+def upload_csv(
     file: UploadFile = File(...),
     db: Session = Depends(get_db),
     request: Request = None,
 ):
+    # A plain def runs in the threadpool: embedding the rows and waiting for
+    # the suggestion index (held by the startup sync) must not block the loop
     if not file.filename.endswith('.csv'):
         raise HTTPException(400, detail="Invalid file format. Please upload a CSV file.")
 
@@ -86,119 +91,166 @@ async def upload_csv(
         client_ip = "unknown"
     _check_rate_limit(client_ip)
 
-    # Save uploaded file temporarily
-    with tempfile.NamedTemporaryFile(delete=False) as temp_file:
-        # Stream the incoming upload to avoid loading entire file into memory,
-        # enforcing a maximum allowed size while writing.
-        total_bytes = 0
-        while True:
-            chunk = await file.read(1_048_576)  # 1 MB chunks
-            if not chunk:
-                break
-            total_bytes += len(chunk)
-            if total_bytes > MAX_UPLOAD_BYTES:
-                raise HTTPException(status_code=413, detail=f"File too large. Max allowed size is {MAX_UPLOAD_BYTES // (1024*1024)} MB.")
-            temp_file.write(chunk)
-        temp_file.flush()
+    # Stream the incoming upload into memory in chunks, enforcing a maximum
+    # allowed size while reading; the bytes are decoded and parsed exactly once.
+    content = bytearray()
+    while True:
+        chunk = file.file.read(1_048_576)  # 1 MB chunks
+        if not chunk:
+            break
+        if len(content) + len(chunk) > MAX_UPLOAD_BYTES:
+            raise HTTPException(status_code=413, detail=f"File too large. Max allowed size is {MAX_UPLOAD_BYTES // (1024*1024)} MB.")
+        content.extend(chunk)
+
+    try:
+        # Parse based on detected format
+        transactions = CSVParser.parse_csv_bytes(bytes(content))
+        # Guardrail: hard cap on number of rows parsed
+        if len(transactions) > MAX_ROWS_PER_UPLOAD:
+            raise HTTPException(status_code=400, detail=f"CSV contains {len(transactions)} rows. The maximum allowed per upload is {MAX_ROWS_PER_UPLOAD}.")
         
-        try:
-            # Parse based on detected format
-            transactions = CSVParser.parse_csv(temp_file.name)
-            # Guardrail: hard cap on number of rows parsed
-            if len(transactions) > MAX_ROWS_PER_UPLOAD:
-                raise HTTPException(status_code=400, detail=f"CSV contains {len(transactions)} rows. The maximum allowed per upload is {MAX_ROWS_PER_UPLOAD}.")
+        # Drop rows already stored or repeated within the file in one pass
+        transactions, skipped_count = TransactionIngestService.filter_duplicates(db, transactions)
+
+        # Guardrail: cap the number of new transactions created per upload
+        if len(transactions) > MAX_NEW_TRANSACTIONS_PER_UPLOAD:
+            logger.info(
+                f"Reached per-upload creation cap of {MAX_NEW_TRANSACTIONS_PER_UPLOAD} new transactions; remaining rows will be ignored."
+            )
+        new_transactions = transactions[:MAX_NEW_TRANSACTIONS_PER_UPLOAD]
+        
+        # Get category suggestions for all new transactions in one batch
+        all_suggestions = category_suggestion_service.suggest_categories_batch(
+            [(trans.description, trans.amount, trans.transaction_type) for trans in new_transactions]
+        )
+        
+        for trans, suggestions in zip(new_transactions, all_suggestions):
+            # If we have suggestions with high confidence, set the category
+            if suggestions and suggestions[0][1] > 0.5:  # Check if confidence > 0.5
+                best_category, confidence = suggestions[0]
+                logger.info(f"Setting category {best_category} with confidence {confidence} for transaction: {trans.description}")
+                
+                if trans.transaction_type == TransactionType.EXPENSE:
+                    trans.expense_category = ExpenseCategory(best_category)
+                else:
+                    trans.income_category = IncomeCategory(best_category)
+        
+        if skipped_count > 0:
+            logger.info(f"Skipped {skipped_count} duplicate transactions during import")
             
-            # Save to database with category suggestions
-            db_transactions = []
-            skipped_count = 0
+        if not new_transactions:
+            logger.warning("No new transactions were imported - all were duplicates")
+            return []
             
-            for trans in transactions:
-                # Check for duplicate transaction
-                existing_transaction = db.query(Transaction).filter(
-                    Transaction.account_number == trans.account_number,
-                    Transaction.transaction_date == trans.transaction_date,
-                    Transaction.amount == trans.amount,
-                    Transaction.description == trans.description,
-                    Transaction.source_bank == trans.source_bank
-                ).first()
-                
-                if existing_transaction:
-                    logger.warning(f"Skipping duplicate transaction: {trans.description} on {trans.transaction_date} for {trans.amount} {trans.currency}")
-                    skipped_count += 1
-                    continue
-                
-                # Get category suggestions before creating the transaction
-                suggestions = category_suggestion_service.suggest_category(
-                    trans.description,
-                    trans.amount,
-                    trans.transaction_type
+        # Insert all new rows in one batch; ids come back without reloading rows
+        transaction_ids = TransactionIngestService.bulk_insert(db, new_transactions)
+        db.commit()
+        db_transactions = [
+            schemas.Transaction(id=transaction_id, **trans.model_dump())
+            for transaction_id, trans in zip(transaction_ids, new_transactions)
+        ]
+        
+        # Add categorized transactions to the suggestion service
+        category_suggestion_service.add_transactions_batch(db_transactions)
+        
+        # Run anomaly detection on newly imported transactions
+        if db_transactions:
+            try:
+                AnomalyDetectionService.detect_anomalies(
+                    db=db,
+                    transaction_ids=transaction_ids,
+                    force_redetection=False
                 )
+                logger.info(f"Anomaly detection completed for {len(transaction_ids)} new transactions")
+            except Exception as e:
+                logger.warning(f"Anomaly detection failed for new transactions: {str(e)}")
                 
-                # If we have suggestions with high confidence, set the category
-                if suggestions and suggestions[0][1] > 0.5:  # Check if confidence > 0.5
-                    best_category, confidence = suggestions[0]
-                    logger.info(f"Setting category {best_category} with confidence {confidence} for transaction: {trans.description}")
-                    
-                    if trans.transaction_type == TransactionType.EXPENSE:
-                        trans.expense_category = ExpenseCategory(best_category)
-                    else:
-                        trans.income_category = IncomeCategory(best_category)
-                
-                # Create and save the transaction
-                db_trans = Transaction(**trans.dict())
-                db.add(db_trans)
-                db_transactions.append(db_trans)
-
-                # Guardrail: cap the number of new transactions created per upload
-                if len(db_transactions) >= MAX_NEW_TRANSACTIONS_PER_UPLOAD:
-                    logger.info(
-                        f"Reached per-upload creation cap of {MAX_NEW_TRANSACTIONS_PER_UPLOAD} new transactions; remaining rows will be ignored."
-                    )
-                    break
-            
-            if skipped_count > 0:
-                logger.info(f"Skipped {skipped_count} duplicate transactions during import")
-                
-            if not db_transactions:
-                logger.warning("No new transactions were imported - all were duplicates")
-                return []
-                
-            db.commit()
-            
-            # Refresh to get IDs and add to suggestion service
-            for trans in db_transactions:
-                db.refresh(trans)
-                if trans.expense_category or trans.income_category:
-                    category_suggestion_service.add_transaction(trans)
-            
-            # Run anomaly detection on newly imported transactions
-            if db_transactions:
-                try:
-                    transaction_ids = [t.id for t in db_transactions]
-                    AnomalyDetectionService.detect_anomalies(
-                        db=db,
-                        transaction_ids=transaction_ids,
-                        force_redetection=False
-                    )
-                    logger.info(f"Anomaly detection completed for {len(transaction_ids)} new transactions")
-                except Exception as e:
-                    logger.warning(f"Anomaly detection failed for new transactions: {str(e)}")
-                    
-            return db_transactions
-            
-        except HTTPException as e:  # Preserve intended error codes like 400/415
-            raise e
-        except ValueError as e:  # CSV format/parse errors
-            raise HTTPException(status_code=400, detail=str(e))
-        except Exception as e:
-            logger.error(f"Error processing CSV upload: {str(e)}")
-            raise HTTPException(status_code=500, detail="Error processing CSV upload")
-        finally:
-            os.unlink(temp_file.name)
+        return db_transactions
+        
+    except HTTPException as e:  # Preserve intended error codes like 400/415
+        raise e
+    except ValueError as e:  # CSV format/parse errors
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error processing CSV upload: {str(e)}")
+        raise HTTPException(status_code=500, detail="Error processing CSV upload")
+
+def _filtered_transactions(
+    db: Session,
+    sort_field: str,
+    sort_direction: str,
+    search: str = None,
+    category: str = None,
+    start_date: str = None,
+    end_date: str = None,
+):
+    """Query of the transactions matching the list filters, in the requested order."""
+    # Map frontend field name to database field name
+    db_sort_field = SORT_FIELD_MAPPING.get(sort_field, 'transaction_date')
+    
+    # Build the base query
+    query = db.query(Transaction)
+
+    # Apply search filter
+    if search:
+        ilike_str = f"%{search.lower()}%"
+        query = query.filter(
+            or_(
+                func.lower(Transaction.description).ilike(ilike_str),
+                func.lower(Transaction.counterparty_name).ilike(ilike_str)
+            )
+        )
+    # Apply category filter
+    if category and category != 'all':
+        # Try to match ExpenseCategory or IncomeCategory enums
+        expense_enum = None
+        income_enum = None
+        try:
+            expense_enum = ExpenseCategory(category)
+        except Exception:
+            pass
+        try:
+            income_enum = IncomeCategory(category)
+        except Exception:
+            pass
+        if expense_enum and income_enum:
+            query = query.filter(
+                or_(
+                    Transaction.expense_category == expense_enum,
+                    Transaction.income_category == income_enum
+                )
+            )
+        elif expense_enum:
+            query = query.filter(Transaction.expense_category == expense_enum)
+        elif income_enum:
+            query = query.filter(Transaction.income_category == income_enum)
+        else:
+            query = query.filter(False)  # No match, return empty
+    # Apply date range filter
+    if start_date:
+        try:
+            start = datetime.strptime(start_date, "%Y-%m-%d").date()
+            query = query.filter(Transaction.transaction_date >= start)
+        except Exception:
+            pass
+    if end_date:
+        try:
+            end = datetime.strptime(end_date, "%Y-%m-%d").date()
+            query = query.filter(Transaction.transaction_date <= end)
+        except Exception:
+            pass
+
+    # Add sorting
+    if sort_direction == 'asc':
+        sort_column = getattr(Transaction, db_sort_field).asc()
+    else:
+        sort_column = getattr(Transaction, db_sort_field).desc()
+    
+    return query.order_by(sort_column)
 
 @router.get("/", response_model=schemas.TransactionPage)
 def get_transactions(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     page: int = Query(1, gt=0),
     page_size: int = Query(10, gt=0, le=100),
     sort_field: str = Query('date', regex='^(date|description|amount|type)$'),
@@ -209,70 +261,7 @@ def get_transactions(
     end_date: str = Query(None, description="End date (YYYY-MM-DD)")
 ):
     try:
-        from sqlalchemy import or_, and_
-        from datetime import datetime
-        # Map frontend field name to database field name
-        db_sort_field = SORT_FIELD_MAPPING.get(sort_field, 'transaction_date')
-        
-        # Build the base query
-        query = db.query(Transaction)
-
-        # Apply search filter
-        if search:
-            ilike_str = f"%{search.lower()}%"
-            query = query.filter(
-                or_(
-                    func.lower(Transaction.description).ilike(ilike_str),
-                    func.lower(Transaction.counterparty_name).ilike(ilike_str)
-                )
-            )
-        # Apply category filter
-        if category and category != 'all':
-            # Try to match ExpenseCategory or IncomeCategory enums
-            expense_enum = None
-            income_enum = None
-            try:
-                expense_enum = ExpenseCategory(category)
-            except Exception:
-                pass
-            try:
-                income_enum = IncomeCategory(category)
-            except Exception:
-                pass
-            if expense_enum and income_enum:
-                query = query.filter(
-                    or_(
-                        Transaction.expense_category == expense_enum,
-                        Transaction.income_category == income_enum
-                    )
-                )
-            elif expense_enum:
-                query = query.filter(Transaction.expense_category == expense_enum)
-            elif income_enum:
-                query = query.filter(Transaction.income_category == income_enum)
-            else:
-                query = query.filter(False)  # No match, return empty
-        # Apply date range filter
-        if start_date:
-            try:
-                start = datetime.strptime(start_date, "%Y-%m-%d").date()
-                query = query.filter(Transaction.transaction_date >= start)
-            except Exception:
-                pass
-        if end_date:
-            try:
-                end = datetime.strptime(end_date, "%Y-%m-%d").date()
-                query = query.filter(Transaction.transaction_date <= end)
-            except Exception:
-                pass
-
-        # Add sorting
-        if sort_direction == 'asc':
-            sort_column = getattr(Transaction, db_sort_field).asc()
-        else:
-            sort_column = getattr(Transaction, db_sort_field).desc()
-        
-        query = query.order_by(sort_column)
+        query = _filtered_transactions(db, sort_field, sort_direction, search, category, start_date, end_date)
         
         # Get total count before pagination
         total_count = query.count()
@@ -292,13 +281,39 @@ def get_transactions(
         logger.error(f"Error fetching transactions: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.get("/export")
+def export_transactions(
+    db: Session = Depends(get_read_db),
+    format: str = Query('csv', regex='^(csv|ndjson|parquet)$', description="csv, ndjson or parquet (needs pyarrow)"),
+    sort_field: str = Query('date', regex='^(date|description|amount|type)$'),
+    sort_direction: str = Query('desc', regex='^(asc|desc)$'),
+    search: str = Query(None, description="Search term for description/counterparty"),
+    category: str = Query(None, description="Category filter (expense or income)"),
+    start_date: str = Query(None, description="Start date (YYYY-MM-DD)"),
+    end_date: str = Query(None, description="End date (YYYY-MM-DD)")
+):
+    """
+    Stream every transaction matching the filters of ``GET /transactions/``,
+    unpaginated, as CSV, newline-delimited JSON or Parquet.
+    """
+    if format == 'parquet' and not TransactionExportService.parquet_available():
+        raise HTTPException(status_code=501, detail="Parquet export requires the pyarrow package")
+    # Only builds the statement; the export reads the rows on its own session
+    query = _filtered_transactions(db, sort_field, sort_direction, search, category, start_date, end_date)
+    media_type, extension = EXPORT_FORMATS[format]
+    return StreamingResponse(
+        TransactionExportService.stream(query, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="transactions.{extension}"'},
+    )
+
 @router.delete("/{transaction_id}")
-async def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
+def delete_transaction(transaction_id: int, db: Session = Depends(get_db)):
     transaction = db.query(Transaction).filter(Transaction.id == transaction_id).first()
     if not transaction:
         raise HTTPException(status_code=404, detail="Transaction not found")
     
-    transaction_date = transaction.transaction_date
+    before = StatisticsDeltaService.snapshot(transaction)
     
     # Delete associated anomaly records first to avoid foreign key constraint violation
     db.query(TransactionAnomaly).filter(TransactionAnomaly.transaction_id == transaction_id).delete()
@@ -306,14 +321,99 @@ async def delete_transaction(transaction_id: int, db: Session = Depends(get_db))
     # Delete the transaction
     db.delete(transaction)
     
-    # Commit deletion before updating statistics
+    dirty_ids = statistics_refresh_queue.persist(db, [(before, None)])
     db.commit()
-    
-    # Update statistics for the affected period
-    StatisticsService.update_statistics(db, transaction_date)
+    # Subtracted from the statistics by the deferred refresh
+    statistics_refresh_queue.mark(before, None, dirty_ids)
     
     return {"message": "Transaction deleted successfully"}
 
+def _set_category(transaction: Transaction, category: str, transaction_type: TransactionType) -> None:
+    if transaction_type == TransactionType.EXPENSE:
+        transaction.expense_category = ExpenseCategory(category)
+        transaction.income_category = None
+    else:
+        transaction.income_category = IncomeCategory(category)
+        transaction.expense_category = None
+
+@router.patch("/categories", response_model=schemas.BatchCategoryUpdateResult)
+def update_transaction_categories(
+    updates: List[schemas.CategoryUpdate] = Body(...),
+    db: Session = Depends(get_db)
+):
+    """Recategorize several transactions at once.
+
+    All updates are committed together; the statistics of each affected month
+    are then refreshed once, the suggestion index is updated with one batched
+    embedding call and anomalies are re-detected once over all transactions.
+    """
+    if len(updates) > MAX_CATEGORY_UPDATES_PER_REQUEST:
+        raise HTTPException(400, detail=f"At most {MAX_CATEGORY_UPDATES_PER_REQUEST} updates are allowed per request.")
+    if not updates:
+        return {"updated": 0, "affected_months": 0, "transactions": [], "timings_ms": {}}
+
+    timings = {}
+    started = phase_started = time.perf_counter()
+
+    def end_phase(name):
+        nonlocal phase_started
+        now = time.perf_counter()
+        timings[name] = round((now - phase_started) * 1000, 2)
+        phase_started = now
+
+    ids = list(dict.fromkeys(update.id for update in updates))
+    transactions = {t.id: t for t in db.query(Transaction).filter(Transaction.id.in_(ids)).all()}
+    missing = [tx_id for tx_id in ids if tx_id not in transactions]
+    if missing:
+        raise HTTPException(404, detail=f"Transactions not found: {missing}")
+
+    before = {tx_id: StatisticsDeltaService.snapshot(transaction) for tx_id, transaction in transactions.items()}
+    # Later updates of the same transaction win
+    for update in updates:
+        _set_category(transactions[update.id], update.category, update.transaction_type)
+    after = {tx_id: StatisticsDeltaService.snapshot(transaction) for tx_id, transaction in transactions.items()}
+    changes = [(before[tx_id], after[tx_id]) for tx_id in ids]
+    dirty_ids = statistics_refresh_queue.persist(db, changes)
+    db.commit()
+    # Reload the committed rows in one query and serialize them before
+    # anomaly detection commits and expires them again
+    updated = [
+        schemas.Transaction(**{column: getattr(t, column) for column in schemas.Transaction.model_fields})
+        for t in db.query(Transaction).filter(Transaction.id.in_(ids)).order_by(Transaction.id).all()
+    ]
+    end_phase("update")
+
+    # One merged refresh per affected month, applied now so the caller reads
+    # up-to-date statistics
+    statistics_refresh_queue.mark_many(changes, dirty_ids)
+    statistics_refresh_queue.flush()
+    end_phase("statistics")
+
+    try:
+        category_suggestion_service.add_transactions_batch(updated)
+    except Exception as e:
+        logger.warning(f"Failed to update suggestion index for {len(updated)} transactions: {str(e)}")
+    end_phase("suggestions")
+
+    try:
+        AnomalyDetectionService.detect_anomalies(db=db, transaction_ids=ids, force_redetection=True)
+    except Exception as e:
+        logger.warning(f"Anomaly detection failed after updating {len(ids)} categories: {str(e)}")
+    end_phase("anomalies")
+
+    timings["total"] = round((time.perf_counter() - started) * 1000, 2)
+    affected_months = {
+        (snapshot.transaction_date.year, snapshot.transaction_date.month)
+        for snapshot in before.values() if snapshot.transaction_date is not None
+    }
+    logger.info(f"Updated {len(ids)} categories across {len(affected_months)} months: {timings}")
+    return {
+        "updated": len(ids),
+        "affected_months": len(affected_months),
+        "transactions": updated,
+        "timings_ms": timings,
+    }
+
 @router.patch("/{transaction_id}/category")
 def update_transaction_category(
     transaction_id: int,
@@ -328,19 +428,14 @@ def update_transaction_category(
     if not transaction:
         raise HTTPException(404, detail="Transaction not found")
     
-    transaction_date = transaction.transaction_date
-    
-    if transaction_type == TransactionType.EXPENSE:
-        transaction.expense_category = ExpenseCategory(category)
-        transaction.income_category = None
-    else:
-        transaction.income_category = IncomeCategory(category)
-        transaction.expense_category = None
-    
-    # Update statistics for the affected period
-    StatisticsService.update_statistics(db, transaction_date)
+    before = StatisticsDeltaService.snapshot(transaction)
+    _set_category(transaction, category, transaction_type)
+    after = StatisticsDeltaService.snapshot(transaction)
+    dirty_ids = statistics_refresh_queue.persist(db, [(before, after)])
     
     db.commit()
+    # Moved between categories in the statistics by the deferred refresh
+    statistics_refresh_queue.mark(before, after, dirty_ids)
     db.refresh(transaction)
     # Update suggestion index to learn from manual category edits
     try:
@@ -370,13 +465,14 @@ def restore_transaction(
     try:
         # Create a new transaction with the provided data
         # The ID will be auto-generated, which is fine for our purpose
-        new_transaction = Transaction(**transaction_data.dict(exclude={"id"}))
-        db.add(new_transaction)
-        db.commit()
-        db.refresh(new_transaction)
+        transaction_id = TransactionIngestService.bulk_insert(db, [transaction_data])[0]
+        new_transaction = schemas.Transaction(id=transaction_id, **transaction_data.model_dump(exclude={"id"}))
+        after = StatisticsDeltaService.snapshot(new_transaction)
+        dirty_ids = statistics_refresh_queue.persist(db, [(None, after)])
         
-        # Update statistics for the affected period
-        StatisticsService.update_statistics(db, new_transaction.transaction_date)
+        db.commit()
+        # Added to the statistics by the deferred refresh
+        statistics_refresh_queue.mark(None, after, dirty_ids)
         
         # Run anomaly detection on restored transaction
         try:
@@ -7,7 +7,7 @@ from ..models.statistics import StatisticsPeriod
 
 # Models for get_statistics_timeseries
 class FinancialStatisticsResponse(BaseModel):
-    id: int
+    id: Optional[int] = None  # None for rows computed on the fly
     period: str
     date: Optional[str] = None
     
@@ -1,6 +1,6 @@
 from pydantic import BaseModel, validator
 from datetime import date
-from typing import Optional, Literal
+from typing import Dict, Optional, Literal
 from enum import Enum
 from ..models.transaction import ExpenseCategory, IncomeCategory, TransactionType
 
@@ -70,6 +70,27 @@ class TransactionPage(BaseModel):
     class Config:
         orm_mode = True
 
+class CategoryUpdate(BaseModel):
+    id: int
+    transaction_type: TransactionType
+    category: str
+
+    @validator('category')
+    def validate_category(cls, v, values):
+        category_enum = IncomeCategory if values.get('transaction_type') == TransactionType.INCOME else ExpenseCategory
+        try:
+            category_enum(v)
+        except ValueError:
+            raise ValueError(f"Invalid {category_enum.__name__}: {v}")
+        return v
+
+class BatchCategoryUpdateResult(BaseModel):
+    updated: int
+    affected_months: int
+    transactions: list[Transaction]
+    # Milliseconds spent per phase: update, statistics, suggestions, anomalies, total
+    timings_ms: Dict[str, float]
+
 
 class TimePeriod(str, Enum):
     """Represents relative time periods for filtering data."""
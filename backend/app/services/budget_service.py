@@ -1,5 +1,5 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, extract
+from sqlalchemy import func
 from datetime import date
 from typing import List, Optional
 import logging
@@ -7,6 +7,7 @@ import pandas as pd
 
 from ..models.budget import Budget
 from ..models.transaction import Transaction, TransactionType, ExpenseCategory
+from .period_range import date_filters, month_range
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -131,8 +132,7 @@ class BudgetService:
             .filter(
                 Transaction.transaction_type == TransactionType.EXPENSE,
                 Transaction.expense_category == ExpenseCategory(category),
-                extract('year', Transaction.transaction_date) == year,
-                extract('month', Transaction.transaction_date) == month,
+                *date_filters(Transaction.transaction_date, month_range(year, month)),
             )
             .scalar()
         )
@@ -1,41 +1,127 @@
-from sentence_transformers import SentenceTransformer
-from qdrant_client import QdrantClient
-from qdrant_client.http import models
-from typing import List, Tuple
+from typing import Dict, List, Tuple
 import numpy as np
-import re
+import hashlib
+import os
+import threading
+import time
 import logging
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 from ..models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
+from .embedding_cache import EmbeddingCache
+from .vector_store import VectorStore, create_vector_store
+from .description_normalizer import normalize_description
 from sqlalchemy.orm import Session
 
+# Sentence embedding model; loaded on first use, see CategorySuggestionService.model
+MODEL_NAME = 'all-MiniLM-L6-v2'
+# Output dimension of the model
+EMBEDDING_DIMENSION = 384
+# Number of texts embedded per model forward pass
+EMBEDDING_BATCH_SIZE = 64
+# Number of transactions loaded, embedded and upserted together during training
+TRAINING_CHUNK_SIZE = 1000
+
+# Directory for runtime data kept outside the source tree
+DATA_DIR = os.getenv("MYFINANCE_DATA_DIR", os.path.join(os.path.expanduser("~"), ".myfinance"))
+# Location of the on-disk vector index; ":memory:" keeps it in process memory
+SUGGESTION_INDEX_PATH = os.getenv("SUGGESTION_INDEX_PATH", os.path.join(DATA_DIR, "suggestion_index"))
+# Nearest-neighbour backend for the index: "qdrant" (local Qdrant client) or
+# "numpy" (brute-force search over an in-process matrix, see vector_store.py)
+SUGGESTION_VECTOR_STORE = os.getenv("SUGGESTION_VECTOR_STORE", "qdrant")
+# Bump when the text fed to the model changes so stored vectors get re-embedded
+INDEX_VERSION = 2
+# Optional ``.npz`` file the embedding cache is persisted to; empty disables it
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "20000"))
+# Share of the suggestion score given to amount similarity; the rest is the
+# cosine similarity of the description embeddings
+AMOUNT_WEIGHT = 0.1
+# Candidates fetched per requested suggestion before re-ranking by amount
+AMOUNT_RERANK_FACTOR = 3
+COLLECTION_NAMES = ("expense_embeddings", "income_embeddings")
+
 class CategorySuggestionService:
-    def __init__(self):
-        # Initialize the sentence transformer model
-        self.model = SentenceTransformer('all-MiniLM-L6-v2')
+    def __init__(
+        self,
+        index_path: str = SUGGESTION_INDEX_PATH,
+        cache_path: str = EMBEDDING_CACHE_PATH,
+        vector_store: str = SUGGESTION_VECTOR_STORE,
+    ):
+        # The sentence transformer model is loaded lazily (see ``model``) so
+        # that importing the app does not wait for it
+        self._model = None
+        self._model_lock = threading.Lock()
+        
+        # Background warm-up state, reported by ``status()``
+        self.warmup_state = "pending"
+        self.warmup_error = None
+        self.warmup_seconds = None
         
-        # Initialize Qdrant client (vector database)
-        self.client = QdrantClient(":memory:")  # For production, use persistent storage
+        # Serializes index writes between the warm-up sync and request handlers
+        self._index_lock = threading.RLock()
         
-        # Create collections for expense and income categories
-        self.client.recreate_collection(
-            collection_name="expense_embeddings",
-            vectors_config=models.VectorParams(
-                size=384,  # Output dimension of the model
-                distance=models.Distance.COSINE
-            )
-        )
+        # Embeddings of normalized descriptions, shared by training, uploads
+        # and manual edits
+        self.embedding_cache = EmbeddingCache(max_size=EMBEDDING_CACHE_SIZE, path=cache_path or None)
         
-        self.client.recreate_collection(
-            collection_name="income_embeddings",
-            vectors_config=models.VectorParams(
-                size=384,
-                distance=models.Distance.COSINE
-            )
-        )
+        # Initialize the vector store, persisted locally unless an in-memory
+        # index is requested
+        self.store: VectorStore = create_vector_store(vector_store, index_path)
+        # Raw Qdrant client when that backend is used (None otherwise)
+        self.client = getattr(self.store, "client", None)
+        
+        # Create collections for expense and income categories, keeping any
+        # vectors stored by a previous run
+        for collection_name in COLLECTION_NAMES:
+            self.store.ensure_collection(collection_name, EMBEDDING_DIMENSION)
+
+    @property
+    def model(self):
+        """The sentence transformer model, loaded on first access."""
+        if self._model is None:
+            with self._model_lock:
+                if self._model is None:
+                    # Deferred import: pulling in torch alone takes seconds
+                    from sentence_transformers import SentenceTransformer
+                    logger.info(f"Loading sentence transformer model {MODEL_NAME}")
+                    self._model = SentenceTransformer(MODEL_NAME)
+        return self._model
+
+    def warm_up(self, session_factory):
+        """Load the model and sync the index with the database.
+
+        Meant to run in a background thread at startup; ``session_factory``
+        returns a new database session. Failures are logged and reported by
+        ``status()``; suggestions then fall back to loading on first use.
+        """
+        self.warmup_state = "warming"
+        started = time.perf_counter()
+        try:
+            self.model
+            with session_factory() as db:
+                self.train_on_existing_transactions(db)
+        except Exception as e:
+            logger.exception("Category suggestion warm-up failed")
+            self.warmup_state = "failed"
+            self.warmup_error = str(e)
+            return
+        finally:
+            self.warmup_seconds = time.perf_counter() - started
+        self.warmup_state = "ready"
+        logger.info(f"Category suggestions ready after {self.warmup_seconds:.1f}s")
+
+    def status(self) -> dict:
+        """Warm-up state of the suggestion service."""
+        return {
+            "state": self.warmup_state,
+            "ready": self.warmup_state == "ready",
+            "model_loaded": self._model is not None,
+            "warmup_seconds": self.warmup_seconds,
+            "error": self.warmup_error,
+        }
 
     def _preprocess_description(self, description: str) -> str:
         """
@@ -47,113 +133,178 @@ class CategorySuggestionService:
         Returns:
             Cleaned and normalized description
         """
-        # Convert to lowercase
-        text = description.lower()
-        
-        # Remove common transaction prefixes
-        prefixes = [
-            r'payment via \w+\s+',
-            r'european direct debit\s+',
-            r'instant credit transfer from\s+',
-            r'charge\s+',
-            r'payment\s+'
-        ]
-        for prefix in prefixes:
-            text = re.sub(prefix, '', text, flags=re.IGNORECASE)
-        
-        # Remove dates in various formats
-        date_patterns = [
-            r'\d{2}[-/]\d{2}[-/]\d{2,4}',  # DD-MM-YYYY or DD/MM/YYYY
-            r'\d{2}[-/]\d{2}',              # DD-MM or DD/MM
-            r'\d{1,2}[:.]\d{2}\s*(?:am|pm)?',  # HH:MM or HH.MM with optional AM/PM
-        ]
-        for pattern in date_patterns:
-            text = re.sub(pattern, '', text)
-        
-        # Remove card information
-        card_patterns = [
-            r'card number \d*x*\s*\d*x*\s*\d*x*\s*\d*',
-            r'with \w+ (?:debit|credit) card \d{4}\s*\d*x*\s*\d*x*\s*\d*',
-            r'cardholder:\s*[^\n]+',
-        ]
-        for pattern in card_patterns:
-            text = re.sub(pattern, '', text)
-        
-        # Remove transaction references and IDs
-        ref_patterns = [
-            r'creditor ref\.\s*:\s*[\w\s]+',
-            r'mandate ref\.\s*:\s*[\w\s]+',
-            r'reference\s*:\s*[\w\s/]+',
-            r'ordering bank\s*:\s*[\w\s]+',
-        ]
-        for pattern in ref_patterns:
-            text = re.sub(pattern, '', text)
-        
-        # Remove account numbers and BIC codes
-        text = re.sub(r'[A-Z]{2}\d{2}\s*[A-Z0-9\s]{10,30}', '', text)  # IBAN
-        text = re.sub(r'[A-Z]{6}[A-Z0-9]{2,5}', '', text)  # BIC/SWIFT
-        
-        # Remove postal codes and addresses
-        text = re.sub(r'\d{4,5}\s*[-\s]*[a-z]{2,3}', '', text)
-        text = re.sub(r'\d{3,4}\s+\d{4}\s+[a-zA-Z\s]+', '', text)
-        
-        # Remove multiple spaces and trim
-        text = re.sub(r'\s+', ' ', text).strip()
-        
-        # Extract merchant name (usually in caps or after specific keywords)
-        merchant_patterns = [
-            r'([A-Z][A-Z &]+)',  # All caps merchant names
-            r'creditor\s*:\s*([^\.]+)',  # After "creditor:"
-            r'(?:at|to|from)\s+([^\.]+)',  # After "at", "to", or "from"
-        ]
-        
-        merchant_name = None
-        for pattern in merchant_patterns:
-            match = re.search(pattern, description)
-            if match:
-                merchant_name = match.group(1).strip()
-                break
-        
-        if merchant_name:
-            # Add merchant name to the beginning of the processed text for emphasis
-            text = f"{merchant_name.lower()} {text}"
-        
-        return text
+        return normalize_description(description)
     
     def _create_transaction_text(self, transaction: Transaction) -> str:
-        """Create a text representation of the transaction for embedding"""
-        description = self._preprocess_description(transaction.description)
-        transaction_text = f"{description} {abs(transaction.amount)}"
-        logger.info(f"Creating transaction text: {transaction_text}")
+        """Create a text representation of the transaction for embedding.
+
+        The amount is deliberately left out so that recurring transactions
+        share one embedding; it is stored as a separate numeric feature.
+        """
+        return self._create_text(transaction.description)
+
+    def _create_text(self, description: str) -> str:
+        transaction_text = self._preprocess_description(description)
+        logger.debug(f"Creating transaction text: {transaction_text}")
         return transaction_text
 
+    def _encode(self, texts: List[str]) -> np.ndarray:
+        """Embed ``texts``, sending only cache misses to the model in one batch.
+
+        Each distinct text counts as one cache lookup.
+        """
+        if not texts:
+            return np.zeros((0, EMBEDDING_DIMENSION), dtype=np.float32)
+        distinct = list(dict.fromkeys(texts))
+        cached = self.embedding_cache.get_many(distinct)
+        missing = [text for text in distinct if text not in cached]
+        if missing:
+            embeddings = self.model.encode(missing, batch_size=EMBEDDING_BATCH_SIZE, show_progress_bar=False)
+            for text, embedding in zip(missing, embeddings):
+                self.embedding_cache.put(text, embedding)
+                cached[text] = embedding
+        return np.stack([cached[text] for text in texts])
+
+    @staticmethod
+    def _amount_similarity(a: float, b: float) -> float:
+        """Ratio of the smaller to the larger absolute amount, in ``[0, 1]``."""
+        a, b = abs(a), abs(b)
+        if a == b:
+            return 1.0
+        return min(a, b) / max(a, b)
+
     def _get_collection_name(self, transaction_type: TransactionType) -> str:
         return "expense_embeddings" if transaction_type == TransactionType.EXPENSE else "income_embeddings"
 
+    @staticmethod
+    def _get_category(transaction: Transaction):
+        return transaction.expense_category if transaction.transaction_type == TransactionType.EXPENSE else transaction.income_category
+
+    def _content_hash(self, transaction: Transaction) -> str:
+        """Hash of everything that determines a transaction's stored point."""
+        content = "\x1f".join([
+            str(INDEX_VERSION),
+            transaction.description or "",
+            repr(abs(transaction.amount)),
+            self._get_category(transaction).value,
+        ])
+        return hashlib.sha1(content.encode("utf-8")).hexdigest()
+
+    def _indexed_hashes(self, collection_name: str) -> Dict[int, str]:
+        """Return ``{point id: content hash}`` for every point in a collection."""
+        return self.store.payload_values(collection_name, "content_hash")
+
     def train_on_existing_transactions(self, db: Session):
-        """Train the model on existing transactions"""
-        transactions = db.query(Transaction).all()
-        
+        """Bring the persisted index in line with the categorized transactions.
+
+        Only transactions that are new or whose content hash changed since they
+        were indexed get embedded. Points of transactions that were deleted,
+        uncategorized or moved to the other collection are removed.
+        """
+        with self._index_lock:
+            self._sync_index(db)
+
+    def _sync_index(self, db: Session):
+        indexed = {name: self._indexed_hashes(name) for name in COLLECTION_NAMES}
+        stale = {name: set(hashes) for name, hashes in indexed.items()}
+
+        transactions = db.query(
+            Transaction.id,
+            Transaction.description,
+            Transaction.amount,
+            Transaction.transaction_type,
+            Transaction.expense_category,
+            Transaction.income_category,
+        ).filter(
+            (Transaction.expense_category != None) | (Transaction.income_category != None)  # noqa: E711
+        ).yield_per(TRAINING_CHUNK_SIZE)
+
+        chunk = []
+        total = 0
         for transaction in transactions:
-            if not transaction.expense_category and not transaction.income_category:
+            if self._get_category(transaction) is None:
                 continue
-                
-            text = self._create_transaction_text(transaction)
-            embedding = self.model.encode(text)
-            
             collection_name = self._get_collection_name(transaction.transaction_type)
-            category = transaction.expense_category if transaction.transaction_type == TransactionType.EXPENSE else transaction.income_category
-            
-            self.client.upsert(
-                collection_name=collection_name,
-                points=[
-                    models.PointStruct(
-                        id=transaction.id,
-                        vector=embedding.tolist(),
-                        payload={"category": category.value}
+            stale[collection_name].discard(transaction.id)
+            if indexed[collection_name].get(transaction.id) == self._content_hash(transaction):
+                continue
+            chunk.append(transaction)
+            if len(chunk) >= TRAINING_CHUNK_SIZE:
+                total += self._index_batch(chunk)
+                chunk = []
+        total += self._index_batch(chunk)
+        self.embedding_cache.save()
+
+        for collection_name, ids in stale.items():
+            self.store.delete(collection_name, list(ids))
+        self.store.flush()
+        removed = sum(len(ids) for ids in stale.values())
+        logger.info(f"Suggestion index synced: {total} transactions embedded, {removed} stale points removed")
+
+    def suggest_categories_batch(
+        self,
+        items: List[Tuple[str, float, TransactionType]],
+        top_k: int = 3
+    ) -> List[List[Tuple[str, float]]]:
+        """Suggest categories for several transactions at once.
+
+        ``items`` holds ``(description, amount, transaction_type)`` tuples. The
+        texts of items whose collection has points are embedded in one batched
+        call and each collection is queried with a single batch search. Returns one suggestion list per item, in
+        order; items whose collection is empty get an empty list.
+        """
+        results: List[List[Tuple[str, float]]] = [[] for _ in items]
+        if not items:
+            return results
+
+        # Group item positions by target collection
+        positions_by_collection: Dict[str, List[int]] = {}
+        for position, (_, _, transaction_type) in enumerate(items):
+            positions_by_collection.setdefault(self._get_collection_name(transaction_type), []).append(position)
+
+        # Skip empty collections before embedding, which loads the model on first use
+        for collection_name in list(positions_by_collection):
+            try:
+                if self.store.count(collection_name) == 0:
+                    logger.warning(f"No points in {collection_name} collection, returning empty suggestions")
+                    del positions_by_collection[collection_name]
+            except Exception as e:
+                logger.warning(f"Error checking collection: {e}, returning empty suggestions")
+                del positions_by_collection[collection_name]
+        if not positions_by_collection:
+            return results
+
+        searched = sorted(position for positions in positions_by_collection.values() for position in positions)
+        encoded = self._encode([self._create_text(items[position][0]) for position in searched])
+        embeddings = dict(zip(searched, encoded))
+
+        for collection_name, positions in positions_by_collection.items():
+            # Search for similar transactions using one batch search
+            try:
+                search_results = self.store.search_batch(
+                    collection_name, np.stack([embeddings[position] for position in positions]),
+                    top_k * AMOUNT_RERANK_FACTOR,
+                )
+            except Exception as e:
+                logger.error(f"Error searching for similar transactions: {e}")
+                continue
+
+            # Re-rank candidates by blending description similarity with
+            # amount similarity, then return categories with confidence scores
+            for position, hits in zip(positions, search_results):
+                amount = items[position][1]
+                scored = [
+                    (
+                        payload["category"],
+                        (1 - AMOUNT_WEIGHT) * score
+                        + AMOUNT_WEIGHT * self._amount_similarity(amount, payload.get("amount", amount))
                     )
+                    for score, payload in hits
                 ]
-            )
+                scored.sort(key=lambda pair: pair[1], reverse=True)
+                results[position] = scored[:top_k]
+
+        return results
 
     def suggest_category(
         self, 
@@ -163,54 +314,55 @@ class CategorySuggestionService:
         top_k: int = 3
     ) -> List[Tuple[str, float]]:
         """Suggest categories for a new transaction"""
-        text = f"{self._preprocess_description(description)} {abs(amount)}"
-        logger.info(f"Suggesting category for text: {text}")
-        embedding = self.model.encode(text)
-        
-        collection_name = self._get_collection_name(transaction_type)
-        
-        # Check if collection has any points
-        try:
-            collection_info = self.client.get_collection(collection_name)
-            if collection_info.points_count == 0:
-                logger.warning(f"No points in {collection_name} collection, returning empty suggestions")
-                return []
-        except Exception as e:
-            logger.warning(f"Error checking collection: {e}, returning empty suggestions")
-            return []
-        
-        # Search for similar transactions using search
-        try:
-            search_result = self.client.search(
-                collection_name=collection_name,
-                query_vector=embedding.tolist(),
-                limit=top_k
-            )
-            
-            # Return categories with confidence scores
-            return [(hit.payload["category"], hit.score) for hit in search_result]
-        except Exception as e:
-            logger.error(f"Error searching for similar transactions: {e}")
-            return []
+        return self.suggest_categories_batch([(description, amount, transaction_type)], top_k=top_k)[0]
+
+    def add_transactions_batch(self, transactions: List[Transaction]) -> int:
+        """Add several transactions to the vector database.
+
+        Uncategorized transactions are ignored. Embeddings are computed in one
+        batched call and written with one multi-point upsert per collection.
+        Returns the number of indexed transactions.
+        """
+        indexed = self._index_batch(transactions)
+        self.store.flush()
+        return indexed
+
+    def _index_batch(self, transactions: List[Transaction]) -> int:
+        transactions = [t for t in transactions if self._get_category(t) is not None]
+        if not transactions:
+            return 0
+
+        embeddings = self._encode([self._create_transaction_text(t) for t in transactions])
+
+        positions_by_collection: Dict[str, List[int]] = {name: [] for name in COLLECTION_NAMES}
+        for position, transaction in enumerate(transactions):
+            positions_by_collection[self._get_collection_name(transaction.transaction_type)].append(position)
+
+        with self._index_lock:
+            for collection_name, positions in positions_by_collection.items():
+                if not positions:
+                    continue
+                ids = [transactions[position].id for position in positions]
+                self.store.upsert(
+                    collection_name,
+                    ids,
+                    embeddings[positions],
+                    [
+                        {
+                            "category": self._get_category(transactions[position]).value,
+                            "amount": abs(transactions[position].amount),
+                            "content_hash": self._content_hash(transactions[position]),
+                        }
+                        for position in positions
+                    ],
+                )
+                # A transaction whose type changed must not linger in the other collection
+                for other_name in COLLECTION_NAMES:
+                    if other_name != collection_name:
+                        self.store.delete(other_name, ids)
+
+        return len(transactions)
 
     def add_transaction(self, transaction: Transaction):
         """Add a new transaction to the vector database"""
-        if not transaction.expense_category and not transaction.income_category:
-            return
-            
-        text = self._create_transaction_text(transaction)
-        embedding = self.model.encode(text)
-        
-        collection_name = self._get_collection_name(transaction.transaction_type)
-        category = transaction.expense_category if transaction.transaction_type == TransactionType.EXPENSE else transaction.income_category
-        
-        self.client.upsert(
-            collection_name=collection_name,
-            points=[
-                models.PointStruct(
-                    id=transaction.id,
-                    vector=embedding.tolist(),
-                    payload={"category": category.value}
-                )
-            ]
-        ) 
\ No newline at end of file
+        self.add_transactions_batch([transaction])
@@ -1,4 +1,8 @@
+import codecs
+import csv
+import io
 import logging
+import numpy as np
 import pandas as pd
 from typing import List, Callable, Dict, Set
 from ..schemas.transaction import TransactionCreate
@@ -6,11 +10,14 @@ from ..models.transaction import TransactionType
 
 logger = logging.getLogger(__name__)
 
+# Number of leading bytes inspected when detecting the encoding of an export
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
 class CSVParser:
     # ----------------------------------------------------------------------------------
     # Registry utilities
     # ----------------------------------------------------------------------------------
-    # Mapping of bank identifier -> {"headers": Set[str], "parser": Callable[[str], List[TransactionCreate]]}
+    # Mapping of bank identifier -> {"headers": Set[str], "parser": Callable[[pd.DataFrame], List[TransactionCreate]]}
     _bank_parsers: Dict[str, Dict[str, Callable]] = {}
 
     @classmethod
@@ -18,7 +25,7 @@ class CSVParser:
         cls,
         name: str,
         headers: Set[str],
-        parser_func: Callable[[str], List[TransactionCreate]],
+        parser_func: Callable[[pd.DataFrame], List[TransactionCreate]],
     ) -> None:
         """Register a new CSV parser for a specific bank.
 
@@ -29,9 +36,10 @@ class CSVParser:
         headers: Set[str]
             Column names that must be present in the CSV file for this parser
             to be selected.
-        parser_func: Callable[[str], List[TransactionCreate]]
-            Function that receives the *file path* to a CSV exported from the
-            bank and returns a list of ``TransactionCreate`` objects.
+        parser_func: Callable[[pd.DataFrame], List[TransactionCreate]]
+            Function that receives the already decoded CSV exported from the
+            bank as a ``DataFrame`` and returns a list of ``TransactionCreate``
+            objects.
         """
         cls._bank_parsers[name] = {"headers": set(headers), "parser": parser_func}
 
@@ -73,141 +81,210 @@ class CSVParser:
         except ValueError:
             return date_str  # Return as-is if already in correct format
 
+    # ------------------------------------------------------------------------------
+    # Column-level conversions
+    # ------------------------------------------------------------------------------
     @staticmethod
-    def parse_ing_csv(file_path: str) -> List[TransactionCreate]:
-        df = CSVParser.read_csv_with_fallback(file_path)
-        transactions = []
-        
-        for _, row in df.iterrows():
-            amount = CSVParser.convert_amount(row["Amount"])
-            transaction = TransactionCreate(
-                account_number=row["Account Number"],
-                transaction_date=CSVParser.convert_date(row["Booking date"]),
-                amount=amount,
-                currency=row["Currency"],
-                description=row["Description"],
-                counterparty_account=row["Counterparty account"]
-                    if pd.notna(row["Counterparty account"]) else None,
-                transaction_type=TransactionType.INCOME if amount > 0 else TransactionType.EXPENSE,
-                source_bank="ING"
-            )
-            transactions.append(transaction)
-            
-        return transactions
+    def convert_amount_column(amounts: pd.Series) -> pd.Series:
+        """Vectorised counterpart of :py:meth:`convert_amount` for a whole column."""
+        return (
+            amounts.astype(str)
+            .str.strip()
+            .str.replace(',', '.', regex=False)
+            .astype(float)
+        )
 
     @staticmethod
-    def parse_kbc_csv(file_path: str) -> List[TransactionCreate]:
-        df = CSVParser.read_csv_with_fallback(file_path)
-        transactions = []
-        
-        for _, row in df.iterrows():
-            amount = CSVParser.convert_amount(row["Amount"])
-            transaction = TransactionCreate(
-                account_number=row["Account number"],
-                transaction_date=CSVParser.convert_date(row["Date"]),
-                amount=amount,
-                currency=row["Currency"],
-                description=row["Description"],
-                counterparty_name=row["Counterparty name"]
-                    if pd.notna(row["Counterparty name"]) else None,
-                counterparty_account=row["counterparty's account number"]
-                    if pd.notna(row["counterparty's account number"]) else None,
-                transaction_type=TransactionType.INCOME if amount > 0 else TransactionType.EXPENSE,
-                source_bank="KBC"
-            )
-            transactions.append(transaction)
-            
-        return transactions
+    def convert_date_column(dates: pd.Series) -> pd.Series:
+        """Vectorised counterpart of :py:meth:`convert_date` for a whole column.
+
+        Values of the form ``DD/MM/YYYY`` are rewritten to ``YYYY-MM-DD``; any
+        other value is passed through unchanged.
+        """
+        return dates.astype(str).str.replace(
+            r'^([^/]*)/([^/]*)/([^/]*)$', r'\3-\2-\1', regex=True
+        )
 
     @staticmethod
-    def parse_beobank_csv(file_path: str) -> List[TransactionCreate]:
-        logger.info(f"Starting Beobank CSV parsing for file: {file_path}")
-        df = CSVParser.read_csv_with_fallback(file_path)
-        logger.info(f"CSV loaded successfully. Columns: {df.columns.tolist()}")
+    def optional_column(values: pd.Series) -> pd.Series:
+        """Return ``values`` as an object column with missing entries set to ``None``."""
+        values = values.astype(object)
+        return values.where(values.notna(), None)
+
+    @staticmethod
+    def transaction_type_column(amounts: pd.Series) -> np.ndarray:
+        """Derive the transaction type from the sign of each amount."""
+        return np.where(amounts > 0, TransactionType.INCOME, TransactionType.EXPENSE)
+
+    @staticmethod
+    def frame_to_transactions(frame: pd.DataFrame) -> List[TransactionCreate]:
+        """Build ``TransactionCreate`` objects from an already normalised frame.
+
+        ``frame`` must only contain ``TransactionCreate`` field names as
+        columns; validation happens once per row here, after every column has
+        been converted in bulk.
+        """
+        return [TransactionCreate(**record) for record in frame.to_dict('records')]
+
+    # ------------------------------------------------------------------------------
+    # Bank-specific parsers
+    # ------------------------------------------------------------------------------
+    @staticmethod
+    def parse_ing_frame(df: pd.DataFrame) -> List[TransactionCreate]:
+        amounts = CSVParser.convert_amount_column(df["Amount"])
+
+        frame = pd.DataFrame({
+            "account_number": df["Account Number"],
+            "transaction_date": CSVParser.convert_date_column(df["Booking date"]),
+            "amount": amounts,
+            "currency": df["Currency"],
+            "description": df["Description"],
+            "counterparty_account": CSVParser.optional_column(df["Counterparty account"]),
+            "transaction_type": CSVParser.transaction_type_column(amounts),
+            "source_bank": "ING",
+        })
+        return CSVParser.frame_to_transactions(frame)
+
+    @staticmethod
+    def parse_kbc_frame(df: pd.DataFrame) -> List[TransactionCreate]:
+        amounts = CSVParser.convert_amount_column(df["Amount"])
+
+        frame = pd.DataFrame({
+            "account_number": df["Account number"],
+            "transaction_date": CSVParser.convert_date_column(df["Date"]),
+            "amount": amounts,
+            "currency": df["Currency"],
+            "description": df["Description"],
+            "counterparty_name": CSVParser.optional_column(df["Counterparty name"]),
+            "counterparty_account": CSVParser.optional_column(df["counterparty's account number"]),
+            "transaction_type": CSVParser.transaction_type_column(amounts),
+            "source_bank": "KBC",
+        })
+        return CSVParser.frame_to_transactions(frame)
+
+    @staticmethod
+    def parse_beobank_frame(df: pd.DataFrame) -> List[TransactionCreate]:
+        logger.info(f"Starting Beobank CSV parsing. Columns: {df.columns.tolist()}")
         logger.info(f"DataFrame shape: {df.shape}")
-        transactions = []
-        
-        for idx, row in df.iterrows():
-            logger.debug(f"Processing row {idx}: {row.to_dict()}")
-            # Determine transaction type and amount
-            debit = row.get("Debit", "")
-            credit = row.get("Credit", "")
-            
-            logger.debug(f"Row {idx} - Debit: {debit}, Credit: {credit}")
-            
-            if pd.notna(debit) and str(debit).strip():
-                amount = -CSVParser.convert_amount(debit)  # Debit is negative
-                transaction_type = TransactionType.EXPENSE
-                logger.debug(f"Row {idx} - Debit transaction: amount={amount}")
-            elif pd.notna(credit) and str(credit).strip():
-                amount = CSVParser.convert_amount(credit)  # Credit is positive
-                transaction_type = TransactionType.INCOME
-                logger.debug(f"Row {idx} - Credit transaction: amount={amount}")
-            else:
-                logger.debug(f"Row {idx} - Skipping row with no amount")
-                continue  # Skip rows with no amount
-            
-            try:
-                transaction = TransactionCreate(
-                    account_number="",  # Beobank CSV doesn't include account number
-                    transaction_date=CSVParser.convert_date(row["Date"]),
-                    amount=amount,
-                    currency="EUR",  # Beobank uses EUR by default
-                    description=row["Message"],
-                    counterparty_account=None,
-                    transaction_type=transaction_type,
-                    source_bank="Beobank"
-                )
-                transactions.append(transaction)
-                logger.debug(f"Row {idx} - Transaction created successfully")
-            except Exception as e:
-                logger.error(f"Row {idx} - Error creating transaction: {e}", exc_info=True)
-                raise
-            
+
+        debit = df["Debit"] if "Debit" in df.columns else pd.Series(None, index=df.index, dtype=object)
+        credit = df["Credit"] if "Credit" in df.columns else pd.Series(None, index=df.index, dtype=object)
+
+        # A row is a debit when the Debit cell is non-blank, otherwise a credit
+        # when the Credit cell is non-blank; rows with neither are skipped.
+        has_debit = debit.notna() & (debit.astype(str).str.strip() != "")
+        has_credit = ~has_debit & credit.notna() & (credit.astype(str).str.strip() != "")
+        keep = has_debit | has_credit
+        logger.debug(f"Skipping {int((~keep).sum())} rows with no amount")
+
+        amounts = pd.Series(np.nan, index=df.index)
+        amounts[has_debit] = -CSVParser.convert_amount_column(debit[has_debit])  # Debit is negative
+        amounts[has_credit] = CSVParser.convert_amount_column(credit[has_credit])  # Credit is positive
+
+        frame = pd.DataFrame({
+            "account_number": "",  # Beobank CSV doesn't include account number
+            "transaction_date": CSVParser.convert_date_column(df["Date"]),
+            "amount": amounts,
+            "currency": "EUR",  # Beobank uses EUR by default
+            "description": df["Message"],
+            "counterparty_account": None,
+            "transaction_type": np.where(has_debit, TransactionType.EXPENSE, TransactionType.INCOME),
+            "source_bank": "Beobank",
+        })[keep]
+
+        try:
+            transactions = CSVParser.frame_to_transactions(frame)
+        except Exception as e:
+            logger.error(f"Error creating Beobank transactions: {e}", exc_info=True)
+            raise
+
         logger.info(f"Beobank CSV parsing completed. Total transactions: {len(transactions)}")
         return transactions
 
+    # ------------------------------------------------------------------------------
+    # Decoding
+    # ------------------------------------------------------------------------------
+    @staticmethod
+    def detect_encoding(data: bytes) -> str:
+        """Pick the encoding of a CSV export by inspecting its leading bytes.
+
+        A UTF-8 byte-order mark selects ``utf-8-sig``. Otherwise the first
+        ``ENCODING_SAMPLE_BYTES`` bytes are checked for valid UTF-8; exports
+        that are not UTF-8 are treated as ``latin1`` (which is identical to
+        ``iso-8859-1`` and accepts any byte sequence).
+        """
+        if data.startswith(codecs.BOM_UTF8):
+            return 'utf-8-sig'
+        sample = data[:ENCODING_SAMPLE_BYTES]
+        try:
+            sample.decode('utf-8')
+        except UnicodeDecodeError as e:
+            # A multi-byte character cut off by the end of the sample is fine
+            if not (len(sample) < len(data) and e.start >= len(sample) - 3):
+                return 'latin1'
+        return 'utf-8'
+
+    @staticmethod
+    def decode_csv_bytes(data: bytes) -> str:
+        """Decode raw CSV bytes once, falling back to ``latin1`` if UTF-8 fails
+        past the sampled prefix."""
+        encoding = CSVParser.detect_encoding(data)
+        logger.info(f"Detected CSV encoding: {encoding}")
+        try:
+            return data.decode(encoding)
+        except UnicodeDecodeError as e:
+            logger.warning(f"Failed to decode CSV as {encoding}: {e}; falling back to latin1")
+            return data.decode('latin1')
+
+    @staticmethod
+    def read_headers(text: str) -> List[str]:
+        """Return the column names from the first line of a decoded CSV."""
+        first_line = text.split('\n', 1)[0].rstrip('\r')
+        return next(csv.reader([first_line], delimiter=';'), [])
+
     @staticmethod
     def read_csv_with_fallback(file_path: str) -> pd.DataFrame:
         logger.info(f"Reading CSV file: {file_path}")
-        encodings = ['utf-8', 'latin1', 'iso-8859-1']
-        for encoding in encodings:
-            try:
-                logger.info(f"Attempting to read with encoding: {encoding}")
-                df = pd.read_csv(file_path, sep=';', encoding=encoding)
-                logger.info(f"Successfully read CSV with encoding {encoding}")
-                return df
-            except UnicodeDecodeError as e:
-                logger.warning(f"Failed to read CSV with encoding {encoding}: {e}")
-        logger.error("Failed to read CSV with all attempted encodings")
-        raise ValueError("Failed to read CSV with all attempted encodings")
+        with open(file_path, 'rb') as f:
+            text = CSVParser.decode_csv_bytes(f.read())
+        return pd.read_csv(io.StringIO(text), sep=';')
 
     # ------------------------------------------------------------------------------
-    # Generic parsing entry-point
+    # Generic parsing entry-points
     # ------------------------------------------------------------------------------
     @staticmethod
-    def parse_csv(file_path: str) -> List[TransactionCreate]:
-        """Parse a CSV file exported from any supported bank.
+    def parse_csv_bytes(data: bytes) -> List[TransactionCreate]:
+        """Parse the raw bytes of a CSV file exported from any supported bank.
 
-        This is a convenience wrapper that reads the file once to inspect its
-        headers, determines the correct parser by calling
-        :py:meth:`detect_bank_format`, and then delegates the actual parsing
-        work to the bank-specific parser function registered in
-        ``_bank_parsers``.
+        The content is decoded once, the bank is detected from the header line
+        alone via :py:meth:`detect_bank_format`, and the single ``DataFrame``
+        read from the decoded text is handed to the bank-specific parser
+        registered in ``_bank_parsers``.
         """
-        logger.info(f"Starting CSV parsing for: {file_path}")
         try:
-            df = CSVParser.read_csv_with_fallback(file_path)
-            bank_name = CSVParser.detect_bank_format(df.columns.tolist())
+            text = CSVParser.decode_csv_bytes(data)
+            bank_name = CSVParser.detect_bank_format(CSVParser.read_headers(text))
             logger.info(f"Using parser for bank: {bank_name}")
+            df = pd.read_csv(io.StringIO(text), sep=';')
             parser_func = CSVParser._bank_parsers[bank_name]["parser"]
-            result = parser_func(file_path)
+            result = parser_func(df)
             logger.info(f"CSV parsing completed successfully. Total transactions: {len(result)}")
             return result
         except Exception as e:
             logger.error(f"Error parsing CSV: {e}", exc_info=True)
             raise
 
+    @staticmethod
+    def parse_csv(file_path: str) -> List[TransactionCreate]:
+        """Parse a CSV file exported from any supported bank.
+
+        Convenience wrapper around :py:meth:`parse_csv_bytes` that reads the
+        file from disk exactly once.
+        """
+        logger.info(f"Starting CSV parsing for: {file_path}")
+        with open(file_path, 'rb') as f:
+            return CSVParser.parse_csv_bytes(f.read())
+
 # ----------------------------------------------------------------------------------
 # Register built-in parsers so they are available immediately on import
 # ----------------------------------------------------------------------------------
@@ -215,17 +292,17 @@ class CSVParser:
 CSVParser.register_bank_parser(
     "ING",
     {"Account Number", "Account Name", "Counterparty account", "Booking date"},
-    CSVParser.parse_ing_csv,
+    CSVParser.parse_ing_frame,
 )
 
 CSVParser.register_bank_parser(
     "KBC",
     {"Account number", "Heading", "Name", "Currency"},
-    CSVParser.parse_kbc_csv,
+    CSVParser.parse_kbc_frame,
 )
 
 CSVParser.register_bank_parser(
     "Beobank",
     {"Date", "Debit", "Credit", "Message", "Balance"},
-    CSVParser.parse_beobank_csv,
+    CSVParser.parse_beobank_frame,
 )
@@ -0,0 +1,97 @@
+from typing import Optional
+from urllib.parse import quote
+import os
+import sqlite3
+import threading
+import logging
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+
+class DataVersion:
+    """Counter of committed database writes.
+
+    Every ``Session`` that flushes changes or executes an INSERT, UPDATE,
+    DELETE or raw statement bumps the counter once its transaction commits,
+    so anything derived from the data can be cached under the version it was
+    computed at and is invalidated by the next write. Writes made outside a
+    session (``engine.begin()``, DDL) call ``bump`` themselves.
+
+    Writes of other processes (the reset CLI, migrations, another worker)
+    never reach these events; once ``watch`` is given the database file, the
+    counter also moves whenever SQLite's ``PRAGMA data_version`` reports a
+    commit by any other connection.
+    """
+
+    def __init__(self):
+        self._value = 0
+        # Distinguishes the counters of successive processes, which all start at 0
+        self.epoch = os.urandom(4).hex()
+        self._lock = threading.Lock()
+        self._probe: Optional[sqlite3.Connection] = None
+        self._seen: Optional[int] = None
+
+    @property
+    def value(self) -> int:
+        if self._probe is not None:
+            with self._lock:
+                seen = self._probe.execute("PRAGMA data_version").fetchone()[0]
+                if seen != self._seen:
+                    self._seen = seen
+                    self._value += 1
+        return self._value
+
+    def watch(self, database_path: str):
+        """Also count the commits other connections and processes make to
+        the SQLite file at ``database_path``, probed on a read-only
+        connection of its own on every read of ``value``."""
+        probe = sqlite3.connect(f"file:{quote(database_path)}?mode=ro", uri=True, check_same_thread=False)
+        with self._lock:
+            if self._probe is not None:
+                self._probe.close()
+            self._probe = probe
+            self._seen = probe.execute("PRAGMA data_version").fetchone()[0]
+        logger.info(f"Watching {database_path} for writes of other processes")
+
+    def unwatch(self):
+        with self._lock:
+            if self._probe is not None:
+                self._probe.close()
+            self._probe = self._seen = None
+
+    def bump(self) -> int:
+        with self._lock:
+            self._value += 1
+            return self._value
+
+    def track(self, session_class=Session):
+        """Listen to the write and commit events of ``session_class``."""
+        event.listen(session_class, "after_flush", self._on_flush)
+        event.listen(session_class, "do_orm_execute", self._on_execute)
+        event.listen(session_class, "after_commit", self._on_commit)
+        event.listen(session_class, "after_rollback", self._on_rollback)
+
+    @staticmethod
+    def _on_flush(session, flush_context):
+        session.info["data_changed"] = True
+
+    @staticmethod
+    def _on_execute(orm_execute_state):
+        if not orm_execute_state.is_select:
+            orm_execute_state.session.info["data_changed"] = True
+
+    def _on_commit(self, session):
+        # after_commit runs once the commit is visible to other connections
+        if session.info.pop("data_changed", False):
+            self.bump()
+
+    @staticmethod
+    def _on_rollback(session):
+        session.info.pop("data_changed", None)
+
+
+data_version = DataVersion()
+data_version.track()
@@ -0,0 +1,120 @@
+"""
+Normalization of raw bank transaction descriptions into the text that is
+embedded for category suggestions.
+
+The cleanup is a fixed sequence of regex removals. Each removal sees the output
+of the previous one (a removal can join text into a new match for a later
+pattern), so the sequence itself is kept. To make it cheap, every pattern is
+compiled once, and each group of removals is guarded by a single merged
+alternation: if the alternation finds nothing, no pattern in the group can
+match and the whole group is skipped. Most descriptions match none of the
+groups and only pay for one scan of the combined alternation.
+"""
+from functools import lru_cache
+import re
+
+# Maximum number of distinct descriptions kept in the normalization cache
+NORMALIZE_CACHE_SIZE = 65536
+
+# Removal groups, applied in order; patterns inside a group are applied one
+# after the other.
+_PREFIX_PATTERNS = [
+    r'payment via \w+\s+',
+    r'european direct debit\s+',
+    r'instant credit transfer from\s+',
+    r'charge\s+',
+    r'payment\s+',
+]
+_DATE_PATTERNS = [
+    r'\d{2}[-/]\d{2}[-/]\d{2,4}',  # DD-MM-YYYY or DD/MM/YYYY
+    r'\d{2}[-/]\d{2}',              # DD-MM or DD/MM
+    r'\d{1,2}[:.]\d{2}\s*(?:am|pm)?',  # HH:MM or HH.MM with optional AM/PM
+]
+_CARD_PATTERNS = [
+    r'card number \d*x*\s*\d*x*\s*\d*x*\s*\d*',
+    r'with \w+ (?:debit|credit) card \d{4}\s*\d*x*\s*\d*x*\s*\d*',
+    r'cardholder:\s*[^\n]+',
+]
+_REFERENCE_PATTERNS = [
+    r'creditor ref\.\s*:\s*[\w\s]+',
+    r'mandate ref\.\s*:\s*[\w\s]+',
+    r'reference\s*:\s*[\w\s/]+',
+    r'ordering bank\s*:\s*[\w\s]+',
+]
+# Postal codes and addresses. (Uppercase-only IBAN/BIC patterns can never
+# match the lowercased text, so they are not part of the pipeline.)
+_ADDRESS_PATTERNS = [
+    r'\d{4,5}\s*[-\s]*[a-z]{2,3}',
+    r'\d{3,4}\s+\d{4}\s+[a-zA-Z\s]+',
+]
+
+
+def _compile_group(patterns, flags=0):
+    return re.compile('|'.join(f'(?:{p})' for p in patterns), flags), [re.compile(p, flags) for p in patterns]
+
+
+_REMOVAL_GROUPS = [
+    _compile_group(_PREFIX_PATTERNS, re.IGNORECASE),
+    _compile_group(_DATE_PATTERNS),
+    _compile_group(_CARD_PATTERNS),
+    _compile_group(_REFERENCE_PATTERNS),
+    _compile_group(_ADDRESS_PATTERNS),
+]
+# Any match at all? Used as the fast path for plain descriptions.
+_ANY_REMOVAL = re.compile('|'.join(
+    f'(?:{group.pattern})' for group, _ in _REMOVAL_GROUPS
+), re.IGNORECASE)
+
+_WHITESPACE = re.compile(r'\s+')
+
+# Merchant name candidates, searched in the original description; the first
+# pattern that matches wins.
+_MERCHANT_PATTERNS = [
+    re.compile(r'([A-Z][A-Z &]+)'),  # All caps merchant names
+    re.compile(r'creditor\s*:\s*([^\.]+)'),  # After "creditor:"
+    re.compile(r'(?:at|to|from)\s+([^\.]+)'),  # After "at", "to", or "from"
+]
+
+
+def _extract_merchant(description: str):
+    for pattern in _MERCHANT_PATTERNS:
+        match = pattern.search(description)
+        if match:
+            return match.group(1).strip()
+    return None
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_description(description: str) -> str:
+    """
+    Clean and normalize a raw transaction description.
+
+    Args:
+        description: Raw transaction description
+
+    Returns:
+        Lowercased description without payment prefixes, dates, card data,
+        references and addresses, prefixed with the merchant name when one
+        can be extracted.
+    """
+    text = description.lower()
+
+    # The combined alternation is case-insensitive, so it may report a
+    # candidate that a case-sensitive group then rejects; that only costs the
+    # group scan, never correctness.
+    if _ANY_REMOVAL.search(text):
+        for group, patterns in _REMOVAL_GROUPS:
+            if not group.search(text):
+                continue
+            for pattern in patterns:
+                text = pattern.sub('', text)
+
+    # Remove multiple spaces and trim
+    text = _WHITESPACE.sub(' ', text).strip()
+
+    merchant_name = _extract_merchant(description)
+    if merchant_name:
+        # Add merchant name to the beginning of the processed text for emphasis
+        text = f"{merchant_name.lower()} {text}"
+
+    return text
@@ -0,0 +1,98 @@
+from collections import OrderedDict
+from typing import Dict, Iterable, List, Optional
+import numpy as np
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class EmbeddingCache:
+    """Content-addressed LRU cache of text embeddings.
+
+    Entries are keyed by the normalized text that was embedded, so recurring
+    transactions (rent, subscriptions, the weekly supermarket run) are only
+    sent to the model once. When ``path`` is set the cache can be saved to and
+    reloaded from a ``.npz`` file.
+    """
+
+    def __init__(self, max_size: int = 20000, path: Optional[str] = None):
+        self.max_size = max_size
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._dirty = False
+        self._lock = threading.Lock()
+        if path and os.path.exists(path):
+            self.load()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return vector
+
+    def put(self, key: str, vector: np.ndarray) -> None:
+        with self._lock:
+            self._entries[key] = np.asarray(vector, dtype=np.float32)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+            self._dirty = True
+
+    def get_many(self, keys: Iterable[str]) -> Dict[str, np.ndarray]:
+        """Return the cached vectors for ``keys``; missing keys are omitted."""
+        found = {}
+        for key in keys:
+            vector = self.get(key)
+            if vector is not None:
+                found[key] = vector
+        return found
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "persistent": bool(self.path),
+        }
+
+    def load(self) -> None:
+        """Load entries from ``path``, keeping the most recently saved ones."""
+        try:
+            with np.load(self.path, allow_pickle=False) as data:
+                keys: List[str] = data["keys"].tolist()
+                vectors = data["vectors"]
+        except Exception as e:
+            logger.warning(f"Could not load embedding cache from {self.path}: {e}")
+            return
+        with self._lock:
+            for key, vector in zip(keys[-self.max_size:], vectors[-self.max_size:]):
+                self._entries[key] = vector
+        logger.info(f"Loaded {len(keys)} cached embeddings from {self.path}")
+
+    def save(self) -> None:
+        """Write the cache to ``path`` if persistence is enabled and it changed."""
+        if not self.path or not self._dirty:
+            return
+        with self._lock:
+            keys = np.array(list(self._entries.keys()), dtype=str)
+            vectors = np.stack(list(self._entries.values())) if self._entries else np.zeros((0, 0), dtype=np.float32)
+            self._dirty = False
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        tmp_path = f"{self.path}.tmp.npz"
+        np.savez(tmp_path, keys=keys, vectors=vectors)
+        os.replace(tmp_path, self.path)
+        logger.info(f"Saved {len(keys)} cached embeddings to {self.path}")
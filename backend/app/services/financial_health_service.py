@@ -10,6 +10,7 @@ from typing import List, Dict, Optional, Tuple
 from ..models.transaction import Transaction, TransactionType, ExpenseCategory
 from ..models.statistics import FinancialStatistics, CategoryStatistics, StatisticsPeriod
 from ..models.financial_health import FinancialHealth, FinancialRecommendation
+from .period_range import date_filters, month_range
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
@@ -124,8 +125,7 @@ class FinancialHealthService:
         # Get financial statistics for the month
         monthly_stats = db.query(FinancialStatistics).filter(
             FinancialStatistics.period == StatisticsPeriod.MONTHLY,
-            extract('year', FinancialStatistics.date) == target_date.year,
-            extract('month', FinancialStatistics.date) == target_date.month
+            *date_filters(FinancialStatistics.date, month_range(target_date.year, target_date.month))
         ).first()
         
         if not monthly_stats:
@@ -0,0 +1,57 @@
+"""
+Half-open ``[start, end)`` date ranges of the statistics periods.
+
+Filtering with ``column >= start AND column < end`` lets SQLite search the
+date index, whereas ``extract('year'/'month', column) == ...`` wraps the
+column in a function and forces a full table scan. ``None`` bounds are open.
+"""
+from datetime import date
+from typing import List, Optional, Tuple
+
+from ..models.statistics import StatisticsPeriod
+
+DateRange = Tuple[Optional[date], Optional[date]]
+
+
+def month_range(year: int, month: int) -> DateRange:
+    """The calendar month ``year``-``month``."""
+    if month == 12:
+        return date(year, 12, 1), date(year + 1, 1, 1)
+    return date(year, month, 1), date(year, month + 1, 1)
+
+
+def year_range(year: int) -> DateRange:
+    return date(year, 1, 1), date(year + 1, 1, 1)
+
+
+def period_range(period: StatisticsPeriod, target_date: Optional[date]) -> DateRange:
+    """The month or year of ``target_date``; all time for ``ALL_TIME``."""
+    if period == StatisticsPeriod.MONTHLY:
+        return month_range(target_date.year, target_date.month)
+    if period == StatisticsPeriod.YEARLY:
+        return year_range(target_date.year)
+    return None, None
+
+
+def cumulative_range(period: StatisticsPeriod, target_date: Optional[date]) -> DateRange:
+    """Everything up to the end of the period."""
+    return None, period_range(period, target_date)[1]
+
+
+def year_to_date_range(period: StatisticsPeriod, target_date: Optional[date]) -> DateRange:
+    """From January 1st to the end of a month; the yearly figures of YEARLY
+    and ALL_TIME periods span all time."""
+    if period == StatisticsPeriod.MONTHLY:
+        return date(target_date.year, 1, 1), period_range(period, target_date)[1]
+    return None, None
+
+
+def date_filters(column, date_range: DateRange) -> List:
+    """Index-friendly predicates restricting ``column`` to ``date_range``."""
+    start, end = date_range
+    filters = []
+    if start is not None:
+        filters.append(column >= start)
+    if end is not None:
+        filters.append(column < end)
+    return filters
@@ -0,0 +1,103 @@
+from datetime import date, datetime, timedelta
+from typing import NamedTuple, Optional, Tuple
+import calendar
+import threading
+import logging
+
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+from ..models.transaction import Transaction
+from ..schemas.transaction import TimePeriod
+from .data_version import data_version
+
+logger = logging.getLogger(__name__)
+
+# Months covered by each rolling period; YTD and ALL_TIME are handled apart
+ROLLING_MONTHS = {
+    TimePeriod.THREE_MONTHS: 3,
+    TimePeriod.SIX_MONTHS: 6,
+    TimePeriod.ONE_YEAR: 12,
+    TimePeriod.TWO_YEARS: 24,
+}
+
+
+def _month_end(day: date) -> date:
+    return day.replace(day=calendar.monthrange(day.year, day.month)[1])
+
+
+class DataExtent(NamedTuple):
+    """Dates of the first and the latest transaction (``None`` without any)."""
+    first: Optional[date]
+    last: Optional[date]
+
+    @property
+    def reference_date(self) -> date:
+        """Last day of the month of the latest transaction, which relative
+        periods count back from; the current month without transactions."""
+        return _month_end(self.last or date.today())
+
+
+class PeriodResolver:
+    """Turns the ``time_period`` / ``start_date`` / ``end_date`` parameters of
+    the statistics endpoints into a date range.
+
+    The data extent it counts back from is cached per data version, so the
+    statistics calls of a dashboard load share one min/max query and a write
+    is picked up by the next request.
+    """
+
+    _extent: Optional[Tuple[int, DataExtent]] = None
+    _lock = threading.Lock()
+
+    @staticmethod
+    def data_extent(db: Session) -> DataExtent:
+        version = data_version.value
+        cached = PeriodResolver._extent
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        # Two scalar subqueries: each min/max is a single seek on the date index
+        first, last = db.execute(select(
+            select(func.min(Transaction.transaction_date)).scalar_subquery(),
+            select(func.max(Transaction.transaction_date)).scalar_subquery(),
+        )).one()
+        extent = DataExtent(first, last)
+        with PeriodResolver._lock:
+            if PeriodResolver._extent is None or PeriodResolver._extent[0] <= version:
+                PeriodResolver._extent = (version, extent)
+        return extent
+
+    @staticmethod
+    def invalidate() -> None:
+        with PeriodResolver._lock:
+            PeriodResolver._extent = None
+
+    @staticmethod
+    def resolve(
+        extent: DataExtent,
+        time_period: Optional[TimePeriod] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+    ) -> Tuple[Optional[date], Optional[date]]:
+        """Return the inclusive ``(start, end)`` of the request.
+
+        A ``time_period`` (only used without explicit dates) ends on the
+        reference date and starts on the first day after the month N months
+        earlier, on January 1st for YTD or on the first transaction for
+        ALL_TIME. Explicit ``YYYY-MM-DD`` dates are parsed (``ValueError`` if
+        malformed); a missing one is ``None`` and the caller picks its default.
+        """
+        if time_period and not (start_date or end_date):
+            end = extent.reference_date
+            if time_period in ROLLING_MONTHS:
+                start = _month_end(end - relativedelta(months=ROLLING_MONTHS[time_period])) + timedelta(days=1)
+            elif time_period == TimePeriod.YEAR_TO_DATE:
+                start = date(end.year, 1, 1)
+            else:  # ALL_TIME
+                start = extent.first
+            return start, end
+
+        start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        return start, end
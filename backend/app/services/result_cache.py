@@ -0,0 +1,90 @@
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+import os
+import threading
+import logging
+
+from .data_version import DataVersion, data_version
+
+logger = logging.getLogger(__name__)
+
+# Responses kept per cache; only results of the current data version are kept
+RESULT_CACHE_SIZE = int(os.getenv("RESULT_CACHE_SIZE", "256"))
+
+
+class ResultCache:
+    """LRU cache of computed responses keyed by ``(endpoint, params, data version)``.
+
+    A dashboard fires several statistics requests with the same parameters on
+    every load; between writes each one is computed once. When the data
+    version moves on, entries of older versions can never be hit again and
+    are dropped. Cached values are shared between requests and must not be
+    mutated.
+    """
+
+    def __init__(self, max_size: int = RESULT_CACHE_SIZE, version: DataVersion = data_version):
+        self.max_size = max_size
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._entries_version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, endpoint: str, params: Dict[str, Any], version: int) -> Tuple[bool, Any]:
+        """Return ``(True, value)`` if a result of ``endpoint`` for ``params``
+        is cached at ``version``, ``(False, None)`` otherwise."""
+        key = (endpoint, tuple(sorted(params.items())), version)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return True, self._entries[key]
+            self.misses += 1
+            return False, None
+
+    def put(self, endpoint: str, params: Dict[str, Any], version: int, value: Any) -> None:
+        key = (endpoint, tuple(sorted(params.items())), version)
+        with self._lock:
+            if self._entries_version != version:
+                if self._entries_version is not None and version < self._entries_version:
+                    return  # computed under a version already superseded
+                self._entries.clear()
+                self._entries_version = version
+            self._entries[key] = value
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def get_or_compute(self, endpoint: str, params: Dict[str, Any], compute: Callable[[], Any]) -> Any:
+        """Return the cached result of ``endpoint`` for ``params`` at the current
+        data version, calling ``compute`` on a miss."""
+        # Read the version before computing: a write committed meanwhile bumps
+        # it, so a result computed from older data is never stored as current
+        version = self.version.value
+        found, value = self.get(endpoint, params, version)
+        if not found:
+            value = compute()
+            self.put(endpoint, params, version, value)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._entries_version = None
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_size": self.max_size,
+            "data_version": self.version.value,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / total, 4) if total else 0.0,
+        }
+
+
+statistics_result_cache = ResultCache()
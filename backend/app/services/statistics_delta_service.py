@@ -0,0 +1,434 @@
+from collections import defaultdict, namedtuple
+from datetime import date
+from typing import Dict, List, Optional
+import calendar
+import logging
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from ..models.statistics import FinancialStatistics, CategoryStatistics, ExpenseTypeStatistics, StatisticsPeriod
+from ..models.transaction import Transaction, TransactionType, ExpenseCategory
+from .statistics_rebuild_service import StatisticsRebuildService, Totals, Month
+from .statistics_service import StatisticsService
+from .period_range import date_filters, period_range
+
+logger = logging.getLogger(__name__)
+
+# The fields of a transaction that statistics depend on
+TransactionSnapshot = namedtuple(
+    "TransactionSnapshot",
+    ["transaction_date", "amount", "transaction_type", "expense_category", "income_category"],
+)
+
+# Relative tolerance used by the consistency checker
+CONSISTENCY_TOLERANCE = 1e-6
+# Sums are kept by adding and subtracting floats; a sum over no transactions
+# or a type total below this is rounding residue and is stored as zero
+ZERO_EPSILON = 1e-6
+
+_FINANCIAL_SUMS = ("period_income", "period_expenses", "income_count", "expense_count",
+                   "total_income", "total_expenses", "yearly_income", "yearly_expenses")
+_CATEGORY_SUMS = ("period_amount", "period_transaction_count", "total_amount",
+                  "total_transaction_count", "yearly_amount", "yearly_transaction_count")
+
+
+def _sum_of(value: float, count: int) -> float:
+    """A maintained sum, exactly zero once no transactions contribute to it."""
+    return value if count else 0
+
+
+class StatisticsDeltaService:
+    """Keep the statistics tables up to date by applying the difference a single
+    transaction makes, instead of recomputing the affected periods.
+
+    A change is described by snapshots of the transaction before and after it
+    (``None`` for an insert or a delete). Its contribution is added to the
+    month, year and all-time rows of its period, and to the cumulative
+    (``total_*``) and year-to-date (``yearly_*``) fields of later rows, so the
+    tables stay equal to what ``StatisticsRebuildService`` would produce;
+    ``check_consistency`` verifies that.
+    """
+
+    @staticmethod
+    def snapshot(transaction) -> TransactionSnapshot:
+        return TransactionSnapshot(
+            transaction.transaction_date,
+            transaction.amount,
+            transaction.transaction_type,
+            transaction.expense_category,
+            transaction.income_category,
+        )
+
+    @staticmethod
+    def deltas(before: Optional[TransactionSnapshot], after: Optional[TransactionSnapshot]) -> Dict[Month, Totals]:
+        """Per-month totals to add to the statistics when ``before`` becomes ``after``."""
+        deltas: Dict[Month, Totals] = defaultdict(lambda: defaultdict(int))
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None or snapshot.transaction_date is None:
+                continue
+            StatisticsRebuildService.accumulate(
+                deltas[(snapshot.transaction_date.year, snapshot.transaction_date.month)],
+                snapshot.transaction_type,
+                snapshot.expense_category,
+                snapshot.income_category,
+                sign * snapshot.amount,
+                sign * abs(snapshot.amount),
+                sign,
+            )
+        return deltas
+
+    @staticmethod
+    def merge_deltas(target: Dict[Month, Totals], source: Dict[Month, Totals]) -> None:
+        for month, delta in source.items():
+            StatisticsRebuildService._add(target.setdefault(month, defaultdict(int)), delta)
+
+    @staticmethod
+    def record_change(db: Session, before: Optional[TransactionSnapshot], after: Optional[TransactionSnapshot]):
+        """Apply the statistics delta of replacing ``before`` with ``after``.
+
+        The transaction change itself must already be applied in ``db``; the
+        caller commits both together.
+        """
+        StatisticsDeltaService.apply_deltas(db, StatisticsDeltaService.deltas(before, after))
+
+    @staticmethod
+    def apply_deltas(db: Session, deltas: Dict[Month, Totals]):
+        """Apply per-month deltas (see ``deltas``) to the statistics tables.
+
+        The transaction changes they describe must already be applied in
+        ``db``; nothing is committed.
+        """
+        # Flush the transaction changes: fallback totals are read from the table
+        db.flush()
+
+        deltas = {
+            month: {key: value for key, value in delta.items() if value != 0}
+            for month, delta in deltas.items()
+        }
+        deltas = {month: delta for month, delta in deltas.items() if delta}
+        if not deltas:
+            return
+
+        type_totals = StatisticsDeltaService._type_totals_after(db, deltas)
+        for month in sorted(deltas):
+            StatisticsDeltaService._apply_financial_delta(db, month, deltas[month])
+            StatisticsDeltaService._apply_category_delta(db, month, deltas[month])
+        StatisticsDeltaService._update_percentages(db, type_totals)
+        db.flush()
+        # The rollup is re-summed from the category rows the deltas touched
+        StatisticsService.refresh_expense_type_statistics(db, StatisticsDeltaService._period_bounds(min(deltas))[0])
+
+    @staticmethod
+    def _shift(query, increments: dict):
+        """Add constant increments to columns of every row matched by ``query``."""
+        values = {column: column + increment for column, increment in increments.items() if increment}
+        if values:
+            query.update(values, synchronize_session="fetch")
+
+    @staticmethod
+    def _period_bounds(month: Month):
+        year, month_number = month
+        return date(year, month_number, calendar.monthrange(year, month_number)[1]), date(year, 12, 31)
+
+    @staticmethod
+    def _apply_financial_delta(db: Session, month: Month, delta: dict):
+        d_income = delta.get("income", 0)
+        d_expenses = delta.get("expenses", 0)
+        d_income_count = delta.get("income_count", 0)
+        d_expense_count = delta.get("expense_count", 0)
+        if not (d_income or d_expenses or d_income_count or d_expense_count):
+            return
+
+        FS = FinancialStatistics
+        month_end, year_end = StatisticsDeltaService._period_bounds(month)
+
+        def get_or_create(period, period_date, previous_query, yearly_source):
+            row = db.query(FS).filter(FS.period == period, FS.date == period_date).first()
+            if row is not None:
+                return row
+            row = FS(period=period, date=period_date, **{field: 0 for field in _FINANCIAL_SUMS})
+            previous = previous_query.first() if previous_query is not None else None
+            if previous is not None:
+                row.total_income, row.total_expenses = previous.total_income, previous.total_expenses
+            source = yearly_source(previous) if yearly_source else None
+            if source is not None:
+                row.yearly_income, row.yearly_expenses = source.yearly_income, source.yearly_expenses
+            db.add(row)
+            return row
+
+        all_time_row = get_or_create(StatisticsPeriod.ALL_TIME, None, None, None)
+        monthly_row = get_or_create(
+            StatisticsPeriod.MONTHLY, month_end,
+            db.query(FS).filter(FS.period == StatisticsPeriod.MONTHLY, FS.date < month_end).order_by(FS.date.desc()),
+            lambda previous: previous if previous is not None and previous.date.year == month_end.year else None,
+        )
+        # The yearly figures of YEARLY rows span all time
+        yearly_row = get_or_create(
+            StatisticsPeriod.YEARLY, year_end,
+            db.query(FS).filter(FS.period == StatisticsPeriod.YEARLY, FS.date < year_end).order_by(FS.date.desc()),
+            lambda previous: all_time_row,
+        )
+        db.flush()
+
+        cumulative = {FS.total_income: d_income, FS.total_expenses: d_expenses, FS.total_net_savings: d_income - d_expenses}
+        year_to_date = {FS.yearly_income: d_income, FS.yearly_expenses: d_expenses}
+        monthly = db.query(FS).filter(FS.period == StatisticsPeriod.MONTHLY)
+        yearly = db.query(FS).filter(FS.period == StatisticsPeriod.YEARLY)
+        StatisticsDeltaService._shift(monthly.filter(FS.date > month_end), cumulative)
+        StatisticsDeltaService._shift(monthly.filter(FS.date > month_end, FS.date <= year_end), year_to_date)
+        StatisticsDeltaService._shift(yearly.filter(FS.date > year_end), cumulative)
+        StatisticsDeltaService._shift(yearly.filter(FS.date != year_end), year_to_date)
+
+        for row in (monthly_row, yearly_row, all_time_row):
+            income_count = row.income_count + d_income_count
+            expense_count = row.expense_count + d_expense_count
+            values = StatisticsService._statistics_row(
+                _sum_of(row.period_income + d_income, income_count),
+                _sum_of(row.period_expenses + d_expenses, expense_count),
+                income_count, expense_count,
+                row.total_income + d_income, row.total_expenses + d_expenses,
+                row.yearly_income + d_income, row.yearly_expenses + d_expenses,
+            )
+            for key, value in values.items():
+                setattr(row, key, value)
+
+        # Months and years without transactions have no row
+        for row in (monthly_row, yearly_row):
+            if row.income_count + row.expense_count == 0:
+                db.delete(row)
+
+    @staticmethod
+    def _type_total(db: Session, transaction_type: TransactionType, period: StatisticsPeriod, period_date: date) -> float:
+        """Period total of one transaction type, as used for category percentages."""
+        amount = func.abs(Transaction.amount) if transaction_type == TransactionType.EXPENSE else Transaction.amount
+        return db.query(func.sum(amount)).filter(
+            Transaction.transaction_type == transaction_type,
+            *date_filters(Transaction.transaction_date, period_range(period, period_date)),
+        ).scalar() or 0
+
+    @staticmethod
+    def _affected_types(delta: dict) -> Dict[TransactionType, float]:
+        """``{transaction type: change of its total}`` for every type whose
+        category percentages ``delta`` changes."""
+        type_deltas = {
+            TransactionType.EXPENSE: delta.get("expense_total", 0),
+            TransactionType.INCOME: delta.get("income_total", 0),
+        }
+        affected = {t for t, d in type_deltas.items() if d} | {
+            StatisticsDeltaService._type_of(key[0]) for key in delta if isinstance(key, tuple)
+        }
+        return {t: type_deltas[t] for t in affected}
+
+    @staticmethod
+    def _type_totals_after(db: Session, deltas: Dict[Month, Totals]) -> Dict[tuple, float]:
+        """Type totals of every affected ``(period, date, type)`` once all
+        ``deltas`` are applied.
+
+        The total before the change is recovered from a stored percentage when
+        possible; otherwise the total after the change is read from the table.
+        """
+        period_deltas: Dict[tuple, float] = defaultdict(float)
+        for month, delta in deltas.items():
+            month_end, year_end = StatisticsDeltaService._period_bounds(month)
+            for transaction_type, type_delta in StatisticsDeltaService._affected_types(delta).items():
+                for period, period_date in (
+                    (StatisticsPeriod.MONTHLY, month_end),
+                    (StatisticsPeriod.YEARLY, year_end),
+                    (StatisticsPeriod.ALL_TIME, None),
+                ):
+                    period_deltas[(period, period_date, transaction_type)] += type_delta
+
+        CS = CategoryStatistics
+        totals = {}
+        for (period, period_date, transaction_type), type_delta in period_deltas.items():
+            row = db.query(CS).filter(
+                CS.period == period,
+                CS.date == period_date,
+                CS.transaction_type == transaction_type,
+                CS.period_percentage != 0,
+            ).first()
+            if row is not None:
+                total = row.period_amount * 100 / row.period_percentage + type_delta
+            else:
+                total = StatisticsDeltaService._type_total(db, transaction_type, period, period_date)
+            totals[(period, period_date, transaction_type)] = 0 if abs(total) < ZERO_EPSILON else total
+        return totals
+
+    @staticmethod
+    def _update_percentages(db: Session, type_totals: Dict[tuple, float]):
+        """Recompute category percentages against the new type totals and drop
+        rows of categories left without transactions in their period."""
+        CS = CategoryStatistics
+        for (period, period_date, transaction_type), type_total in type_totals.items():
+            rows = db.query(CS).filter(
+                CS.period == period, CS.date == period_date, CS.transaction_type == transaction_type
+            ).all()
+            for row in rows:
+                row.period_percentage = (row.period_amount / type_total * 100) if type_total > 0 else 0
+                # Categories without transactions in the period have no row
+                if row.period_transaction_count == 0:
+                    db.delete(row)
+
+    @staticmethod
+    def _apply_category_delta(db: Session, month: Month, delta: dict):
+        categories = {key[0] for key in delta if isinstance(key, tuple)}
+        if not categories:
+            return
+
+        CS = CategoryStatistics
+        month_end, year_end = StatisticsDeltaService._period_bounds(month)
+
+        def of_category(query, cat):
+            return query.filter(CS.category_name == cat.value, CS.transaction_type == StatisticsDeltaService._type_of(cat))
+
+        # Later rows first: cumulative and year-to-date fields
+        for cat in categories:
+            amount, count = delta.get((cat, "amount"), 0), delta.get((cat, "count"), 0)
+            cumulative = {CS.total_amount: amount, CS.total_transaction_count: count}
+            year_to_date = {CS.yearly_amount: amount, CS.yearly_transaction_count: count}
+            monthly = of_category(db.query(CS), cat).filter(CS.period == StatisticsPeriod.MONTHLY)
+            yearly = of_category(db.query(CS), cat).filter(CS.period == StatisticsPeriod.YEARLY)
+            StatisticsDeltaService._shift(monthly.filter(CS.date > month_end), cumulative)
+            StatisticsDeltaService._shift(monthly.filter(CS.date > month_end, CS.date <= year_end), year_to_date)
+            StatisticsDeltaService._shift(yearly.filter(CS.date > year_end), cumulative)
+            StatisticsDeltaService._shift(yearly.filter(CS.date != year_end), year_to_date)
+
+        # Then the rows of the month, its year and all time. The all-time rows
+        # go last: a new YEARLY row takes its yearly figures from them.
+        for period, period_date in (
+            (StatisticsPeriod.MONTHLY, month_end),
+            (StatisticsPeriod.YEARLY, year_end),
+            (StatisticsPeriod.ALL_TIME, None),
+        ):
+            rows = {
+                (row.category_name, row.transaction_type): row
+                for row in db.query(CS).filter(CS.period == period, CS.date == period_date).all()
+            }
+            for cat in categories:
+                key = (cat.value, StatisticsDeltaService._type_of(cat))
+                if key not in rows:
+                    rows[key] = StatisticsDeltaService._new_category_row(db, cat, period, period_date)
+                row = rows[key]
+                amount, count = delta.get((cat, "amount"), 0), delta.get((cat, "count"), 0)
+                row.period_transaction_count += count
+                row.total_transaction_count += count
+                row.yearly_transaction_count += count
+                row.period_amount = _sum_of(row.period_amount + amount, row.period_transaction_count)
+                row.total_amount = _sum_of(row.total_amount + amount, row.total_transaction_count)
+                row.yearly_amount = _sum_of(row.yearly_amount + amount, row.yearly_transaction_count)
+                row.average_transaction_amount = (
+                    row.period_amount / row.period_transaction_count if row.period_transaction_count > 0 else 0
+                )
+            db.flush()
+
+    @staticmethod
+    def _type_of(category) -> TransactionType:
+        return TransactionType.EXPENSE if isinstance(category, ExpenseCategory) else TransactionType.INCOME
+
+    @staticmethod
+    def _new_category_row(db: Session, cat, period: StatisticsPeriod, period_date: Optional[date]) -> CategoryStatistics:
+        """Create the row of a category in a period it had no transactions in,
+        carrying over its cumulative and year-to-date figures."""
+        CS = CategoryStatistics
+        transaction_type = StatisticsDeltaService._type_of(cat)
+        row = CS(
+            period=period,
+            date=period_date,
+            category_name=cat.value,
+            transaction_type=transaction_type,
+            expense_type=cat.expense_type if transaction_type == TransactionType.EXPENSE else None,
+            period_percentage=0,
+            average_transaction_amount=0,
+            **{field: 0 for field in _CATEGORY_SUMS},
+        )
+        if period != StatisticsPeriod.ALL_TIME:
+            same_category = db.query(CS).filter(
+                CS.category_name == cat.value, CS.transaction_type == transaction_type
+            )
+            previous = same_category.filter(CS.period == period, CS.date < period_date).order_by(CS.date.desc()).first()
+            if previous is not None:
+                row.total_amount, row.total_transaction_count = previous.total_amount, previous.total_transaction_count
+            if period == StatisticsPeriod.MONTHLY:
+                if previous is not None and previous.date.year == period_date.year:
+                    row.yearly_amount = previous.yearly_amount
+                    row.yearly_transaction_count = previous.yearly_transaction_count
+            else:
+                # The yearly figures of YEARLY rows span all time
+                all_time = same_category.filter(CS.period == StatisticsPeriod.ALL_TIME).first()
+                if all_time is not None:
+                    row.yearly_amount = all_time.period_amount
+                    row.yearly_transaction_count = all_time.period_transaction_count
+        db.add(row)
+        return row
+
+    @staticmethod
+    def check_consistency(db: Session, tolerance: float = CONSISTENCY_TOLERANCE) -> dict:
+        """Compare the stored statistics with a full rebuild, without writing.
+
+        Returns ``{"consistent": bool, "drift": [...]}`` where each drift entry
+        names the row (table, period, date and, for categories, the category)
+        and either the field with its stored and expected value, or that the
+        row is missing or unexpected.
+        """
+        months = StatisticsRebuildService.monthly_totals(db)
+        drift: List[dict] = []
+
+        def compare(table, expected_rows, stored_rows, key_fields):
+            expected = {tuple(row[f] for f in key_fields): row for row in expected_rows}
+            stored = {
+                tuple(getattr(row, f) for f in key_fields): {c.name: getattr(row, c.name) for c in row.__table__.columns}
+                for row in stored_rows
+            }
+            for key in expected.keys() | stored.keys():
+                entry = {"table": table, **{f: StatisticsDeltaService._plain(v) for f, v in zip(key_fields, key)}}
+                if key not in stored:
+                    drift.append({**entry, "issue": "missing"})
+                    continue
+                if key not in expected:
+                    drift.append({**entry, "issue": "unexpected"})
+                    continue
+                for field, value in expected[key].items():
+                    actual = stored[key][field]
+                    if isinstance(value, (int, float)) and not isinstance(value, bool):
+                        if abs((actual or 0) - value) <= tolerance * max(1.0, abs(value)):
+                            continue
+                    elif actual == value:
+                        continue
+                    drift.append({
+                        **entry, "issue": "value", "field": field,
+                        "stored": StatisticsDeltaService._plain(actual),
+                        "expected": StatisticsDeltaService._plain(value),
+                    })
+
+        compare(
+            "financial_statistics",
+            StatisticsRebuildService.financial_statistics_rows(months),
+            db.query(FinancialStatistics).all(),
+            ("period", "date"),
+        )
+        category_rows = StatisticsRebuildService.category_statistics_rows(months)
+        compare(
+            "category_statistics",
+            category_rows,
+            db.query(CategoryStatistics).all(),
+            ("period", "date", "category_name", "transaction_type"),
+        )
+        compare(
+            "expense_type_statistics",
+            StatisticsRebuildService.expense_type_statistics_rows(category_rows),
+            db.query(ExpenseTypeStatistics).all(),
+            ("period", "date", "expense_type"),
+        )
+        if drift:
+            logger.warning(f"Statistics drift detected in {len(drift)} fields/rows")
+        return {"consistent": not drift, "drift": drift}
+
+    @staticmethod
+    def _plain(value):
+        """JSON-friendly representation of a key or field value."""
+        if hasattr(value, "value"):
+            return value.value
+        if isinstance(value, date):
+            return value.isoformat()
+        return value
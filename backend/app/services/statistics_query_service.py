@@ -0,0 +1,154 @@
+from datetime import date
+from typing import List, Optional
+import calendar
+import logging
+
+from sqlalchemy import func, extract, case, tuple_, and_
+from sqlalchemy.orm import Session
+
+from ..models.statistics import StatisticsPeriod
+from ..models.transaction import Transaction, TransactionType
+from .statistics_service import StatisticsService
+
+logger = logging.getLogger(__name__)
+
+
+class StatisticsQueryService:
+    """Financial statistics computed straight from the transactions.
+
+    Transactions are grouped per month and the cumulative and year-to-date
+    figures are window sums (``SUM(...) OVER (ORDER BY year, month)``) over
+    those monthly totals, so a whole timeseries is one query and one ordered
+    pass instead of a scan of the history per month.
+    """
+
+    @staticmethod
+    def _monthly_running_totals(db: Session):
+        """Subquery with one row per month with transactions: the month's
+        income, expenses and counts, then their running all-time and
+        year-to-date sums."""
+        year = extract('year', Transaction.transaction_date)
+        month = extract('month', Transaction.transaction_date)
+        # Any non-income transaction counts as an expense
+        is_income = Transaction.transaction_type == TransactionType.INCOME
+        monthly = db.query(
+            year.label('year'),
+            month.label('month'),
+            func.sum(case((is_income, Transaction.amount), else_=0)).label('income'),
+            func.sum(case((is_income, 0), else_=func.abs(Transaction.amount))).label('expenses'),
+            func.sum(case((is_income, 1), else_=0)).label('income_count'),
+            func.sum(case((is_income, 0), else_=1)).label('expense_count'),
+        ).filter(
+            Transaction.transaction_date != None  # noqa: E711
+        ).group_by(year, month).subquery()
+
+        order = (monthly.c.year, monthly.c.month)
+        return db.query(
+            monthly.c.year,
+            monthly.c.month,
+            monthly.c.income,
+            monthly.c.expenses,
+            monthly.c.income_count,
+            monthly.c.expense_count,
+            func.sum(monthly.c.income).over(order_by=order).label('total_income'),
+            func.sum(monthly.c.expenses).over(order_by=order).label('total_expenses'),
+            func.sum(monthly.c.income).over(partition_by=monthly.c.year, order_by=order).label('yearly_income'),
+            func.sum(monthly.c.expenses).over(partition_by=monthly.c.year, order_by=order).label('yearly_expenses'),
+            func.sum(monthly.c.income_count).over(order_by=order).label('total_income_count'),
+            func.sum(monthly.c.expense_count).over(order_by=order).label('total_expense_count'),
+            func.sum(monthly.c.income_count).over(partition_by=monthly.c.year, order_by=order).label('yearly_income_count'),
+            func.sum(monthly.c.expense_count).over(partition_by=monthly.c.year, order_by=order).label('yearly_expense_count'),
+        ).subquery()
+
+    @staticmethod
+    def monthly_running_totals(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> List[dict]:
+        """Return the monthly and running totals (``total_*`` since the first
+        month, ``yearly_*`` since January) of every month with transactions
+        whose last day lies in ``[start, end]``, in month order."""
+        running = StatisticsQueryService._monthly_running_totals(db)
+        # Filter after the window sums so cumulative totals include earlier months
+        query = db.query(running)
+        month_key = tuple_(running.c.year, running.c.month)
+        if start is not None:
+            query = query.filter(month_key >= (start.year, start.month))
+        if end is not None:
+            # The month of ``end`` only counts once it is complete
+            last_day = calendar.monthrange(end.year, end.month)[1]
+            if end.day == last_day:
+                query = query.filter(month_key <= (end.year, end.month))
+            else:
+                query = query.filter(month_key < (end.year, end.month))
+        rows = query.order_by(running.c.year, running.c.month).all()
+        return [
+            {**row._asdict(), 'year': int(row.year), 'month': int(row.month)}
+            for row in rows
+        ]
+
+    @staticmethod
+    def financial_timeseries(db: Session, start: Optional[date] = None, end: Optional[date] = None) -> List[dict]:
+        """Monthly ``FinancialStatisticsResponse`` dicts for ``[start, end]``,
+        computed in one query without the precomputed statistics rows."""
+        series = []
+        for month in StatisticsQueryService.monthly_running_totals(db, start, end):
+            month_end = date(month['year'], month['month'], calendar.monthrange(month['year'], month['month'])[1])
+            series.append({
+                'id': None,
+                'period': StatisticsPeriod.MONTHLY.value,
+                'date': month_end.isoformat(),
+                **StatisticsService._statistics_row(
+                    month['income'], month['expenses'], month['income_count'], month['expense_count'],
+                    month['total_income'], month['total_expenses'],
+                    month['yearly_income'], month['yearly_expenses'],
+                ),
+            })
+        return series
+
+    @staticmethod
+    def weekday_distribution(
+        db: Session,
+        transaction_type: Optional[TransactionType] = None,
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+    ) -> List[dict]:
+        """Count, total, min, max and median of the absolute amounts per
+        weekday (``0`` = Sunday, as ``strftime('%w')``) and kind (``expense``
+        for EXPENSE transactions, ``income`` for any other), over
+        ``[start, end]``.
+
+        Everything is aggregated in SQLite: the median comes from numbering
+        each group's amounts in order (``ROW_NUMBER() OVER``) and averaging
+        the one or two middle rows, so at most one row per weekday and kind
+        reaches Python whatever the size of the table.
+        """
+        weekday = extract('dow', Transaction.transaction_date)
+        kind = case((Transaction.transaction_type == TransactionType.EXPENSE, 'expense'), else_='income')
+        amount = func.abs(Transaction.amount)
+        filters = [Transaction.transaction_date != None]  # noqa: E711
+        if transaction_type is not None:
+            filters.append(Transaction.transaction_type == transaction_type)
+        if start is not None:
+            filters.append(Transaction.transaction_date >= start)
+        if end is not None:
+            filters.append(Transaction.transaction_date <= end)
+
+        group = (weekday, kind)
+        ranked = db.query(
+            weekday.label('weekday'),
+            kind.label('kind'),
+            amount.label('amount'),
+            func.row_number().over(partition_by=group, order_by=amount).label('position'),
+            func.count().over(partition_by=group).label('size'),
+        ).filter(*filters).subquery()
+
+        # The middle row, or the two middle rows of an even-sized group
+        middle = and_(ranked.c.position * 2 >= ranked.c.size, ranked.c.position * 2 <= ranked.c.size + 2)
+        rows = db.query(
+            ranked.c.weekday,
+            ranked.c.kind,
+            func.count().label('count'),
+            func.sum(ranked.c.amount).label('total'),
+            func.min(ranked.c.amount).label('min'),
+            func.max(ranked.c.amount).label('max'),
+            func.avg(case((middle, ranked.c.amount))).label('median'),
+        ).group_by(ranked.c.weekday, ranked.c.kind).all()
+        return [row._asdict() for row in rows]
@@ -0,0 +1,212 @@
+from collections import defaultdict
+from datetime import date
+from typing import Dict, List, Tuple
+import calendar
+import logging
+
+from sqlalchemy import func, extract, insert
+from sqlalchemy.orm import Session
+
+from ..models.statistics import FinancialStatistics, CategoryStatistics, StatisticsPeriod
+from ..models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
+from .statistics_service import StatisticsService
+
+logger = logging.getLogger(__name__)
+
+# Sums of one month (or of any span of months), keyed by metric:
+#   "income", "expenses", "income_count", "expense_count"   financial statistics
+#   "income_total", "expense_total"                         per-type totals for percentages
+#   (category, "amount"), (category, "count")               category statistics
+Totals = Dict[object, float]
+Month = Tuple[int, int]
+
+# CategoryStatistics fields summed into the expense type rollup
+_EXPENSE_TYPE_SUMS = ("period_amount", "period_transaction_count", "period_percentage", "total_amount",
+                      "total_transaction_count", "yearly_amount", "yearly_transaction_count")
+
+
+class StatisticsRebuildService:
+    """Rebuild the statistics tables from one grouped scan of the transactions.
+
+    ``StatisticsService.calculate_statistics`` and
+    ``calculate_category_statistics`` compute one period at a time and each
+    call rescans the history up to that period. Here the transactions are
+    aggregated once per month, transaction type and category; the monthly,
+    yearly, cumulative and all-time figures are running sums over those
+    monthly totals, with the same semantics as the per-period calculations.
+    The full and partial rebuilds and the consistency check all derive their
+    rows from these monthly totals.
+    """
+
+    @staticmethod
+    def monthly_totals(db: Session) -> Dict[Month, Totals]:
+        """Aggregate all transactions into ``{(year, month): totals}``."""
+        year = extract('year', Transaction.transaction_date)
+        month = extract('month', Transaction.transaction_date)
+        rows = db.query(
+            year,
+            month,
+            Transaction.transaction_type,
+            Transaction.expense_category,
+            Transaction.income_category,
+            func.sum(Transaction.amount),
+            func.sum(func.abs(Transaction.amount)),
+            func.count(Transaction.id),
+        ).filter(
+            Transaction.transaction_date != None  # noqa: E711
+        ).group_by(
+            year,
+            month,
+            Transaction.transaction_type,
+            Transaction.expense_category,
+            Transaction.income_category,
+        ).all()
+
+        months: Dict[Month, Totals] = defaultdict(lambda: defaultdict(int))
+        for row_year, row_month, transaction_type, expense_category, income_category, amount, abs_amount, count in rows:
+            StatisticsRebuildService.accumulate(
+                months[(int(row_year), int(row_month))],
+                transaction_type, expense_category, income_category, amount, abs_amount, count
+            )
+        return dict(months)
+
+    @staticmethod
+    def accumulate(totals: Totals, transaction_type, expense_category, income_category,
+                   amount: float, abs_amount: float, count: int) -> None:
+        """Add ``count`` transactions summing to ``amount`` (``abs_amount`` in
+        absolute value) to ``totals``; negative values subtract them."""
+        # Any non-income transaction counts as an expense
+        if transaction_type == TransactionType.INCOME:
+            totals["income"] += amount
+            totals["income_count"] += count
+            totals["income_total"] += amount
+        else:
+            totals["expenses"] += abs_amount
+            totals["expense_count"] += count
+            if transaction_type == TransactionType.EXPENSE:
+                totals["expense_total"] += abs_amount
+        # Categories are matched regardless of the transaction type
+        if expense_category is not None:
+            totals[(expense_category, "amount")] += abs_amount
+            totals[(expense_category, "count")] += count
+        if income_category is not None:
+            totals[(income_category, "amount")] += amount
+            totals[(income_category, "count")] += count
+
+    @staticmethod
+    def _add(target: Totals, source: Totals) -> None:
+        for key, value in source.items():
+            target[key] += value
+
+    @staticmethod
+    def _periods(months: Dict[Month, Totals]):
+        """Yield ``(period, date, period totals, cumulative totals, yearly totals)``
+        for every month and year with transactions, then for all time."""
+        all_time: Totals = defaultdict(int)
+        for totals in months.values():
+            StatisticsRebuildService._add(all_time, totals)
+
+        cumulative: Totals = defaultdict(int)
+        year_to_date: Totals = defaultdict(int)
+        ordered = sorted(months)
+        for index, (year, month) in enumerate(ordered):
+            if index == 0 or ordered[index - 1][0] != year:
+                year_to_date = defaultdict(int)
+            StatisticsRebuildService._add(cumulative, months[(year, month)])
+            StatisticsRebuildService._add(year_to_date, months[(year, month)])
+            month_end = date(year, month, calendar.monthrange(year, month)[1])
+            yield StatisticsPeriod.MONTHLY, month_end, months[(year, month)], dict(cumulative), dict(year_to_date)
+
+            if index == len(ordered) - 1 or ordered[index + 1][0] != year:
+                # The yearly figures of a YEARLY period span all time, as in
+                # StatisticsService.calculate_statistics
+                yield StatisticsPeriod.YEARLY, date(year, 12, 31), dict(year_to_date), dict(cumulative), all_time
+
+        yield StatisticsPeriod.ALL_TIME, None, all_time, all_time, all_time
+
+    @staticmethod
+    def financial_statistics_rows(months: Dict[Month, Totals]) -> List[dict]:
+        rows = []
+        for period, period_date, totals, cumulative, yearly in StatisticsRebuildService._periods(months):
+            rows.append({
+                'period': period,
+                'date': period_date,
+                **StatisticsService._statistics_row(
+                    totals.get("income", 0), totals.get("expenses", 0),
+                    totals.get("income_count", 0), totals.get("expense_count", 0),
+                    cumulative.get("income", 0), cumulative.get("expenses", 0),
+                    yearly.get("income", 0), yearly.get("expenses", 0),
+                ),
+            })
+        return rows
+
+    @staticmethod
+    def category_statistics_rows(months: Dict[Month, Totals]) -> List[dict]:
+        rows = []
+        for period, period_date, totals, cumulative, yearly in StatisticsRebuildService._periods(months):
+            for categories, type_total in ((ExpenseCategory, "expense_total"), (IncomeCategory, "income_total")):
+                for cat in categories:
+                    period_count = totals.get((cat, "count"), 0)
+                    if period_count == 0:
+                        continue
+                    rows.append({
+                        'period': period,
+                        'date': period_date,
+                        'expense_type': None,  # overwritten for expense categories
+                        **StatisticsService._category_row(
+                            cat, totals[(cat, "amount")], period_count, totals.get(type_total, 0),
+                            cumulative.get((cat, "amount"), 0), cumulative.get((cat, "count"), 0),
+                            yearly.get((cat, "amount"), 0), yearly.get((cat, "count"), 0),
+                        ),
+                    })
+        return rows
+
+    @staticmethod
+    def expense_type_statistics_rows(category_rows: List[dict]) -> List[dict]:
+        """Sum expense category rows per period, date and expense type, as
+        ``StatisticsService.refresh_expense_type_statistics`` does in SQL."""
+        sums: Dict[tuple, Totals] = defaultdict(lambda: defaultdict(int))
+        for row in category_rows:
+            if row['transaction_type'] != TransactionType.EXPENSE or row['expense_type'] is None:
+                continue
+            totals = sums[(row['period'], row['date'], row['expense_type'])]
+            for field in _EXPENSE_TYPE_SUMS:
+                totals[field] += row[field]
+
+        rows = []
+        for (period, period_date, expense_type), totals in sums.items():
+            count = totals['period_transaction_count']
+            rows.append({
+                'period': period,
+                'date': period_date,
+                'expense_type': expense_type,
+                **totals,
+                'average_transaction_amount': totals['period_amount'] / count if count > 0 else 0,
+            })
+        return rows
+
+    @staticmethod
+    def rebuild_financial_statistics(db: Session, months: Dict[Month, Totals] = None) -> int:
+        """Replace all ``FinancialStatistics`` rows; the caller commits."""
+        if months is None:
+            months = StatisticsRebuildService.monthly_totals(db)
+        rows = StatisticsRebuildService.financial_statistics_rows(months)
+        db.query(FinancialStatistics).delete()
+        if rows:
+            db.execute(insert(FinancialStatistics), rows)
+        logger.info(f"Rebuilt {len(rows)} financial statistics rows")
+        return len(rows)
+
+    @staticmethod
+    def rebuild_category_statistics(db: Session, months: Dict[Month, Totals] = None) -> int:
+        """Replace all ``CategoryStatistics`` rows and their expense type
+        rollup; the caller commits."""
+        if months is None:
+            months = StatisticsRebuildService.monthly_totals(db)
+        rows = StatisticsRebuildService.category_statistics_rows(months)
+        db.query(CategoryStatistics).delete()
+        if rows:
+            db.execute(insert(CategoryStatistics), rows)
+        StatisticsService.refresh_expense_type_statistics(db)
+        logger.info(f"Rebuilt {len(rows)} category statistics rows from {len(months)} months")
+        return len(rows)
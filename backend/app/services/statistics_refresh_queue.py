@@ -0,0 +1,313 @@
+from datetime import datetime
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Set, Tuple
+import os
+import threading
+import time
+import logging
+
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..models.statistics import StatisticsDirtyMonth
+from .data_version import data_version
+from .statistics_delta_service import StatisticsDeltaService, TransactionSnapshot
+from .statistics_rebuild_service import StatisticsRebuildService, Month, Totals
+
+logger = logging.getLogger(__name__)
+
+# Quiet time (seconds) after the last mark before dirty months are refreshed;
+# 0 applies every change synchronously
+STATISTICS_REFRESH_DELAY = float(os.getenv("STATISTICS_REFRESH_DELAY", "2.0"))
+# A steady stream of edits delays the refresh by at most this many delays
+MAX_WAIT_FACTOR = 5
+# Dirty-month ids looked up or deleted per statement
+DIRTY_ID_CHUNK = 500
+
+Change = Tuple[Optional[TransactionSnapshot], Optional[TransactionSnapshot]]
+
+
+class _Batch(NamedTuple):
+    """The changes of one ``mark_many`` call: their merged per-month deltas,
+    how many there are and the ``StatisticsDirtyMonth`` rows recording them
+    (empty when they were not persisted)."""
+    deltas: Dict[Month, Totals]
+    changes: int
+    dirty_ids: Tuple[int, ...]
+
+
+class StatisticsRefreshQueue:
+    """Dirty-month tracker that refreshes the statistics tables after bursts of edits.
+
+    Mutations commit the transaction change only and ``mark`` it here; the
+    per-month deltas of all marked changes are merged, so 50 recategorizations
+    within a burst update each affected month once. A daemon thread applies
+    them after ``delay`` seconds without new marks (or ``MAX_WAIT_FACTOR``
+    delays after the first one). Readers call ``flush`` for fresh figures or
+    accept stale ones, reported by ``status``.
+
+    Pending deltas live in memory only; ``persist`` records the affected
+    months in the edit's own transaction so that changes a crashed process
+    never applied are found by ``recover`` at the next start. A refresh
+    deletes those rows in the transaction that applies the changes, and a
+    full rebuild deletes them all: marked changes whose rows are gone are
+    covered by a rebuild and skipped.
+    """
+
+    def __init__(self, session_factory=SessionLocal, delay: float = STATISTICS_REFRESH_DELAY):
+        self.session_factory = session_factory
+        self.delay = delay
+        self._batches: List[_Batch] = []
+        self._pending_changes = 0
+        # Changes taken by a refresh that has not committed yet
+        self._applying_changes = 0
+        self._dirty_since: Optional[float] = None
+        self._last_mark: Optional[float] = None
+        self.last_refresh: Optional[datetime] = None
+        self.refresh_count = 0
+        self._condition = threading.Condition()
+        # Serializes refreshes and rebuilds so merged deltas are applied in mark order
+        self._flush_lock = threading.Lock()
+        self._worker: Optional[threading.Thread] = None
+
+    @staticmethod
+    def persist(db: Session, changes: Iterable[Change]) -> List[int]:
+        """Record the months ``changes`` touch in ``db``'s transaction, before
+        the caller commits it; pass the returned ids to ``mark``/``mark_many``
+        after the commit."""
+        months = sorted({
+            (snapshot.transaction_date.year, snapshot.transaction_date.month)
+            for change in changes
+            for snapshot in change
+            if snapshot is not None and snapshot.transaction_date is not None
+        })
+        rows = [StatisticsDirtyMonth(year=year, month=month) for year, month in months]
+        db.add_all(rows)
+        db.flush()
+        return [row.id for row in rows]
+
+    def mark(self, before: Optional[TransactionSnapshot], after: Optional[TransactionSnapshot],
+             dirty_ids: Sequence[int] = ()):
+        """Record a committed change of one transaction from ``before`` to ``after``."""
+        self.mark_many([(before, after)], dirty_ids)
+
+    def mark_many(self, changes: Iterable[Change], dirty_ids: Sequence[int] = ()):
+        """Record several committed ``(before, after)`` changes as one burst;
+        ``dirty_ids`` are the rows ``persist`` wrote for them."""
+        deltas: Dict[Month, Totals] = {}
+        count = 0
+        for before, after in changes:
+            StatisticsDeltaService.merge_deltas(deltas, StatisticsDeltaService.deltas(before, after))
+            count += 1
+        if not count:
+            return
+        with self._condition:
+            self._batches.append(_Batch(deltas, count, tuple(dirty_ids)))
+            self._pending_changes += count
+            now = time.monotonic()
+            self._dirty_since = self._dirty_since or now
+            self._last_mark = now
+            # Responses cached since the commit would report fresh statistics
+            data_version.bump()
+            if self.delay > 0:
+                self._start_worker()
+                self._condition.notify()
+        if self.delay <= 0:
+            self.flush()
+
+    def _start_worker(self):
+        if self._worker is None or not self._worker.is_alive():
+            self._worker = threading.Thread(target=self._run, name="statistics-refresh", daemon=True)
+            self._worker.start()
+
+    def _due_in(self) -> Optional[float]:
+        """Seconds until the pending changes are due, ``None`` if there are none."""
+        if self._dirty_since is None:
+            return None
+        now = time.monotonic()
+        return max(0.0, min(self._last_mark + self.delay, self._dirty_since + MAX_WAIT_FACTOR * self.delay) - now)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                due_in = self._due_in()
+                while due_in is None or due_in > 0:
+                    self._condition.wait(due_in)
+                    due_in = self._due_in()
+            try:
+                self.flush()
+            except Exception as e:
+                # The changes were put back; retry after the next delay
+                logger.error(f"Background statistics refresh failed: {str(e)}")
+                time.sleep(self.delay)
+
+    def _take(self) -> List[_Batch]:
+        with self._condition:
+            batches = self._batches
+            self._batches, self._pending_changes = [], 0
+            self._applying_changes = sum(batch.changes for batch in batches)
+            self._dirty_since = self._last_mark = None
+            return batches
+
+    def _requeue(self, batches: List[_Batch]):
+        """Put back changes a failed refresh took, to be retried after the delay."""
+        with self._condition:
+            self._batches[:0] = batches
+            self._pending_changes += sum(batch.changes for batch in batches)
+            now = time.monotonic()
+            self._dirty_since = self._dirty_since or now
+            self._last_mark = now
+
+    @staticmethod
+    def _chunks(ids: Sequence[int]):
+        for start in range(0, len(ids), DIRTY_ID_CHUNK):
+            yield ids[start:start + DIRTY_ID_CHUNK]
+
+    @staticmethod
+    def _existing_ids(session: Session, ids: Sequence[int]) -> Set[int]:
+        existing = set()
+        for chunk in StatisticsRefreshQueue._chunks(ids):
+            existing.update(
+                row_id for (row_id,) in
+                session.query(StatisticsDirtyMonth.id).filter(StatisticsDirtyMonth.id.in_(chunk))
+            )
+        return existing
+
+    @staticmethod
+    def _uncovered(session: Session, batches: List[_Batch]) -> List[_Batch]:
+        """The batches not already covered by a rebuild, which deleted their rows."""
+        existing = StatisticsRefreshQueue._existing_ids(
+            session, [row_id for batch in batches for row_id in batch.dirty_ids]
+        )
+        return [batch for batch in batches if not batch.dirty_ids or batch.dirty_ids[0] in existing]
+
+    def flush(self, db: Optional[Session] = None) -> int:
+        """Apply all pending changes now and commit; return how many were applied.
+
+        If the deltas cannot be applied the statistics are rebuilt from the
+        transactions instead, in one transaction. If that fails too nothing
+        is committed and the changes stay pending.
+        """
+        with self._flush_lock:
+            return self._flush(db)
+
+    def _flush(self, db: Optional[Session]) -> int:
+        batches = self._take()
+        if not batches:
+            return 0
+
+        changes = sum(batch.changes for batch in batches)
+        try:
+            session = db if db is not None else self.session_factory()
+            try:
+                start = time.perf_counter()
+                batches = self._uncovered(session, batches)
+                changes = sum(batch.changes for batch in batches)
+                deltas: Dict[Month, Totals] = {}
+                for batch in batches:
+                    StatisticsDeltaService.merge_deltas(deltas, batch.deltas)
+                try:
+                    StatisticsDeltaService.apply_deltas(session, deltas)
+                    for chunk in self._chunks([row_id for batch in batches for row_id in batch.dirty_ids]):
+                        session.query(StatisticsDirtyMonth).filter(
+                            StatisticsDirtyMonth.id.in_(chunk)
+                        ).delete(synchronize_session=False)
+                    session.commit()
+                except Exception as e:
+                    session.rollback()
+                    logger.error(f"Could not apply {changes} statistics changes, rebuilding: {str(e)}")
+                    self._rebuild(session)
+                self.last_refresh = datetime.now()
+                self.refresh_count += 1
+                logger.info(
+                    f"Refreshed statistics of {len(deltas)} months for {changes} changes "
+                    f"in {(time.perf_counter() - start) * 1000:.1f}ms"
+                )
+                return changes
+            finally:
+                if db is None:
+                    session.close()
+        except Exception as e:
+            logger.error(f"Statistics refresh failed, keeping {changes} changes pending: {str(e)}")
+            self._requeue(batches)
+            raise
+        finally:
+            with self._condition:
+                self._applying_changes = 0
+
+    @staticmethod
+    def _rebuild(session: Session):
+        """Rebuild all statistics tables from the transactions and commit them
+        together, clearing every recorded dirty month."""
+        try:
+            StatisticsRebuildService.rebuild_financial_statistics(session)
+            StatisticsRebuildService.rebuild_category_statistics(session)
+            session.query(StatisticsDirtyMonth).delete(synchronize_session=False)
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+
+    def recover(self, db: Optional[Session] = None) -> int:
+        """Rebuild the statistics if a previous process left recorded changes
+        unapplied (e.g. it was killed within the refresh delay); return the
+        number of dirty months found.
+
+        The whole history is rebuilt rather than the dirty months alone: the
+        cumulative and year-to-date figures of every later month depend on
+        them, and the rebuild is one grouped scan.
+        """
+        with self._flush_lock:
+            session = db if db is not None else self.session_factory()
+            try:
+                dirty = session.query(StatisticsDirtyMonth.year, StatisticsDirtyMonth.month).distinct().all()
+                if not dirty:
+                    return 0
+                months = sorted(f"{year:04d}-{month:02d}" for year, month in dirty)
+                logger.warning(f"Unapplied statistics changes found for months {months}, rebuilding statistics")
+                self._rebuild(session)
+                return len(dirty)
+            finally:
+                if db is None:
+                    session.close()
+
+    def rebuild(self, db: Optional[Session] = None) -> int:
+        """Rebuild all statistics from the transactions and drop the pending
+        changes, which are committed and so covered by the rebuild; return
+        how many were dropped.
+
+        Holds the refresh lock throughout so no refresh applies them on top
+        of the rebuilt figures. If the rebuild fails they stay pending.
+        """
+        with self._flush_lock:
+            batches = self._take()
+            session = db if db is not None else self.session_factory()
+            try:
+                self._rebuild(session)
+                self.last_refresh = datetime.now()
+                return sum(batch.changes for batch in batches)
+            except Exception as e:
+                logger.error(f"Statistics rebuild failed: {str(e)}")
+                self._requeue(batches)
+                raise
+            finally:
+                with self._condition:
+                    self._applying_changes = 0
+                if db is None:
+                    session.close()
+
+    def status(self) -> dict:
+        with self._condition:
+            return {
+                "stale": self._pending_changes + self._applying_changes > 0,
+                "pending_changes": self._pending_changes,
+                "pending_months": sorted({
+                    f"{year:04d}-{month:02d}" for batch in self._batches for year, month in batch.deltas
+                }),
+                "dirty_seconds": (
+                    round(time.monotonic() - self._dirty_since, 3) if self._dirty_since is not None else 0.0
+                ),
+                "last_refresh": self.last_refresh.isoformat() if self.last_refresh else None,
+            }
+
+
+statistics_refresh_queue = StatisticsRefreshQueue()
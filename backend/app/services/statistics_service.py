@@ -1,9 +1,10 @@
 from sqlalchemy.orm import Session
 from datetime import date
 import calendar
-from ..models.statistics import FinancialStatistics, CategoryStatistics, StatisticsPeriod
+from ..models.statistics import FinancialStatistics, CategoryStatistics, ExpenseTypeStatistics, StatisticsPeriod
 from ..models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
-from sqlalchemy import func, extract, and_, or_, text
+from sqlalchemy import func, and_, or_, text, case, insert, select
+from .period_range import date_filters, period_range, cumulative_range, year_to_date_range
 import logging
 
 # Set up logging
@@ -11,83 +12,66 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class StatisticsService:
+    @staticmethod
+    def _sum_by_type(query):
+        """Aggregate ``query`` (a filtered ``Transaction`` query) in one statement.
+
+        Returns ``(income, expenses, income_count, expense_count)``; like the
+        rest of the statistics, every non-income transaction counts as an
+        expense, by absolute amount.
+        """
+        is_income = Transaction.transaction_type == TransactionType.INCOME
+        income, expenses, income_count, expense_count = query.with_entities(
+            func.coalesce(func.sum(case((is_income, Transaction.amount), else_=0)), 0),
+            func.coalesce(func.sum(case((is_income, 0), else_=func.abs(Transaction.amount))), 0),
+            func.coalesce(func.sum(case((is_income, 1), else_=0)), 0),
+            func.coalesce(func.sum(case((is_income, 0), else_=1)), 0),
+        ).one()
+        return income, expenses, income_count, expense_count
+
     @staticmethod
     def calculate_statistics(db: Session, period: StatisticsPeriod, target_date: date = None):
-        # Base query for period-specific stats
-        period_query = db.query(Transaction)
-        
-        # Base query for cumulative stats
-        cumulative_query = db.query(Transaction)
-        
-        # New: Base query for yearly stats
-        yearly_query = db.query(Transaction)
+        # Half-open date ranges keep the transaction_date index usable
+        transaction_date = Transaction.transaction_date
+        period_query = db.query(Transaction).filter(
+            *date_filters(transaction_date, period_range(period, target_date))
+        )
+        cumulative_query = db.query(Transaction).filter(
+            *date_filters(transaction_date, cumulative_range(period, target_date))
+        )
+        yearly_query = db.query(Transaction).filter(
+            *date_filters(transaction_date, year_to_date_range(period, target_date))
+        )
         
-        if period != StatisticsPeriod.ALL_TIME:
-            if period == StatisticsPeriod.MONTHLY:
-                period_query = period_query.filter(
-                    extract('year', Transaction.transaction_date) == target_date.year,
-                    extract('month', Transaction.transaction_date) == target_date.month
-                )
-                cumulative_query = cumulative_query.filter(
-                    Transaction.transaction_date <= target_date.replace(day=calendar.monthrange(target_date.year, target_date.month)[1])
-                )
-                yearly_query = yearly_query.filter(
-                    extract('year', Transaction.transaction_date) == target_date.year,
-                    Transaction.transaction_date <= target_date.replace(
-                        day=calendar.monthrange(target_date.year, target_date.month)[1]
-                    )
-                )
-            elif period == StatisticsPeriod.YEARLY:
-                period_query = period_query.filter(
-                    extract('year', Transaction.transaction_date) == target_date.year
-                )
-                cumulative_query = cumulative_query.filter(
-                    Transaction.transaction_date <= date(target_date.year, 12, 31)
-                )
+        # Calculate period-specific, cumulative and yearly stats
+        period_income, period_expenses, income_count, expense_count = StatisticsService._sum_by_type(period_query)
+        total_income, total_expenses, _, _ = StatisticsService._sum_by_type(cumulative_query)
+        yearly_income, yearly_expenses, _, _ = StatisticsService._sum_by_type(yearly_query)
         
-        # Calculate period-specific stats
-        period_transactions = period_query.all()
+        return StatisticsService._statistics_row(
+            period_income, period_expenses, income_count, expense_count,
+            total_income, total_expenses, yearly_income, yearly_expenses
+        )
+
+    @staticmethod
+    def _statistics_row(period_income, period_expenses, income_count, expense_count,
+                        total_income, total_expenses, yearly_income, yearly_expenses) -> dict:
+        """Build a ``FinancialStatistics`` value dict, deriving savings and averages."""
         period_stats = {
-            'period_income': 0,
-            'period_expenses': 0,
-            'income_count': 0,
-            'expense_count': 0
+            'period_income': period_income,
+            'period_expenses': period_expenses,
+            'income_count': income_count,
+            'expense_count': expense_count
         }
-        
-        for trans in period_transactions:
-            if trans.transaction_type == TransactionType.INCOME:
-                period_stats['period_income'] += trans.amount
-                period_stats['income_count'] += 1
-            else:
-                period_stats['period_expenses'] += abs(trans.amount)
-                period_stats['expense_count'] += 1
-        
-        # Calculate cumulative stats
-        cumulative_transactions = cumulative_query.all()
         cumulative_stats = {
-            'total_income': 0,
-            'total_expenses': 0
+            'total_income': total_income,
+            'total_expenses': total_expenses
         }
-        
-        for trans in cumulative_transactions:
-            if trans.transaction_type == TransactionType.INCOME:
-                cumulative_stats['total_income'] += trans.amount
-            else:
-                cumulative_stats['total_expenses'] += abs(trans.amount)
-        
-        # New: Calculate yearly stats
-        yearly_transactions = yearly_query.all()
         yearly_stats = {
-            'yearly_income': 0,
-            'yearly_expenses': 0
+            'yearly_income': yearly_income,
+            'yearly_expenses': yearly_expenses
         }
         
-        for trans in yearly_transactions:
-            if trans.transaction_type == TransactionType.INCOME:
-                yearly_stats['yearly_income'] += trans.amount
-            else:
-                yearly_stats['yearly_expenses'] += abs(trans.amount)
-        
         # Calculate derived statistics
         period_stats['period_net_savings'] = period_stats['period_income'] - period_stats['period_expenses']
         period_stats['savings_rate'] = (period_stats['period_net_savings'] / period_stats['period_income'] * 100) if period_stats['period_income'] > 0 else 0
@@ -101,46 +85,44 @@ class StatisticsService:
         # Combine all stats
         return {**period_stats, **cumulative_stats, **yearly_stats}
 
+    @staticmethod
+    def _category_row(category, period_amount, period_count, period_type_total,
+                      total_amount, total_count, yearly_amount, yearly_count) -> dict:
+        """Build a ``CategoryStatistics`` value dict for an expense or income
+        category; ``period_type_total`` is the period total of its transaction
+        type, used for the percentage."""
+        # Calculate percentage of the period total
+        period_percentage = (period_amount / period_type_total * 100) if period_type_total > 0 else 0
+        
+        # Average transaction amount
+        avg_amount = period_amount / period_count if period_count > 0 else 0
+        
+        row = {
+            'category_name': category.value,
+            'transaction_type': TransactionType.EXPENSE if isinstance(category, ExpenseCategory) else TransactionType.INCOME,
+            'period_amount': period_amount,
+            'period_transaction_count': period_count,
+            'period_percentage': period_percentage,
+            'total_amount': total_amount,
+            'total_transaction_count': total_count,
+            'average_transaction_amount': avg_amount,
+            'yearly_amount': yearly_amount,
+            'yearly_transaction_count': yearly_count
+        }
+        if isinstance(category, ExpenseCategory):
+            row['expense_type'] = category.expense_type  # essential or discretionary
+        return row
+
     @staticmethod
     def calculate_category_statistics(db: Session, period: StatisticsPeriod, target_date: date = None):
         """
         Calculate statistics for each category for the given period
         """
-        # Base queries for different time periods
-        period_query = db.query(Transaction)
-        cumulative_query = db.query(Transaction)
+        # Build filters based on period, as half-open date ranges
+        period_filters = date_filters(Transaction.transaction_date, period_range(period, target_date))
+        cumulative_filters = date_filters(Transaction.transaction_date, cumulative_range(period, target_date))
+        yearly_filters = date_filters(Transaction.transaction_date, year_to_date_range(period, target_date))
         
-        # Apply time filters
-        if period != StatisticsPeriod.ALL_TIME:
-            if period == StatisticsPeriod.MONTHLY:
-                period_query = period_query.filter(
-                    extract('year', Transaction.transaction_date) == target_date.year,
-                    extract('month', Transaction.transaction_date) == target_date.month
-                )
-                cumulative_query = cumulative_query.filter(
-                    Transaction.transaction_date <= target_date.replace(day=calendar.monthrange(target_date.year, target_date.month)[1])
-                )
-            elif period == StatisticsPeriod.YEARLY:
-                period_query = period_query.filter(
-                    extract('year', Transaction.transaction_date) == target_date.year
-                )
-                cumulative_query = cumulative_query.filter(
-                    Transaction.transaction_date <= date(target_date.year, 12, 31)
-                )
-        
-        # Build filters based on period
-        period_filters = []
-        if period != StatisticsPeriod.ALL_TIME:
-            if period == StatisticsPeriod.MONTHLY:
-                period_filters = [
-                    extract('year', Transaction.transaction_date) == target_date.year,
-                    extract('month', Transaction.transaction_date) == target_date.month
-                ]
-            elif period == StatisticsPeriod.YEARLY:
-                period_filters = [
-                    extract('year', Transaction.transaction_date) == target_date.year
-                ]
-                
         # Get period totals for percentage calculations
         period_income_total = db.query(func.sum(Transaction.amount)).filter(
             Transaction.transaction_type == TransactionType.INCOME,
@@ -166,23 +148,6 @@ class StatisticsService:
                 *period_filters
             ).scalar() or 0
             
-            # Calculate percentage of total expenses
-            period_percentage = (period_amount / period_expense_total * 100) if period_expense_total > 0 else 0
-            
-            # Build cumulative filters
-            cumulative_filters = []
-            if period != StatisticsPeriod.ALL_TIME:
-                if period == StatisticsPeriod.MONTHLY:
-                    cumulative_filters = [
-                        Transaction.transaction_date <= target_date.replace(
-                            day=calendar.monthrange(target_date.year, target_date.month)[1]
-                        )
-                    ]
-                elif period == StatisticsPeriod.YEARLY:
-                    cumulative_filters = [
-                        Transaction.transaction_date <= date(target_date.year, 12, 31)
-                    ]
-            
             # Cumulative stats
             total_amount = db.query(func.sum(func.abs(Transaction.amount))).filter(
                 Transaction.expense_category == cat,
@@ -194,18 +159,6 @@ class StatisticsService:
                 *cumulative_filters
             ).scalar() or 0
             
-            # Build yearly filters
-            yearly_filters = []
-            if period != StatisticsPeriod.ALL_TIME and period != StatisticsPeriod.YEARLY:
-                # For monthly, we still need yearly stats
-                if period == StatisticsPeriod.MONTHLY:
-                    yearly_filters = [
-                        extract('year', Transaction.transaction_date) == target_date.year,
-                        Transaction.transaction_date <= target_date.replace(
-                            day=calendar.monthrange(target_date.year, target_date.month)[1]
-                        )
-                    ]
-            
             # Yearly stats
             yearly_amount = db.query(func.sum(func.abs(Transaction.amount))).filter(
                 Transaction.expense_category == cat,
@@ -217,22 +170,10 @@ class StatisticsService:
                 *yearly_filters
             ).scalar() or 0
             
-            # Average transaction amount
-            avg_amount = period_amount / period_count if period_count > 0 else 0
-            
-            expense_categories.append({
-                'category_name': cat.value,
-                'transaction_type': TransactionType.EXPENSE,
-                'expense_type': cat.expense_type,  # Add the expense type (essential or discretionary)
-                'period_amount': period_amount,
-                'period_transaction_count': period_count,
-                'period_percentage': period_percentage,
-                'total_amount': total_amount,
-                'total_transaction_count': total_count,
-                'average_transaction_amount': avg_amount,
-                'yearly_amount': yearly_amount if StatisticsPeriod.MONTHLY else period_amount,
-                'yearly_transaction_count': yearly_count if StatisticsPeriod.MONTHLY else period_count
-            })
+            expense_categories.append(StatisticsService._category_row(
+                cat, period_amount, period_count, period_expense_total,
+                total_amount, total_count, yearly_amount, yearly_count
+            ))
         
         # Get all income categories
         income_categories = []
@@ -248,23 +189,6 @@ class StatisticsService:
                 *period_filters
             ).scalar() or 0
             
-            # Calculate percentage of total income
-            period_percentage = (period_amount / period_income_total * 100) if period_income_total > 0 else 0
-            
-            # Build cumulative filters (reusing from above)
-            cumulative_filters = []
-            if period != StatisticsPeriod.ALL_TIME:
-                if period == StatisticsPeriod.MONTHLY:
-                    cumulative_filters = [
-                        Transaction.transaction_date <= target_date.replace(
-                            day=calendar.monthrange(target_date.year, target_date.month)[1]
-                        )
-                    ]
-                elif period == StatisticsPeriod.YEARLY:
-                    cumulative_filters = [
-                        Transaction.transaction_date <= date(target_date.year, 12, 31)
-                    ]
-                    
             # Cumulative stats
             total_amount = db.query(func.sum(Transaction.amount)).filter(
                 Transaction.income_category == cat,
@@ -276,18 +200,6 @@ class StatisticsService:
                 *cumulative_filters
             ).scalar() or 0
             
-            # Build yearly filters (reusing from above)
-            yearly_filters = []
-            if period != StatisticsPeriod.ALL_TIME and period != StatisticsPeriod.YEARLY:
-                # For monthly, we still need yearly stats
-                if period == StatisticsPeriod.MONTHLY:
-                    yearly_filters = [
-                        extract('year', Transaction.transaction_date) == target_date.year,
-                        Transaction.transaction_date <= target_date.replace(
-                            day=calendar.monthrange(target_date.year, target_date.month)[1]
-                        )
-                    ]
-            
             # Yearly stats
             yearly_amount = db.query(func.sum(Transaction.amount)).filter(
                 Transaction.income_category == cat,
@@ -299,21 +211,10 @@ class StatisticsService:
                 *yearly_filters
             ).scalar() or 0
             
-            # Average transaction amount
-            avg_amount = period_amount / period_count if period_count > 0 else 0
-            
-            income_categories.append({
-                'category_name': cat.value,
-                'transaction_type': TransactionType.INCOME,
-                'period_amount': period_amount,
-                'period_transaction_count': period_count,
-                'period_percentage': period_percentage,
-                'total_amount': total_amount,
-                'total_transaction_count': total_count,
-                'average_transaction_amount': avg_amount,
-                'yearly_amount': yearly_amount if StatisticsPeriod.MONTHLY else period_amount,
-                'yearly_transaction_count': yearly_count if StatisticsPeriod.MONTHLY else period_count
-            })
+            income_categories.append(StatisticsService._category_row(
+                cat, period_amount, period_count, period_income_total,
+                total_amount, total_count, yearly_amount, yearly_count
+            ))
         
         return expense_categories + income_categories
 
@@ -467,79 +368,75 @@ class StatisticsService:
                     db.add(cat_stat)
             
             db.flush()
+            StatisticsService.refresh_expense_type_statistics(db, monthly_date)
                 
         except Exception as e:
             logger.error(f"Error updating category statistics: {str(e)}")
             raise e
 
+    @staticmethod
+    def refresh_expense_type_statistics(db: Session, since: date = None):
+        """
+        Recompute the ``ExpenseTypeStatistics`` rollup from the expense
+        ``CategoryStatistics`` rows, in one INSERT ... SELECT.
+
+        With ``since`` (a month end) only the rows a change in that month can
+        affect are replaced: monthly rows from that month on, and the yearly
+        and all-time rows (the yearly figures of YEARLY rows span all time).
+        Nothing is committed.
+        """
+        CS = CategoryStatistics
+        ETS = ExpenseTypeStatistics
+
+        def scope(model):
+            if since is None:
+                return []
+            return [or_(
+                and_(model.period == StatisticsPeriod.MONTHLY, model.date >= since),
+                model.period != StatisticsPeriod.MONTHLY,
+            )]
+
+        db.query(ETS).filter(*scope(ETS)).delete(synchronize_session=False)
+
+        period_amount = func.sum(CS.period_amount)
+        period_count = func.sum(CS.period_transaction_count)
+        rollup = select(
+            CS.period,
+            CS.date,
+            CS.expense_type,
+            period_amount,
+            period_count,
+            func.sum(CS.period_percentage),
+            func.sum(CS.total_amount),
+            func.sum(CS.total_transaction_count),
+            case((period_count > 0, period_amount / period_count), else_=0),
+            func.sum(CS.yearly_amount),
+            func.sum(CS.yearly_transaction_count),
+        ).where(
+            CS.transaction_type == TransactionType.EXPENSE,
+            CS.expense_type != None,  # noqa: E711
+            *scope(CS)
+        ).group_by(CS.period, CS.date, CS.expense_type)
+
+        db.execute(insert(ETS).from_select([
+            'period', 'date', 'expense_type',
+            'period_amount', 'period_transaction_count', 'period_percentage',
+            'total_amount', 'total_transaction_count', 'average_transaction_amount',
+            'yearly_amount', 'yearly_transaction_count',
+        ], rollup))
+
     @staticmethod
     def initialize_statistics(db: Session):
         """Initialize financial statistics for all existing transactions"""
+        # Imported here: the rebuild service builds on this module
+        from .statistics_rebuild_service import StatisticsRebuildService
         try:
             # Lock the database to prevent any concurrent modifications during initialization
             # This is an administrative operation that should run when the system is not heavily used
             db.execute(text("BEGIN"))
             
-            # Clear existing financial statistics
-            db.query(FinancialStatistics).delete()
-            db.flush()
-            
-            # Get all unique months from transactions
-            months = db.query(
-                extract('year', Transaction.transaction_date).label('year'),
-                extract('month', Transaction.transaction_date).label('month')
-            ).distinct().all()
-            
-            # Get all unique years from transactions
-            years = db.query(
-                extract('year', Transaction.transaction_date).label('year')
-            ).distinct().all()
-            
-            # Initialize monthly statistics for each month
-            for year, month in months:
-                # set day to the last day of the month
-                date_obj = date(year=int(year), month=int(month), day=calendar.monthrange(int(year), int(month))[1])
-                
-                # Monthly stats
-                monthly_stats = FinancialStatistics(
-                    period=StatisticsPeriod.MONTHLY,
-                    date=date_obj
-                )
-                db.add(monthly_stats)
-                
-                # Calculate statistics
-                monthly_data = StatisticsService.calculate_statistics(db, StatisticsPeriod.MONTHLY, date_obj)
-                
-                # Update the statistics objects
-                for key, value in monthly_data.items():
-                    setattr(monthly_stats, key, value)
-            
-            # Initialize yearly statistics for each year
-            for (year,) in years:
-                # set day to the last day of the year
-                date_obj = date(year=int(year), month=12, day=31)
-                
-                # Yearly stats
-                yearly_stats = FinancialStatistics(
-                    period=StatisticsPeriod.YEARLY,
-                    date=date_obj
-                )
-                db.add(yearly_stats)
-                
-                # Calculate statistics
-                yearly_data = StatisticsService.calculate_statistics(db, StatisticsPeriod.YEARLY, date_obj)
-                
-                # Update the statistics objects
-                for key, value in yearly_data.items():
-                    setattr(yearly_stats, key, value)
-            
-            # Initialize all-time statistics
-            all_time_stats = FinancialStatistics(period=StatisticsPeriod.ALL_TIME)
-            db.add(all_time_stats)
-            all_time_data = StatisticsService.calculate_statistics(db, StatisticsPeriod.ALL_TIME)
-            
-            for key, value in all_time_data.items():
-                setattr(all_time_stats, key, value)
+            # Replace all monthly, yearly and all-time rows from one grouped scan
+            StatisticsRebuildService.rebuild_financial_statistics(db)
             
             db.commit()
         except Exception as e:
@@ -550,82 +447,18 @@ class StatisticsService:
     @staticmethod
     def initialize_category_statistics(db: Session):
         """Initialize category statistics for all existing transactions"""
+        from .statistics_rebuild_service import StatisticsRebuildService
         try:
             # Lock the database to prevent any concurrent modifications during initialization
             # This is an administrative operation that should run when the system is not heavily used
             db.execute(text("BEGIN"))
             
-            # Clear existing category statistics
-            db.query(CategoryStatistics).delete()
-            db.flush()
-            
-            # Get all unique months from transactions
-            months = db.query(
-                extract('year', Transaction.transaction_date).label('year'),
-                extract('month', Transaction.transaction_date).label('month')
-            ).distinct().all()
-            
-            # Get all unique years from transactions
-            years = db.query(
-                extract('year', Transaction.transaction_date).label('year')
-            ).distinct().all()
-            
-            # Initialize monthly category statistics for each month
-            for year, month in months:
-                # set day to the last day of the month
-                date_obj = date(year=int(year), month=int(month), day=calendar.monthrange(int(year), int(month))[1])
-                
-                # Calculate category statistics for monthly
-                monthly_categories = StatisticsService.calculate_category_statistics(
-                    db, StatisticsPeriod.MONTHLY, date_obj
-                )
-                
-                # Create and save monthly category statistics
-                for cat_data in monthly_categories:
-                    if cat_data['period_transaction_count'] > 0:
-                        cat_stat = CategoryStatistics(
-                            period=StatisticsPeriod.MONTHLY,
-                            date=date_obj,
-                            **cat_data
-                        )
-                        db.add(cat_stat)
-            
-            # Initialize yearly category statistics for each year
-            for (year,) in years:
-                # set day to the last day of the year
-                date_obj = date(year=int(year), month=12, day=31)
-                
-                # Calculate category statistics for yearly
-                yearly_categories = StatisticsService.calculate_category_statistics(
-                    db, StatisticsPeriod.YEARLY, date_obj
-                )
-                
-                # Create and save yearly category statistics
-                for cat_data in yearly_categories:
-                    if cat_data['period_transaction_count'] > 0:
-                        cat_stat = CategoryStatistics(
-                            period=StatisticsPeriod.YEARLY,
-                            date=date_obj,
-                            **cat_data
-                        )
-                        db.add(cat_stat)
-            
-            # Initialize all-time category statistics
-            all_time_categories = StatisticsService.calculate_category_statistics(
-                db, StatisticsPeriod.ALL_TIME
-            )
-            
-            for cat_data in all_time_categories:
-                if cat_data['period_transaction_count'] > 0:
-                    cat_stat = CategoryStatistics(
-                        period=StatisticsPeriod.ALL_TIME,
-                        **cat_data
-                    )
-                    db.add(cat_stat)
+            # Replace all monthly, yearly and all-time rows from one grouped scan
+            StatisticsRebuildService.rebuild_category_statistics(db)
             
             db.commit()
             logger.info("Category statistics initialized successfully")
         except Exception as e:
             db.rollback()
             logger.error(f"Error initializing category statistics: {str(e)}")
-            raise e
\ No newline at end of file
+            raise e
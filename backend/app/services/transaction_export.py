@@ -0,0 +1,202 @@
+from datetime import date
+from enum import Enum
+from typing import Callable, Iterable, Iterator, List, Optional, Sequence
+import csv
+import io
+import json
+import logging
+import os
+
+from sqlalchemy.orm import Query, Session
+
+from ..database import ReadSessionLocal
+from ..models.transaction import Transaction
+
+logger = logging.getLogger(__name__)
+
+# Rows fetched from the cursor, and written out, per chunk
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "5000"))
+
+EXPORT_COLUMNS = (
+    Transaction.id,
+    Transaction.account_number,
+    Transaction.transaction_date,
+    Transaction.amount,
+    Transaction.currency,
+    Transaction.description,
+    Transaction.counterparty_name,
+    Transaction.counterparty_account,
+    Transaction.transaction_type,
+    Transaction.expense_category,
+    Transaction.income_category,
+    Transaction.source_bank,
+)
+EXPORT_FIELDS = tuple(column.key for column in EXPORT_COLUMNS)
+
+# format: (media type, file extension)
+EXPORT_FORMATS = {
+    "csv": ("text/csv; charset=utf-8", "csv"),
+    "ndjson": ("application/x-ndjson", "ndjson"),
+    "parquet": ("application/vnd.apache.parquet", "parquet"),
+}
+
+
+def _plain(value):
+    """The API representation of a column value: enum values and ISO dates."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, date):
+        return value.isoformat()
+    return value
+
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only file collecting what the Parquet writer emits until drained."""
+
+    def __init__(self):
+        super().__init__()
+        self._chunks: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+class TransactionExportService:
+    """Stream transactions out as CSV, NDJSON or Parquet.
+
+    Rows come from the database cursor ``EXPORT_BATCH_SIZE`` at a time
+    (``yield_per``) as plain tuples, not ORM objects, and each batch is
+    encoded and handed to the response before the next is fetched, so memory
+    stays flat whatever the size of the export.
+    """
+
+    # Sessions ``stream`` reads the rows with
+    session_factory = ReadSessionLocal
+
+    @staticmethod
+    def parquet_available() -> bool:
+        """Parquet export needs the optional ``pyarrow`` package."""
+        try:
+            import pyarrow  # noqa: F401
+            import pyarrow.parquet  # noqa: F401
+        except ImportError:
+            return False
+        return True
+
+    @staticmethod
+    def batches(db: Session, query: Query, batch_size: int = EXPORT_BATCH_SIZE) -> Iterator[Sequence[tuple]]:
+        """Yield the export columns of the rows matched by ``query`` (filters
+        and ordering are kept) in lists of up to ``batch_size`` rows."""
+        statement = query.with_entities(*EXPORT_COLUMNS).statement
+        result = db.execute(statement, execution_options={"yield_per": batch_size})
+        try:
+            yield from result.partitions()
+        finally:
+            result.close()
+
+    @staticmethod
+    def csv_chunks(batches: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+        for batch in batches:
+            writer.writerows([_plain(value) for value in row] for row in batch)
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            # Header of an empty export
+            yield buffer.getvalue().encode()
+
+    @staticmethod
+    def ndjson_chunks(batches: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+        for batch in batches:
+            yield "".join(
+                json.dumps(dict(zip(EXPORT_FIELDS, (_plain(value) for value in row)))) + "\n"
+                for row in batch
+            ).encode()
+
+    @staticmethod
+    def parquet_chunks(batches: Iterable[Sequence[tuple]]) -> Iterator[bytes]:
+        """One Parquet row group per batch; the footer follows the last one."""
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        schema = pa.schema([
+            ("id", pa.int64()),
+            ("account_number", pa.string()),
+            ("transaction_date", pa.date32()),
+            ("amount", pa.float64()),
+            ("currency", pa.string()),
+            ("description", pa.string()),
+            ("counterparty_name", pa.string()),
+            ("counterparty_account", pa.string()),
+            ("transaction_type", pa.string()),
+            ("expense_category", pa.string()),
+            ("income_category", pa.string()),
+            ("source_bank", pa.string()),
+        ])
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema)
+        try:
+            for batch in batches:
+                columns = list(zip(*batch))
+                arrays = [
+                    pa.array(
+                        [value.value if isinstance(value, Enum) else value for value in values],
+                        type=field.type,
+                    )
+                    for values, field in zip(columns, schema)
+                ]
+                writer.write_batch(pa.record_batch(arrays, schema=schema))
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    @staticmethod
+    def stream(query: Query, export_format: str, batch_size: int = EXPORT_BATCH_SIZE,
+               session_factory: Optional[Callable[[], Session]] = None) -> Iterator[bytes]:
+        """Encoded chunks of the rows matched by ``query`` in ``export_format``.
+
+        The rows are read on a session of its own, opened with the first
+        chunk and closed after the last: the response is sent after the
+        endpoint and its request-scoped session have returned.
+        """
+        encode = {
+            "csv": TransactionExportService.csv_chunks,
+            "ndjson": TransactionExportService.ndjson_chunks,
+            "parquet": TransactionExportService.parquet_chunks,
+        }[export_format]
+        exported = 0
+        db = (session_factory or TransactionExportService.session_factory)()
+
+        def counted():
+            nonlocal exported
+            for batch in TransactionExportService.batches(db, query, batch_size):
+                exported += len(batch)
+                yield batch
+
+        try:
+            yield from encode(counted())
+        except Exception as e:
+            # Headers are sent already: the client sees a truncated body
+            logger.error(f"Error exporting transactions after {exported} rows: {str(e)}")
+            raise
+        finally:
+            db.close()
+        logger.info(f"Exported {exported} transactions as {export_format}")
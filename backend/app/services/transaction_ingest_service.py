@@ -0,0 +1,93 @@
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+from typing import List, Set, Tuple
+import logging
+
+from ..models.transaction import Transaction
+from ..schemas.transaction import TransactionBase, TransactionCreate
+
+logger = logging.getLogger(__name__)
+
+# (account_number, transaction_date, amount, description, source_bank)
+Fingerprint = Tuple
+
+
+class TransactionIngestService:
+    @staticmethod
+    def fingerprint(transaction) -> Fingerprint:
+        """Return the key two imported transactions are considered duplicates on."""
+        return (
+            transaction.account_number,
+            transaction.transaction_date,
+            transaction.amount,
+            transaction.description,
+            transaction.source_bank,
+        )
+
+    @staticmethod
+    def existing_fingerprints(db: Session, transactions: List[TransactionCreate]) -> Set[Fingerprint]:
+        """Fetch the fingerprints of stored transactions that could collide with
+        ``transactions``, using one range query over their date span."""
+        if not transactions:
+            return set()
+
+        dates = [t.transaction_date for t in transactions]
+        banks = {t.source_bank for t in transactions}
+        rows = db.query(
+            Transaction.account_number,
+            Transaction.transaction_date,
+            Transaction.amount,
+            Transaction.description,
+            Transaction.source_bank,
+        ).filter(
+            Transaction.transaction_date >= min(dates),
+            Transaction.transaction_date <= max(dates),
+            Transaction.source_bank.in_(banks),
+        ).all()
+        return {tuple(row) for row in rows}
+
+    @staticmethod
+    def filter_duplicates(
+        db: Session, transactions: List[TransactionCreate]
+    ) -> Tuple[List[TransactionCreate], int]:
+        """Drop transactions already stored in the database or repeated earlier in
+        the same batch.
+
+        Returns the new transactions in their original order and the number of
+        skipped duplicates.
+        """
+        seen = TransactionIngestService.existing_fingerprints(db, transactions)
+        new_transactions = []
+        skipped_count = 0
+
+        for trans in transactions:
+            key = TransactionIngestService.fingerprint(trans)
+            if key in seen:
+                logger.warning(f"Skipping duplicate transaction: {trans.description} on {trans.transaction_date} for {trans.amount} {trans.currency}")
+                skipped_count += 1
+                continue
+            seen.add(key)
+            new_transactions.append(trans)
+
+        return new_transactions, skipped_count
+
+    @staticmethod
+    def bulk_insert(db: Session, transactions: List[TransactionBase]) -> List[int]:
+        """Insert ``transactions`` in a single statement batch in ``db``'s
+        transaction; the caller commits it, together with anything else the
+        change writes.
+
+        Uses ``INSERT ... RETURNING id`` so the generated ids come back in the
+        same order as ``transactions`` without reloading each row.
+        """
+        if not transactions:
+            return []
+
+        rows = [trans.model_dump(exclude={"id"}) for trans in transactions]
+        ids = db.scalars(
+            insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True),
+            rows,
+        ).all()
+
+        logger.info(f"Bulk inserted {len(ids)} transactions")
+        return list(ids)
@@ -0,0 +1,380 @@
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+import glob
+import json
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# (score, payload) of one search hit
+SearchHit = Tuple[float, Dict[str, Any]]
+
+VECTOR_STORE_KINDS = ("qdrant", "numpy")
+
+
+class VectorStore(ABC):
+    """Cosine-similarity index of points with integer ids and a JSON payload,
+    grouped in named collections.
+
+    Implementations: ``QdrantVectorStore`` (the local Qdrant client) and
+    ``NumpyVectorStore`` (an in-process float32 matrix).
+    """
+
+    @abstractmethod
+    def ensure_collection(self, name: str, dimension: int) -> None:
+        """Create collection ``name`` unless it already exists."""
+
+    @abstractmethod
+    def clear(self, name: str) -> None:
+        """Remove every point of collection ``name``."""
+
+    @abstractmethod
+    def count(self, name: str) -> int:
+        ...
+
+    @abstractmethod
+    def upsert(self, name: str, ids: Sequence[int], vectors: np.ndarray, payloads: Sequence[Dict[str, Any]]) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, name: str, ids: Iterable[int]) -> None:
+        """Delete points by id, ignoring ids that are not stored."""
+
+    @abstractmethod
+    def retrieve(self, name: str, ids: Iterable[int]) -> List[Tuple[int, Dict[str, Any]]]:
+        """Return ``(id, payload)`` of the stored points among ``ids``, in id order."""
+
+    @abstractmethod
+    def payload_values(self, name: str, key: str) -> Dict[int, Any]:
+        """Return ``{point id: payload[key]}`` for every point of a collection."""
+
+    @abstractmethod
+    def search_batch(self, name: str, queries: np.ndarray, limit: int) -> List[List[SearchHit]]:
+        """Return the ``limit`` most similar points for each row of ``queries``,
+        best first."""
+
+    def flush(self) -> None:
+        """Persist pending changes, for stores that do not write through."""
+
+    def close(self) -> None:
+        pass
+
+
+class QdrantVectorStore(VectorStore):
+    """Vector store backed by the local (in-process) Qdrant client; an
+    on-disk ``path`` can only be opened by one process at a time."""
+
+    def __init__(self, path: str = ":memory:"):
+        from qdrant_client import QdrantClient
+        from qdrant_client.http import models
+        self._models = models
+
+        if path == ":memory:":
+            self.client = QdrantClient(":memory:")
+        else:
+            os.makedirs(path, exist_ok=True)
+            self.client = QdrantClient(path=path)
+        self._dimensions: Dict[str, int] = {}
+
+    def ensure_collection(self, name, dimension):
+        self._dimensions[name] = dimension
+        if not self.client.collection_exists(name):
+            self._create(name, dimension)
+
+    def _create(self, name, dimension):
+        self.client.create_collection(
+            collection_name=name,
+            vectors_config=self._models.VectorParams(size=dimension, distance=self._models.Distance.COSINE),
+        )
+
+    def clear(self, name):
+        self.client.delete_collection(name)
+        self._create(name, self._dimensions[name])
+
+    def count(self, name):
+        return self.client.get_collection(name).points_count or 0
+
+    def upsert(self, name, ids, vectors, payloads):
+        self.client.upsert(
+            collection_name=name,
+            points=[
+                self._models.PointStruct(id=int(point_id), vector=vector.tolist(), payload=payload)
+                for point_id, vector, payload in zip(ids, vectors, payloads)
+            ],
+        )
+
+    def delete(self, name, ids):
+        ids = [int(i) for i in ids]
+        if not ids:
+            return
+        # Delete by filter: the local client raises on unknown ids in a PointIdsList
+        self.client.delete(
+            collection_name=name,
+            points_selector=self._models.FilterSelector(
+                filter=self._models.Filter(must=[self._models.HasIdCondition(has_id=ids)])
+            ),
+        )
+
+    def retrieve(self, name, ids):
+        points = self.client.retrieve(collection_name=name, ids=[int(i) for i in ids])
+        return sorted(((point.id, point.payload or {}) for point in points), key=lambda item: item[0])
+
+    def payload_values(self, name, key):
+        values = {}
+        offset = None
+        while True:
+            points, offset = self.client.scroll(
+                collection_name=name,
+                limit=1000,
+                offset=offset,
+                with_payload=[key],
+                with_vectors=False,
+            )
+            for point in points:
+                values[point.id] = (point.payload or {}).get(key)
+            if offset is None:
+                return values
+
+    def search_batch(self, name, queries, limit):
+        results = self.client.search_batch(
+            collection_name=name,
+            requests=[
+                self._models.SearchRequest(vector=query.tolist(), limit=limit, with_payload=True)
+                for query in queries
+            ],
+        )
+        return [[(hit.score, hit.payload or {}) for hit in hits] for hits in results]
+
+    def close(self):
+        self.client.close()
+
+
+class _NumpyCollection:
+    """Rows ``0..size-1`` of ``vectors`` hold L2-normalized embeddings; the
+    buffer grows geometrically so appends are amortized O(1)."""
+
+    def __init__(self, dimension: int, ids=None, vectors=None, payloads=None, generation: int = 0):
+        self.dimension = dimension
+        # Number of the saved files this collection was loaded from or last written to
+        self.generation = generation
+        self.ids = np.zeros(0, dtype=np.int64) if ids is None else ids
+        self.vectors = np.zeros((0, dimension), dtype=np.float32) if vectors is None else vectors
+        self.payloads: List[Dict[str, Any]] = [] if payloads is None else payloads
+        self.size = len(self.payloads)
+        self.rows: Dict[int, int] = {int(point_id): row for row, point_id in enumerate(self.ids[:self.size])}
+
+    def _reserve(self, size: int):
+        # Also turns a read-only memory-mapped matrix into a writable array
+        if size <= len(self.ids) and self.vectors.flags.writeable:
+            return
+        capacity = max(size, 2 * len(self.ids), 64)
+        ids = np.zeros(capacity, dtype=np.int64)
+        vectors = np.zeros((capacity, self.dimension), dtype=np.float32)
+        ids[:self.size] = self.ids[:self.size]
+        vectors[:self.size] = self.vectors[:self.size]
+        self.ids, self.vectors = ids, vectors
+
+
+class NumpyVectorStore(VectorStore):
+    """Brute-force cosine search over a contiguous float32 matrix per collection.
+
+    Rows are normalized on insert, so a query is a single matrix product
+    followed by an ``argpartition`` top-k. With a ``path`` each collection is
+    saved on ``flush()`` as ``<name>.<generation>.ids.npy``, ``.vectors.npy``
+    and ``.payloads.json``, and ``<name>.manifest.json`` names the generation
+    to load; the matrix is memory-mapped on load and only copied into memory
+    on the first write.
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = None if path in (None, ":memory:") else path
+        if self.path:
+            os.makedirs(self.path, exist_ok=True)
+        self._collections: Dict[str, _NumpyCollection] = {}
+        self._dirty = set()
+        self._lock = threading.RLock()
+
+    _SUFFIXES = ("ids.npy", "vectors.npy", "payloads.json")
+
+    def _file(self, name, suffix, generation=None):
+        if generation is None:
+            return os.path.join(self.path, f"{name}.{suffix}")
+        return os.path.join(self.path, f"{name}.{generation}.{suffix}")
+
+    def _saved_generation(self, name) -> int:
+        """Generation named by the manifest of ``name``, 0 if it was never saved."""
+        try:
+            with open(self._file(name, "manifest.json"), encoding="utf-8") as f:
+                return int(json.load(f)["generation"])
+        except FileNotFoundError:
+            return 0
+
+    def ensure_collection(self, name, dimension):
+        with self._lock:
+            if name in self._collections:
+                return
+            collection = None
+            generation = 0
+            if self.path:
+                try:
+                    generation = self._saved_generation(name)
+                    if generation:
+                        with open(self._file(name, "payloads.json", generation), encoding="utf-8") as f:
+                            payloads = json.load(f)
+                        ids = np.load(self._file(name, "ids.npy", generation))
+                        vectors = np.load(self._file(name, "vectors.npy", generation), mmap_mode="r")
+                        if not (len(ids) == len(payloads) == vectors.shape[0]) or vectors.shape[1:] != (dimension,):
+                            raise ValueError("files are inconsistent")
+                        collection = _NumpyCollection(
+                            dimension, ids=ids, vectors=vectors, payloads=payloads, generation=generation
+                        )
+                        logger.info(f"Loaded {collection.size} vectors of {name} from {self.path}")
+                except Exception as e:
+                    logger.warning(f"Could not load {name} from {self.path}, starting empty: {e}")
+                    collection = None
+            # An empty collection still writes past the saved generation
+            self._collections[name] = collection or _NumpyCollection(dimension, generation=generation)
+
+    def clear(self, name):
+        with self._lock:
+            old = self._collections[name]
+            self._collections[name] = _NumpyCollection(old.dimension, generation=old.generation)
+            self._dirty.add(name)
+
+    def count(self, name):
+        return self._collections[name].size
+
+    def upsert(self, name, ids, vectors, payloads):
+        vectors = np.asarray(vectors, dtype=np.float32).reshape(len(ids), -1)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.where(norms == 0, 1, norms)
+        with self._lock:
+            collection = self._collections[name]
+            collection._reserve(collection.size + len(ids))
+            for point_id, vector, payload in zip(ids, vectors, payloads):
+                point_id = int(point_id)
+                row = collection.rows.get(point_id)
+                if row is None:
+                    row = collection.size
+                    collection.size += 1
+                    collection.rows[point_id] = row
+                    collection.ids[row] = point_id
+                    collection.payloads.append(dict(payload))
+                else:
+                    collection.payloads[row] = dict(payload)
+                collection.vectors[row] = vector
+            self._dirty.add(name)
+
+    def delete(self, name, ids):
+        with self._lock:
+            collection = self._collections[name]
+            rows = [collection.rows[int(i)] for i in ids if int(i) in collection.rows]
+            if not rows:
+                return
+            collection._reserve(collection.size)
+            # Move the last row into each freed slot
+            for row in sorted(rows, reverse=True):
+                last = collection.size - 1
+                del collection.rows[int(collection.ids[row])]
+                if row != last:
+                    moved_id = int(collection.ids[last])
+                    collection.ids[row] = moved_id
+                    collection.vectors[row] = collection.vectors[last]
+                    collection.payloads[row] = collection.payloads[last]
+                    collection.rows[moved_id] = row
+                collection.payloads.pop()
+                collection.size -= 1
+            self._dirty.add(name)
+
+    def retrieve(self, name, ids):
+        collection = self._collections[name]
+        found = sorted({int(i) for i in ids} & collection.rows.keys())
+        return [(point_id, collection.payloads[collection.rows[point_id]]) for point_id in found]
+
+    def payload_values(self, name, key):
+        collection = self._collections[name]
+        return {
+            int(point_id): payload.get(key)
+            for point_id, payload in zip(collection.ids[:collection.size], collection.payloads)
+        }
+
+    def search_batch(self, name, queries, limit):
+        collection = self._collections[name]
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, collection.dimension)
+        if collection.size == 0 or limit <= 0:
+            return [[] for _ in queries]
+        norms = np.linalg.norm(queries, axis=1, keepdims=True)
+        queries = queries / np.where(norms == 0, 1, norms)
+
+        scores = queries @ collection.vectors[:collection.size].T
+        k = min(limit, collection.size)
+        if k < collection.size:
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            top = np.broadcast_to(np.arange(collection.size), (len(queries), collection.size))
+        top_scores = np.take_along_axis(scores, top, axis=1)
+        order = np.argsort(-top_scores, axis=1, kind="stable")
+        top = np.take_along_axis(top, order, axis=1)
+        top_scores = np.take_along_axis(top_scores, order, axis=1)
+        return [
+            [(float(score), collection.payloads[row]) for row, score in zip(rows, row_scores)]
+            for rows, row_scores in zip(top, top_scores)
+        ]
+
+    def flush(self):
+        if not self.path:
+            return
+        with self._lock:
+            for name in sorted(self._dirty):
+                collection = self._collections[name]
+                generation = collection.generation + 1
+                for suffix, write in (
+                    ("ids.npy", lambda f: np.save(f, collection.ids[:collection.size])),
+                    ("vectors.npy", lambda f: np.save(f, np.ascontiguousarray(collection.vectors[:collection.size]))),
+                    ("payloads.json", lambda f: f.write(json.dumps(collection.payloads).encode("utf-8"))),
+                ):
+                    with open(self._file(name, suffix, generation), "wb") as f:
+                        write(f)
+                        f.flush()
+                        os.fsync(f.fileno())
+                # Replacing the manifest is the one step that switches ids,
+                # vectors and payloads to the new generation: after a crash
+                # the collection loads either entirely old or entirely new
+                manifest = self._file(name, "manifest.json")
+                with open(f"{manifest}.tmp", "w", encoding="utf-8") as f:
+                    json.dump({"generation": generation}, f)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(f"{manifest}.tmp", manifest)
+                collection.generation = generation
+                self._remove_stale_files(name, generation)
+            self._dirty.clear()
+
+    def _remove_stale_files(self, name, generation):
+        """Delete the files of older generations, and of any a crash left unnamed."""
+        for suffix in self._SUFFIXES:
+            for file in glob.glob(os.path.join(glob.escape(self.path), f"{glob.escape(name)}.*.{suffix}")):
+                stored = os.path.basename(file)[len(name) + 1:-len(suffix) - 1]
+                if stored.isdigit() and int(stored) != generation:
+                    try:
+                        os.remove(file)
+                    except OSError as e:
+                        logger.warning(f"Could not remove {file}: {e}")
+
+
+def create_vector_store(kind: str, path: str) -> VectorStore:
+    """Build the vector store selected by ``kind`` (see ``VECTOR_STORE_KINDS``)."""
+    if kind == "qdrant":
+        try:
+            return QdrantVectorStore(path)
+        except RuntimeError as e:
+            # Local mode locks the directory to one process, e.g. the first of
+            # several uvicorn workers; only one worker is supported
+            logger.error(f"Could not open the Qdrant index at {path}, using an in-memory index instead: {str(e)}")
+            return NumpyVectorStore()
+    if kind == "numpy":
+        return NumpyVectorStore(path)
+    raise ValueError(f"Unknown vector store {kind!r}, expected one of {', '.join(VECTOR_STORE_KINDS)}")
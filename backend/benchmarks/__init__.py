@@ -0,0 +1,6 @@
+"""
+Ad-hoc performance benchmarks for the backend.
+
+Run from the ``backend`` directory, e.g. ``python -m benchmarks.bench_csv_parser``.
+They are not collected by pytest.
+"""
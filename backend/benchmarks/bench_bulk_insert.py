@@ -0,0 +1,86 @@
+"""
+Benchmark: inserting imported transactions into SQLite.
+
+Compares the original per-object ``db.add`` + ``commit`` + ``db.refresh``
+loop against ``TransactionIngestService.bulk_insert`` on a fresh on-disk
+SQLite database.
+
+    python -m benchmarks.bench_bulk_insert --rows 2000 20000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.transaction import Transaction, TransactionType
+from app.schemas.transaction import TransactionCreate
+from app.services.transaction_ingest_service import TransactionIngestService
+
+
+def make_transactions(rows: int):
+    rng = random.Random(42)
+    start = date(2015, 1, 1)
+    result = []
+    for i in range(rows):
+        amount = round(rng.uniform(-500, 3000), 2)
+        result.append(TransactionCreate(
+            account_number='BE1234567890',
+            transaction_date=start + timedelta(days=rng.randrange(3650)),
+            amount=amount,
+            currency='EUR',
+            description=f'Payment {i}',
+            transaction_type=TransactionType.INCOME if amount > 0 else TransactionType.EXPENSE,
+            source_bank='ING',
+        ))
+    return result
+
+
+def orm_insert(db, transactions):
+    objects = [Transaction(**t.model_dump()) for t in transactions]
+    db.add_all(objects)
+    db.commit()
+    for obj in objects:
+        db.refresh(obj)
+    return [obj.id for obj in objects]
+
+
+def bulk_insert(db, transactions):
+    ids = TransactionIngestService.bulk_insert(db, transactions)
+    db.commit()
+    return ids
+
+
+def run(func, transactions) -> float:
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = create_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        with sessionmaker(bind=engine)() as db:
+            started = time.perf_counter()
+            ids = func(db, transactions)
+            elapsed = time.perf_counter() - started
+        engine.dispose()
+    assert len(ids) == len(transactions)
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[2000, 20000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'add+refresh (s)':>16} {'bulk_insert (s)':>16} {'speedup':>8}")
+    for rows in args.rows:
+        transactions = make_transactions(rows)
+        before = run(orm_insert, transactions)
+        after = run(bulk_insert, transactions)
+        print(f"{rows:>8} {before:>16.3f} {after:>16.3f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
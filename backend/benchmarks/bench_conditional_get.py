@@ -0,0 +1,89 @@
+"""
+Benchmark: a dashboard poll (statistics, financial health, projections and
+budgets reads) when the data changed since the last poll, when it did not
+(bodies memoized by ``ConditionalGetMiddleware``) and when the client also
+revalidates with ``If-None-Match`` (empty 304 responses).
+
+    python -m benchmarks.bench_conditional_get --rows 20000 100000 --polls 20
+"""
+import os
+
+os.environ.setdefault("SUGGESTION_INDEX_PATH", ":memory:")
+
+import argparse
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.database import get_db, get_read_db
+from app.main import app
+from app.services.data_version import data_version
+from app.services.financial_health_service import FinancialHealthService
+from app.services.statistics_service import StatisticsService
+
+from .fixtures import database_path, seeded_session
+
+POLL = [
+    '/statistics/overview',
+    '/statistics/timeseries?time_period=1Y',
+    '/statistics/category/averages?time_period=1Y',
+    '/statistics/by-category?period=monthly',
+    '/financial-health/history?months=12',
+    '/projections/scenarios',
+    '/budgets/progress',
+]
+
+
+def _poll_ms(client, polls: int, changed: bool, conditional: bool) -> float:
+    etags = {}
+    started = time.perf_counter()
+    for _ in range(polls):
+        if changed:
+            data_version.bump()
+        for path in POLL:
+            headers = {'If-None-Match': etags[path]} if conditional and path in etags else {}
+            resp = client.get(path, headers=headers)
+            assert resp.status_code in (200, 304), path
+            etags[path] = resp.headers['etag']
+    return (time.perf_counter() - started) * 1000 / polls
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--polls', type=int, default=20)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    print(f"{'rows':>9} {'changed ms/poll':>16} {'memoized ms/poll':>17} {'304 ms/poll':>12}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, db = seeded_session(database_path(tmp, rows), rows)
+            StatisticsService.initialize_statistics(db)
+            StatisticsService.initialize_category_statistics(db)
+            FinancialHealthService.initialize_financial_health(db)
+            db.close()
+            sessions = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+
+            def session():
+                db = sessions()
+                try:
+                    yield db
+                finally:
+                    db.close()
+
+            app.dependency_overrides[get_db] = session
+            app.dependency_overrides[get_read_db] = session
+            _poll_ms(client, 1, changed=True, conditional=False)  # creates the default scenarios
+            changed = _poll_ms(client, args.polls, changed=True, conditional=False)
+            memoized = _poll_ms(client, args.polls, changed=False, conditional=False)
+            not_modified = _poll_ms(client, args.polls, changed=False, conditional=True)
+            print(f"{rows:>9} {changed:>16.1f} {memoized:>17.1f} {not_modified:>12.1f}")
+            app.dependency_overrides.clear()
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,91 @@
+"""
+Benchmark: CSV parsing throughput (rows/second).
+
+Compares the columnar ``CSVParser.parse_csv`` against the original row-by-row
+``iterrows()`` implementation on a synthetic ING export of configurable size.
+
+    python -m benchmarks.bench_csv_parser --rows 50000
+"""
+import argparse
+import csv
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+import pandas as pd
+
+from app.models.transaction import TransactionType
+from app.schemas.transaction import TransactionCreate
+from app.services.csv_parser import CSVParser
+
+
+def write_ing_csv(path: str, rows: int) -> None:
+    rng = random.Random(42)
+    start = date(2015, 1, 1)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f, delimiter=';')
+        writer.writerow(['Account Number', 'Account Name', 'Counterparty account',
+                         'Booking date', 'Amount', 'Currency', 'Description'])
+        for i in range(rows):
+            day = start + timedelta(days=rng.randrange(3650))
+            amount = rng.uniform(-500, 3000)
+            writer.writerow([
+                'BE1234567890',
+                'Main Account',
+                '' if i % 7 == 0 else f'BE{rng.randrange(10**10):010d}',
+                day.strftime('%d/%m/%Y'),
+                f'{amount:.2f}'.replace('.', ','),
+                'EUR',
+                f'Payment to merchant {rng.randrange(200)}',
+            ])
+
+
+def legacy_parse_ing_csv(file_path: str):
+    """The original ``iterrows()`` implementation, kept for comparison."""
+    df = CSVParser.read_csv_with_fallback(file_path)
+    transactions = []
+    for _, row in df.iterrows():
+        amount = CSVParser.convert_amount(row["Amount"])
+        transactions.append(TransactionCreate(
+            account_number=row["Account Number"],
+            transaction_date=CSVParser.convert_date(row["Booking date"]),
+            amount=amount,
+            currency=row["Currency"],
+            description=row["Description"],
+            counterparty_account=row["Counterparty account"]
+                if pd.notna(row["Counterparty account"]) else None,
+            transaction_type=TransactionType.INCOME if amount > 0 else TransactionType.EXPENSE,
+            source_bank="ING"
+        ))
+    return transactions
+
+
+def _time(func, path: str, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func(path)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'iterrows rows/s':>16} {'columnar rows/s':>16} {'speedup':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ing.csv')
+            write_ing_csv(path, rows)
+            before = _time(legacy_parse_ing_csv, path, args.repeat)
+            after = _time(CSVParser.parse_csv, path, args.repeat)
+        print(f"{rows:>8} {rows / before:>16,.0f} {rows / after:>16,.0f} {before / after:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Benchmark: description normalization throughput (descriptions/second).
+
+Compares ``normalize_description`` (cold, i.e. with its LRU cache cleared,
+and warm) against the original implementation that ran every ``re.sub``
+through the ``re`` module cache on each call.
+
+    python -m benchmarks.bench_description_normalizer
+"""
+import argparse
+import json
+import os
+import re
+import time
+
+from app.services.description_normalizer import normalize_description
+
+GOLDEN_PATH = os.path.join(os.path.dirname(__file__), '..', 'tests', 'mock_data', 'normalized_descriptions.json')
+
+
+def legacy_preprocess_description(description: str) -> str:
+    """The original ``CategorySuggestionService._preprocess_description``."""
+    text = description.lower()
+    for prefix in [r'payment via \w+\s+', r'european direct debit\s+', r'instant credit transfer from\s+',
+                   r'charge\s+', r'payment\s+']:
+        text = re.sub(prefix, '', text, flags=re.IGNORECASE)
+    for pattern in [r'\d{2}[-/]\d{2}[-/]\d{2,4}', r'\d{2}[-/]\d{2}', r'\d{1,2}[:.]\d{2}\s*(?:am|pm)?']:
+        text = re.sub(pattern, '', text)
+    for pattern in [r'card number \d*x*\s*\d*x*\s*\d*x*\s*\d*',
+                    r'with \w+ (?:debit|credit) card \d{4}\s*\d*x*\s*\d*x*\s*\d*', r'cardholder:\s*[^\n]+']:
+        text = re.sub(pattern, '', text)
+    for pattern in [r'creditor ref\.\s*:\s*[\w\s]+', r'mandate ref\.\s*:\s*[\w\s]+',
+                    r'reference\s*:\s*[\w\s/]+', r'ordering bank\s*:\s*[\w\s]+']:
+        text = re.sub(pattern, '', text)
+    text = re.sub(r'[A-Z]{2}\d{2}\s*[A-Z0-9\s]{10,30}', '', text)
+    text = re.sub(r'[A-Z]{6}[A-Z0-9]{2,5}', '', text)
+    text = re.sub(r'\d{4,5}\s*[-\s]*[a-z]{2,3}', '', text)
+    text = re.sub(r'\d{3,4}\s+\d{4}\s+[a-zA-Z\s]+', '', text)
+    text = re.sub(r'\s+', ' ', text).strip()
+    merchant_name = None
+    for pattern in [r'([A-Z][A-Z &]+)', r'creditor\s*:\s*([^\.]+)', r'(?:at|to|from)\s+([^\.]+)']:
+        match = re.search(pattern, description)
+        if match:
+            merchant_name = match.group(1).strip()
+            break
+    if merchant_name:
+        text = f"{merchant_name.lower()} {text}"
+    return text
+
+
+def _rate(func, descriptions, rounds: int, before_round=None) -> float:
+    started = time.perf_counter()
+    for _ in range(rounds):
+        if before_round:
+            before_round()
+        for description in descriptions:
+            func(description)
+    return rounds * len(descriptions) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=50)
+    args = parser.parse_args()
+
+    with open(GOLDEN_PATH, encoding='utf-8') as f:
+        descriptions = [entry['description'] for entry in json.load(f)]
+
+    legacy = _rate(legacy_preprocess_description, descriptions, args.rounds)
+    cold = _rate(normalize_description, descriptions, args.rounds, before_round=normalize_description.cache_clear)
+    warm = _rate(normalize_description, descriptions, args.rounds)
+
+    print(f"{len(descriptions)} distinct descriptions x {args.rounds} rounds")
+    print(f"{'original re.sub chain':>24}: {legacy:>12,.0f} descriptions/s")
+    print(f"{'normalizer (cold cache)':>24}: {cold:>12,.0f} descriptions/s ({cold / legacy:.1f}x)")
+    print(f"{'normalizer (warm cache)':>24}: {warm:>12,.0f} descriptions/s ({warm / legacy:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Benchmark: the expense type statistics re-summed from ``CategoryStatistics``
+on every request vs read from the ``ExpenseTypeStatistics`` rollup.
+
+Times the two queries behind ``/statistics/by-expense-type`` (every monthly
+period in turn) and ``/statistics/expense-type/timeseries`` (all months),
+and the cost of maintaining the rollup in a full category rebuild.
+
+    python -m benchmarks.bench_expense_type_rollup --rows 20000 100000 --years 10 30
+"""
+import argparse
+import tempfile
+import time
+
+from sqlalchemy import func
+
+from app.models.statistics import CategoryStatistics, ExpenseTypeStatistics, StatisticsPeriod
+from app.models.transaction import TransactionType, ExpenseType
+from app.services.statistics_rebuild_service import StatisticsRebuildService
+from app.services.statistics_service import StatisticsService
+
+from .fixtures import database_path, seeded_session
+
+CS = CategoryStatistics
+ETS = ExpenseTypeStatistics
+SERVED = (ExpenseType.FIXED_ESSENTIAL, ExpenseType.GUILT_FREE_DISCRETIONARY)
+
+
+def summed_period(db, period_date):
+    """The original ``/by-expense-type`` body: load the category rows, sum each field per type."""
+    stats = db.query(CS).filter(
+        CS.period == StatisticsPeriod.MONTHLY, CS.transaction_type == TransactionType.EXPENSE,
+        CS.expense_type != None, CS.date == period_date,  # noqa: E711
+    ).all()
+    result = {}
+    for expense_type in SERVED:
+        rows = [s for s in stats if s.expense_type == expense_type]
+        if rows:
+            result[expense_type] = (
+                sum(float(s.period_amount) for s in rows),
+                sum(s.period_transaction_count for s in rows),
+                sum(float(s.total_amount) for s in rows),
+            )
+    return result
+
+
+def rollup_period(db, period_date):
+    rows = db.query(ETS).filter(ETS.period == StatisticsPeriod.MONTHLY, ETS.date == period_date).all()
+    return {
+        row.expense_type: (row.period_amount, row.period_transaction_count, row.total_amount)
+        for row in rows if row.expense_type in SERVED
+    }
+
+
+def grouped_timeseries(db):
+    """The original ``/expense-type/timeseries`` query: group the category rows."""
+    return db.query(
+        CS.date, CS.expense_type, func.sum(CS.period_amount), func.sum(CS.period_transaction_count),
+    ).filter(
+        CS.period == StatisticsPeriod.MONTHLY, CS.transaction_type == TransactionType.EXPENSE,
+        CS.expense_type != None,  # noqa: E711
+    ).group_by(CS.date, CS.expense_type).order_by(CS.date).all()
+
+
+def rollup_timeseries(db):
+    return db.query(ETS.date, ETS.expense_type, ETS.period_amount, ETS.period_transaction_count).filter(
+        ETS.period == StatisticsPeriod.MONTHLY,
+    ).order_by(ETS.date, ETS.expense_type).all()
+
+
+def timed(func, *args, repeat=1):
+    started = time.perf_counter()
+    for _ in range(repeat):
+        result = func(*args)
+    return result, (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--years', type=int, nargs='+', default=[10, 30])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>8} {'years':>6} {'cat rows':>9} {'period sum ms':>14} {'period rollup ms':>17} "
+          f"{'series sum ms':>14} {'series rollup ms':>17} {'rollup refresh ms':>18}")
+    for rows in args.rows:
+        for years in args.years:
+            with tempfile.TemporaryDirectory() as tmp:
+                engine, db = seeded_session(database_path(tmp, rows), rows, years)
+                StatisticsRebuildService.rebuild_category_statistics(db)
+                db.commit()
+                _, refresh_ms = timed(StatisticsService.refresh_expense_type_statistics, db)
+                db.commit()
+
+                months = [d for (d,) in db.query(ETS.date).filter(ETS.period == StatisticsPeriod.MONTHLY).distinct()]
+
+                def every_period(compute):
+                    return [compute(db, month) for month in months]
+
+                summed, summed_ms = timed(every_period, summed_period, repeat=args.repeat)
+                rolled, rolled_ms = timed(every_period, rollup_period, repeat=args.repeat)
+                for before, after in zip(summed, rolled):
+                    assert before.keys() == after.keys()
+                    for key in before:
+                        assert abs(before[key][0] - after[key][0]) < 1e-6 * max(1.0, abs(before[key][0]))
+                        assert before[key][1] == after[key][1]
+
+                grouped, grouped_ms = timed(grouped_timeseries, db, repeat=args.repeat)
+                series, series_ms = timed(rollup_timeseries, db, repeat=args.repeat)
+                assert [(r[0], r[1], r[3]) for r in grouped] == [(r[0], r[1], r[3]) for r in series]
+
+                print(f"{rows:>8} {years:>6} {db.query(CS).count():>9} "
+                      f"{summed_ms / len(months):>14.3f} {rolled_ms / len(months):>17.3f} "
+                      f"{grouped_ms:>14.2f} {series_ms:>17.2f} {refresh_ms:>18.2f}")
+                db.close()
+                engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+"""
+Benchmark: hot query shapes with and without the composite indexes.
+
+Times each query of ``tests/test_index_plans.py``'s ``HOT_QUERIES`` on a
+database without the composite indexes, then after
+``migrate_composite_indexes`` added them.
+
+    python -m benchmarks.bench_indexes --rows 100000
+"""
+import argparse
+import tempfile
+import time
+
+from app.migrations.migrate_composite_indexes import COMPOSITE_INDEXES, migrate_composite_indexes
+from app.services.statistics_service import StatisticsService
+from tests.test_index_plans import HOT_QUERIES
+
+from .fixtures import database_path, seeded_session
+
+
+def _ms_per_query(db, build, repeat) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        build(db).all()
+    return (time.perf_counter() - started) * 1000 / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        engine, db = seeded_session(database_path(tmp, args.rows), args.rows)
+        # Statistics tables so their lookups have rows to search
+        StatisticsService.initialize_statistics(db)
+        StatisticsService.initialize_category_statistics(db)
+
+        with engine.begin() as conn:
+            for name, _, _ in COMPOSITE_INDEXES:
+                conn.exec_driver_sql(f"DROP INDEX {name}")
+        before = {name: _ms_per_query(db, build, args.repeat) for name, (build, _) in HOT_QUERIES.items()}
+        migrate_composite_indexes(engine)
+        after = {name: _ms_per_query(db, build, args.repeat) for name, (build, _) in HOT_QUERIES.items()}
+
+        print(f"{'query':<34} {'before ms':>10} {'after ms':>9} {'speedup':>8}")
+        for name in HOT_QUERIES:
+            print(f"{name:<34} {before[name]:>10.2f} {after[name]:>9.2f} {before[name] / after[name]:>7.1f}x")
+        db.close()
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""
+Load test: dashboard latency while a 5,000-row CSV upload is running.
+
+A client thread keeps requesting the dashboard GETs (statistics overview
+and timeseries, the transactions page, anomalies) while another thread
+uploads an ING export through ``POST /transactions/upload/``. Compares
+GETs sharing the write engine's sessions (``shared``) with GETs on the
+read-only engine and its own pool (``split``, ``get_read_db``).
+
+    python -m benchmarks.bench_read_write_split --rows 100000 --upload-rows 5000
+
+Needs the category suggestion model (or a stand-in ``sentence_transformers``
+on the path); the suggestion index is kept in memory.
+"""
+import os
+
+os.environ.setdefault("SUGGESTION_INDEX_PATH", ":memory:")
+os.environ.setdefault("STATISTICS_REFRESH_DELAY", "0")
+
+import argparse
+import statistics
+import tempfile
+import threading
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.database import configure_sqlite_engine, create_read_engine, get_db, get_read_db
+from app.main import app
+from app.services.statistics_service import StatisticsService
+
+from .bench_csv_parser import write_ing_csv
+from .fixtures import database_path, seeded_session
+
+DASHBOARD = [
+    ('/statistics/overview', {}),
+    ('/statistics/timeseries', {'time_period': 'ALL_TIME'}),
+    ('/transactions/', {'page_size': 50}),
+    ('/anomalies/', {}),
+]
+
+
+def _dependency(sessions):
+    def get():
+        db = sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+    return get
+
+
+def _load_dashboard(done: threading.Event, latencies: list):
+    client = TestClient(app)
+    while not done.is_set():
+        for path, params in DASHBOARD:
+            started = time.perf_counter()
+            assert client.get(path, params=params).status_code == 200, path
+            latencies.append((time.perf_counter() - started) * 1000)
+
+
+def run(path: str, csv_path: str, split: bool):
+    write_engine = configure_sqlite_engine(create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}))
+    write_sessions = sessionmaker(autocommit=False, autoflush=False, bind=write_engine)
+    read_engine = create_read_engine(path) if split else None
+    read_sessions = (
+        sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=read_engine)
+        if split else write_sessions
+    )
+    app.dependency_overrides[get_db] = _dependency(write_sessions)
+    app.dependency_overrides[get_read_db] = _dependency(read_sessions)
+
+    done = threading.Event()
+    latencies = []
+    reader = threading.Thread(target=_load_dashboard, args=(done, latencies))
+    reader.start()
+    time.sleep(0.5)  # baseline reads before the upload starts
+    started = time.perf_counter()
+    with open(csv_path, 'rb') as f:
+        resp = TestClient(app).post('/transactions/upload/', files={'file': ('export.csv', f, 'text/csv')})
+    upload_seconds = time.perf_counter() - started
+    done.set()
+    reader.join()
+    assert resp.status_code == 200, resp.text
+
+    app.dependency_overrides.clear()
+    write_engine.dispose()
+    if read_engine is not None:
+        read_engine.dispose()
+    return upload_seconds, latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help='transactions already in the database')
+    parser.add_argument('--upload-rows', type=int, default=5000)
+    args = parser.parse_args()
+
+    print(f"{'mode':>7} {'upload s':>9} {'requests':>9} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8}")
+    for mode in ('shared', 'split'):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = database_path(tmp, args.rows)
+            engine, db = seeded_session(path, args.rows)
+            StatisticsService.initialize_statistics(db)
+            StatisticsService.initialize_category_statistics(db)
+            db.close()
+            engine.dispose()
+            csv_path = os.path.join(tmp, 'export.csv')
+            write_ing_csv(csv_path, args.upload_rows)
+
+            upload_seconds, latencies = run(path, csv_path, split=(mode == 'split'))
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95)]
+            print(f"{mode:>7} {upload_seconds:>9.2f} {len(latencies):>9} {statistics.median(latencies):>8.1f} "
+                  f"{p95:>8.1f} {latencies[-1]:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
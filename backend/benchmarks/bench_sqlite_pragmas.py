@@ -0,0 +1,111 @@
+"""
+Benchmark: read latency while a large import is writing, with SQLite's
+default connection settings vs the tuned profile (``database.SQLITE_PRAGMAS``:
+WAL, synchronous=NORMAL, mmap, a larger page cache).
+
+A writer thread inserts ``--import-rows`` transactions in committed chunks,
+as an import does, while a reader thread keeps running a monthly-total
+query. With the default rollback journal every commit locks readers out;
+with WAL they keep reading the last committed snapshot.
+
+    python -m benchmarks.bench_sqlite_pragmas --rows 100000 --import-rows 100000
+"""
+import argparse
+import random
+import statistics
+import tempfile
+import threading
+import time
+
+from sqlalchemy import create_engine, func, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.database import SQLITE_PRAGMAS, configure_sqlite_engine
+from app.models.transaction import Transaction
+from app.services.period_range import date_filters, month_range
+
+from .fixtures import database_path, random_rows, seeded_session
+
+PROFILES = {
+    'default': {},
+    'tuned': SQLITE_PRAGMAS,
+}
+
+
+def _import(engine, rows: int, chunk_size: int, done: threading.Event) -> float:
+    started = time.perf_counter()
+    chunk = []
+    for row in random_rows(rows, seed=7):
+        chunk.append(row)
+        if len(chunk) >= chunk_size:
+            with engine.begin() as conn:
+                conn.execute(insert(Transaction), chunk)
+            chunk = []
+    if chunk:
+        with engine.begin() as conn:
+            conn.execute(insert(Transaction), chunk)
+    done.set()
+    return time.perf_counter() - started
+
+
+def _read_until(engine, done: threading.Event, latencies: list, errors: list):
+    db = sessionmaker(bind=engine)()
+    rng = random.Random(3)
+    while not done.is_set():
+        year, month = rng.randrange(2015, 2025), rng.randrange(1, 13)
+        started = time.perf_counter()
+        try:
+            db.query(func.sum(Transaction.amount), func.count(Transaction.id)).filter(
+                *date_filters(Transaction.transaction_date, month_range(year, month))).one()
+            latencies.append((time.perf_counter() - started) * 1000)
+        except OperationalError:
+            errors.append(time.perf_counter() - started)
+        db.rollback()
+    db.close()
+
+
+def run(path: str, pragmas: dict, import_rows: int, chunk_size: int):
+    engine = configure_sqlite_engine(
+        create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False, "timeout": 5}), pragmas
+    )
+    with engine.connect() as conn:
+        if 'journal_mode' not in pragmas:
+            # journal_mode is persistent: undo WAL left by an earlier run
+            conn.exec_driver_sql("PRAGMA journal_mode=DELETE")
+        conn.exec_driver_sql("SELECT count(*) FROM transactions").scalar()
+
+    done = threading.Event()
+    latencies, errors = [], []
+    reader = threading.Thread(target=_read_until, args=(engine, done, latencies, errors))
+    reader.start()
+    import_seconds = _import(engine, import_rows, chunk_size, done)
+    reader.join()
+    engine.dispose()
+    return import_seconds, latencies, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=100000, help='transactions already in the database')
+    parser.add_argument('--import-rows', type=int, default=100000)
+    parser.add_argument('--chunk', type=int, default=2000, help='rows per committed import chunk')
+    args = parser.parse_args()
+
+    print(f"{'profile':>8} {'import s':>9} {'reads':>7} {'p50 ms':>8} {'p95 ms':>8} {'max ms':>8} {'locked':>7}")
+    for name, pragmas in PROFILES.items():
+        with tempfile.TemporaryDirectory() as tmp:
+            path = database_path(tmp, args.rows)
+            engine, db = seeded_session(path, args.rows)
+            db.close()
+            engine.dispose()
+            import_seconds, latencies, errors = run(path, pragmas, args.import_rows, args.chunk)
+            latencies.sort()
+            p95 = latencies[int(len(latencies) * 0.95)] if latencies else float('nan')
+            p50 = statistics.median(latencies) if latencies else float('nan')
+            peak = latencies[-1] if latencies else float('nan')
+            print(f"{name:>8} {import_seconds:>9.2f} {len(latencies):>7} {p50:>8.2f} {p95:>8.2f} {peak:>8.1f} {len(errors):>7}")
+
+
+if __name__ == '__main__':
+    main()
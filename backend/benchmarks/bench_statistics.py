@@ -0,0 +1,90 @@
+"""
+Benchmark: ``StatisticsService.calculate_statistics`` latency.
+
+Compares the original implementation, which loaded every matching
+``Transaction`` and summed in Python, with the SQL aggregation, for a
+monthly, a yearly and the all-time computation on an on-disk SQLite
+database.
+
+    python -m benchmarks.bench_statistics --rows 10000 100000 1000000
+"""
+import argparse
+import calendar
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy import extract
+
+from app.models.statistics import StatisticsPeriod
+from app.models.transaction import Transaction, TransactionType
+from app.services.statistics_service import StatisticsService
+
+from .fixtures import database_path, seeded_session
+
+
+def legacy_calculate_statistics(db, period, target_date=None):
+    """The original ``calculate_statistics`` (ORM rows summed in Python)."""
+    period_query = db.query(Transaction)
+    cumulative_query = db.query(Transaction)
+    yearly_query = db.query(Transaction)
+    if period == StatisticsPeriod.MONTHLY:
+        end = target_date.replace(day=calendar.monthrange(target_date.year, target_date.month)[1])
+        period_query = period_query.filter(
+            extract('year', Transaction.transaction_date) == target_date.year,
+            extract('month', Transaction.transaction_date) == target_date.month,
+        )
+        cumulative_query = cumulative_query.filter(Transaction.transaction_date <= end)
+        yearly_query = yearly_query.filter(
+            extract('year', Transaction.transaction_date) == target_date.year,
+            Transaction.transaction_date <= end,
+        )
+    elif period == StatisticsPeriod.YEARLY:
+        period_query = period_query.filter(extract('year', Transaction.transaction_date) == target_date.year)
+        cumulative_query = cumulative_query.filter(Transaction.transaction_date <= date(target_date.year, 12, 31))
+
+    result = {}
+    for name, query in (('period', period_query), ('total', cumulative_query), ('yearly', yearly_query)):
+        income = expenses = 0
+        for trans in query.all():
+            if trans.transaction_type == TransactionType.INCOME:
+                income += trans.amount
+            else:
+                expenses += abs(trans.amount)
+        result[name] = (income, expenses)
+    return result
+
+
+CASES = [
+    ('monthly', StatisticsPeriod.MONTHLY, date(2024, 6, 30)),
+    ('yearly', StatisticsPeriod.YEARLY, date(2024, 12, 31)),
+    ('all-time', StatisticsPeriod.ALL_TIME, None),
+]
+
+
+def _timed(func, *args) -> float:
+    started = time.perf_counter()
+    func(*args)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000, 1000000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'period':>9} {'before ms':>11} {'after ms':>10} {'speedup':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, db = seeded_session(database_path(tmp, rows), rows)
+            for label, period, target_date in CASES:
+                before = _timed(legacy_calculate_statistics, db, period, target_date)
+                db.expunge_all()
+                after = _timed(StatisticsService.calculate_statistics, db, period, target_date)
+                print(f"{rows:>9} {label:>9} {before:>11.1f} {after:>10.1f} {before / after:>7.1f}x")
+            db.close()
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
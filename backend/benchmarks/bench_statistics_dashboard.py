@@ -0,0 +1,80 @@
+"""
+Benchmark: one dashboard load (the four statistics timeseries calls) with a
+cold result cache vs a warm one.
+
+Cold: the cache is cleared before every load, so each call resolves its
+period and queries the statistics tables. Warm: the loads repeat without
+writes in between and are served from ``statistics_result_cache``.
+
+    python -m benchmarks.bench_statistics_dashboard --rows 20000 100000 --loads 20
+"""
+import os
+
+os.environ.setdefault("SUGGESTION_INDEX_PATH", ":memory:")
+
+import argparse
+import tempfile
+import time
+
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import sessionmaker
+
+from app.database import get_db, get_read_db
+from app.main import app
+from app.services.result_cache import statistics_result_cache
+from app.services.statistics_service import StatisticsService
+
+from .fixtures import database_path, seeded_session
+
+DASHBOARD = [
+    ('/statistics/timeseries', {'time_period': '1Y'}),
+    ('/statistics/category/averages', {'time_period': '1Y'}),
+    ('/statistics/category/timeseries', {'time_period': '1Y', 'transaction_type': 'Expense'}),
+    ('/statistics/expense-type/timeseries', {'time_period': '1Y'}),
+]
+
+
+def _load_ms(client, loads: int, clear: bool) -> float:
+    started = time.perf_counter()
+    for _ in range(loads):
+        if clear:
+            statistics_result_cache.clear()
+        for path, params in DASHBOARD:
+            assert client.get(path, params=params).status_code == 200, path
+    return (time.perf_counter() - started) * 1000 / loads
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--loads', type=int, default=20)
+    args = parser.parse_args()
+
+    client = TestClient(app)
+    print(f"{'rows':>9} {'cold ms/load':>13} {'warm ms/load':>13} {'speedup':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, db = seeded_session(database_path(tmp, rows), rows)
+            StatisticsService.initialize_statistics(db)
+            StatisticsService.initialize_category_statistics(db)
+            db.close()
+            sessions = sessionmaker(autoflush=False, expire_on_commit=False, bind=engine)
+
+            def session():
+                db = sessions()
+                try:
+                    yield db
+                finally:
+                    db.close()
+
+            app.dependency_overrides[get_db] = session
+            app.dependency_overrides[get_read_db] = session
+            cold = _load_ms(client, args.loads, clear=True)
+            warm = _load_ms(client, args.loads, clear=False)
+            print(f"{rows:>9} {cold:>13.2f} {warm:>13.2f} {cold / warm:>7.1f}x")
+            app.dependency_overrides.clear()
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
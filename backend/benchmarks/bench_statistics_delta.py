@@ -0,0 +1,74 @@
+"""
+Benchmark: statistics maintenance cost of one category edit.
+
+Compares ``StatisticsService.update_statistics`` (recompute the month, year
+and all-time rows) with ``StatisticsDeltaService.record_change`` (apply the
+edit's delta) on ten years of history.
+
+    python -m benchmarks.bench_statistics_delta --rows 20000 100000
+"""
+import argparse
+import random
+import tempfile
+import time
+
+from app.models.transaction import Transaction, ExpenseCategory, TransactionType
+from app.services.statistics_delta_service import StatisticsDeltaService
+from app.services.statistics_service import StatisticsService
+
+from .fixtures import database_path, seeded_session
+
+
+def _edits(db, count: int, seed: int = 1):
+    rng = random.Random(seed)
+    ids = [row.id for row in db.query(Transaction.id).filter(Transaction.transaction_type == TransactionType.EXPENSE)]
+    return [(tx_id, rng.choice(list(ExpenseCategory))) for tx_id in rng.sample(ids, count)]
+
+
+def recompute(db, tx_id, category):
+    transaction = db.get(Transaction, tx_id)
+    transaction.expense_category = category
+    StatisticsService.update_statistics(db, transaction.transaction_date)
+
+
+def delta(db, tx_id, category):
+    transaction = db.get(Transaction, tx_id)
+    before = StatisticsDeltaService.snapshot(transaction)
+    transaction.expense_category = category
+    StatisticsDeltaService.record_change(db, before, StatisticsDeltaService.snapshot(transaction))
+    db.commit()
+
+
+def _per_edit_ms(func, db, edits) -> float:
+    started = time.perf_counter()
+    for tx_id, category in edits:
+        func(db, tx_id, category)
+    return (time.perf_counter() - started) * 1000 / len(edits)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--edits', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'recompute ms/edit':>18} {'delta ms/edit':>14} {'speedup':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, db = seeded_session(database_path(tmp, rows), rows)
+            StatisticsService.initialize_statistics(db)
+            StatisticsService.initialize_category_statistics(db)
+            edits = _edits(db, args.edits * 2)
+            before = _per_edit_ms(recompute, db, edits[:args.edits])
+            # Start the delta run from consistent tables
+            StatisticsService.initialize_statistics(db)
+            StatisticsService.initialize_category_statistics(db)
+            after = _per_edit_ms(delta, db, edits[args.edits:])
+            assert StatisticsDeltaService.check_consistency(db)['consistent']
+            print(f"{rows:>9} {before:>18.1f} {after:>14.1f} {before / after:>7.0f}x")
+            db.close()
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark: rebuilding the statistics tables (``/statistics/initialize``).
+
+Compares the original initializers, which called ``calculate_statistics`` and
+``calculate_category_statistics`` once per month and year, with the
+single-scan ``StatisticsRebuildService`` on ten years of history.
+
+    python -m benchmarks.bench_statistics_rebuild --rows 20000 100000
+
+The original initializers take minutes from 100k rows on; raise
+``--legacy-max`` to include them.
+"""
+import argparse
+import calendar
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy import extract
+
+from app.models.statistics import FinancialStatistics, CategoryStatistics, StatisticsPeriod
+from app.models.transaction import Transaction
+from app.services.statistics_service import StatisticsService
+
+from .fixtures import database_path, seeded_session
+
+
+def legacy_initialize(db):
+    """The original per-period initializers (financial, then category statistics)."""
+    db.query(FinancialStatistics).delete()
+    db.query(CategoryStatistics).delete()
+    months = db.query(
+        extract('year', Transaction.transaction_date), extract('month', Transaction.transaction_date)
+    ).distinct().all()
+    years = db.query(extract('year', Transaction.transaction_date)).distinct().all()
+    periods = [
+        (StatisticsPeriod.MONTHLY, date(int(y), int(m), calendar.monthrange(int(y), int(m))[1])) for y, m in months
+    ] + [(StatisticsPeriod.YEARLY, date(int(y), 12, 31)) for (y,) in years] + [(StatisticsPeriod.ALL_TIME, None)]
+
+    for period, period_date in periods:
+        db.add(FinancialStatistics(
+            period=period, date=period_date,
+            **StatisticsService.calculate_statistics(db, period, period_date)
+        ))
+    for period, period_date in periods:
+        for cat_data in StatisticsService.calculate_category_statistics(db, period, period_date):
+            if cat_data['period_transaction_count'] > 0:
+                db.add(CategoryStatistics(period=period, date=period_date, **cat_data))
+    db.commit()
+
+
+def rebuild(db):
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+
+
+def _timed(func, db) -> float:
+    started = time.perf_counter()
+    func(db)
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--years', type=int, default=10)
+    parser.add_argument('--legacy-max', type=int, default=20000, help='skip the original initializers above this size')
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'before s':>10} {'after s':>9} {'speedup':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, db = seeded_session(database_path(tmp, rows), rows, years=args.years)
+            after = _timed(rebuild, db)
+            if rows > args.legacy_max:
+                print(f"{rows:>9} {'skipped':>10} {after:>9.3f}")
+            else:
+                before = _timed(legacy_initialize, db)
+                print(f"{rows:>9} {before:>10.2f} {after:>9.3f} {before / after:>7.0f}x")
+            db.close()
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,71 @@
+"""
+Benchmark: a burst of category edits with immediate vs deferred statistics.
+
+Immediate: every edit applies its delta in the request
+(``StatisticsDeltaService.record_change``). Deferred: every edit is a plain
+UPDATE plus ``StatisticsRefreshQueue.mark``; the burst is applied by one
+``flush``, as the background worker would after the debounce delay.
+
+    python -m benchmarks.bench_statistics_refresh_queue --rows 100000 --edits 50
+"""
+import argparse
+import tempfile
+import time
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models.transaction import Transaction
+from app.services.statistics_delta_service import StatisticsDeltaService
+from app.services.statistics_refresh_queue import StatisticsRefreshQueue
+from app.services.statistics_service import StatisticsService
+
+from .bench_statistics_delta import _edits, delta
+from .fixtures import database_path, seeded_session
+
+
+def deferred(queue):
+    def edit(db, tx_id, category):
+        transaction = db.get(Transaction, tx_id)
+        before = StatisticsDeltaService.snapshot(transaction)
+        transaction.expense_category = category
+        db.commit()
+        queue.mark(before, StatisticsDeltaService.snapshot(transaction))
+    return edit
+
+
+def _burst_ms(func, db, edits) -> float:
+    started = time.perf_counter()
+    for tx_id, category in edits:
+        func(db, tx_id, category)
+    return (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000])
+    parser.add_argument('--edits', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'immediate ms/edit':>18} {'deferred ms/edit':>17} {'refresh ms':>11}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, db = seeded_session(database_path(tmp, rows), rows)
+            StatisticsService.initialize_statistics(db)
+            StatisticsService.initialize_category_statistics(db)
+            edits = _edits(db, args.edits * 2)
+            immediate = _burst_ms(delta, db, edits[:args.edits]) / args.edits
+
+            # The worker never fires during the burst; flush stands in for it
+            queue = StatisticsRefreshQueue(sessionmaker(bind=engine, autoflush=False), delay=3600)
+            write = _burst_ms(deferred(queue), db, edits[args.edits:]) / args.edits
+            started = time.perf_counter()
+            queue.flush()
+            refresh = (time.perf_counter() - started) * 1000
+            assert StatisticsDeltaService.check_consistency(db)['consistent']
+            print(f"{rows:>9} {immediate:>18.2f} {write:>17.2f} {refresh:>11.1f}")
+            db.close()
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,51 @@
+"""
+Benchmark: computing the monthly financial timeseries without stored rows.
+
+Compares ``StatisticsService.calculate_statistics`` per month (each call
+rescans the history for the cumulative totals) with
+``StatisticsQueryService.financial_timeseries`` (one query with window sums).
+
+    python -m benchmarks.bench_statistics_timeseries --rows 20000 100000
+"""
+import argparse
+import tempfile
+import time
+from datetime import date
+
+from app.models.statistics import StatisticsPeriod
+from app.services.statistics_query_service import StatisticsQueryService
+from app.services.statistics_service import StatisticsService
+
+from .fixtures import database_path, seeded_session
+
+
+def per_month(db, months):
+    return [StatisticsService.calculate_statistics(db, StatisticsPeriod.MONTHLY, month_end) for month_end in months]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'months':>7} {'per-month ms':>13} {'window ms':>10} {'speedup':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, db = seeded_session(database_path(tmp, rows), rows)
+            started = time.perf_counter()
+            series = StatisticsQueryService.financial_timeseries(db)
+            after = (time.perf_counter() - started) * 1000
+            months = [date.fromisoformat(row['date']) for row in series]
+
+            started = time.perf_counter()
+            expected = per_month(db, months)
+            before = (time.perf_counter() - started) * 1000
+            for row, reference in zip(series, expected):
+                assert abs(row['total_income'] - reference['total_income']) < 1e-6 * max(1, abs(reference['total_income']))
+            print(f"{rows:>9} {len(months):>7} {before:>13.1f} {after:>10.1f} {before / after:>7.0f}x")
+            db.close()
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark: streaming transaction export (``TransactionExportService``) in
+each format vs loading every ORM row first and encoding the whole list.
+
+Reports throughput (rows/s and MiB/s of output) from an untraced pass and
+the peak Python heap (``tracemalloc``) from a second pass; the streamed
+exports stay flat as the table grows, the load-everything baseline does not.
+
+    python -m benchmarks.bench_transaction_export --rows 100000 1000000
+"""
+import argparse
+import csv
+import io
+import tempfile
+import time
+import tracemalloc
+
+from sqlalchemy.orm import sessionmaker
+
+from app.models.transaction import Transaction
+from app.services.transaction_export import EXPORT_FIELDS, TransactionExportService
+
+from .fixtures import database_path, seeded_session
+
+
+def load_all_csv(db, query):
+    """Baseline: materialize every row as an ORM object, then encode."""
+    transactions = query.all()
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    for transaction in transactions:
+        writer.writerow([getattr(transaction, field) for field in EXPORT_FIELDS])
+    yield buffer.getvalue().encode()
+
+
+def streamed(export_format):
+    def export(db, query):
+        return TransactionExportService.stream(query, export_format, session_factory=sessionmaker(bind=db.get_bind()))
+    return export
+
+
+def run(export, db, query, trace: bool):
+    db.expunge_all()
+    if trace:
+        tracemalloc.start()
+    started = time.perf_counter()
+    size = 0
+    for chunk in export(db, query):
+        size += len(chunk)
+    elapsed = time.perf_counter() - started
+    peak = 0.0
+    if trace:
+        peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+        tracemalloc.stop()
+    return elapsed, size, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[100000, 1000000])
+    parser.add_argument('--formats', nargs='+', default=['csv', 'ndjson', 'parquet'])
+    parser.add_argument('--skip-baseline', action='store_true', help="skip the load-everything baseline")
+    args = parser.parse_args()
+
+    exports = [(f'stream {name}', streamed(name)) for name in args.formats
+               if name != 'parquet' or TransactionExportService.parquet_available()]
+    if not args.skip_baseline:
+        exports.append(('load all csv', load_all_csv))
+
+    print(f"{'rows':>9} {'export':<15} {'seconds':>8} {'rows/s':>10} {'MiB/s':>7} {'out MiB':>8} {'peak MiB':>9}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, db = seeded_session(database_path(tmp, rows), rows)
+            query = db.query(Transaction).order_by(Transaction.transaction_date.desc())
+            for name, export in exports:
+                elapsed, size, _ = run(export, db, query, trace=False)
+                _, _, peak = run(export, db, query, trace=True)
+                mib = size / 1024 / 1024
+                print(f"{rows:>9} {name:<15} {elapsed:>8.2f} {rows / elapsed:>10.0f} {mib / elapsed:>7.1f} "
+                      f"{mib:>8.1f} {peak:>9.1f}")
+            db.close()
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""
+Benchmark: nearest-neighbour lookups in the category suggestion index.
+
+Compares ``QdrantVectorStore`` (local in-process Qdrant client) with
+``NumpyVectorStore`` on random 384-dimensional vectors: time to load the
+vectors, latency of a single top-k query and of a batch of queries (the
+shape of an upload's suggestion lookups).
+
+    python -m benchmarks.bench_vector_store --sizes 10000 100000 1000000
+
+Loading a million points into the local Qdrant client takes several minutes
+and a few GB of memory; use ``--qdrant-max`` to skip it above a size.
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services.vector_store import NumpyVectorStore, QdrantVectorStore
+
+DIMENSION = 384
+LOAD_CHUNK = 10000
+
+
+def _timed(func, repeat: int) -> float:
+    """Best wall time of ``repeat`` calls, in milliseconds."""
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best * 1000
+
+
+def bench(store, size: int, queries: np.ndarray, top_k: int, repeat: int):
+    rng = np.random.default_rng(0)
+    store.ensure_collection('bench', DIMENSION)
+    started = time.perf_counter()
+    for offset in range(0, size, LOAD_CHUNK):
+        count = min(LOAD_CHUNK, size - offset)
+        store.upsert(
+            'bench',
+            list(range(offset + 1, offset + count + 1)),
+            rng.normal(size=(count, DIMENSION)).astype(np.float32),
+            [{'category': 'Groceries', 'amount': 10.0}] * count,
+        )
+    load = time.perf_counter() - started
+    single = _timed(lambda: store.search_batch('bench', queries[:1], top_k), repeat)
+    batch = _timed(lambda: store.search_batch('bench', queries, top_k), repeat)
+    store.close()
+    return load, single, batch
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10000, 100000, 1000000])
+    parser.add_argument('--batch', type=int, default=64, help='queries per batch search')
+    parser.add_argument('--top-k', type=int, default=9, help='candidates per query (top_k * rerank factor)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--qdrant-max', type=int, default=1000000, help='skip Qdrant above this size')
+    args = parser.parse_args()
+
+    queries = np.random.default_rng(1).normal(size=(args.batch, DIMENSION)).astype(np.float32)
+    print(f"{'vectors':>9} {'store':>7} {'load s':>9} {'1 query ms':>11} {f'{args.batch} queries ms':>15}")
+    for size in args.sizes:
+        for name, factory in (('qdrant', QdrantVectorStore), ('numpy', NumpyVectorStore)):
+            if name == 'qdrant' and size > args.qdrant_max:
+                print(f"{size:>9} {name:>7} {'skipped':>9}")
+                continue
+            load, single, batch = bench(factory(), size, queries, args.top_k, args.repeat)
+            print(f"{size:>9} {name:>7} {load:>9.2f} {single:>11.2f} {batch:>15.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,78 @@
+"""
+Benchmark: the weekday distribution computed from every transaction row in
+Python vs aggregated in SQL (``StatisticsQueryService.weekday_distribution``).
+
+Reports wall time and the peak Python heap (``tracemalloc``) of each; the
+per-row version grows with the table, the SQL version stays flat.
+
+    python -m benchmarks.bench_weekday_distribution --rows 20000 100000 500000
+"""
+import argparse
+import tempfile
+import time
+import tracemalloc
+
+import numpy as np
+from sqlalchemy import extract
+
+from app.models.transaction import Transaction, TransactionType
+from app.services.statistics_query_service import StatisticsQueryService
+
+from .fixtures import database_path, seeded_session
+
+
+def per_row(db):
+    """The original implementation: load every row, group the amounts in lists."""
+    rows = db.query(
+        extract('dow', Transaction.transaction_date).label('weekday'),
+        Transaction.amount,
+        Transaction.transaction_type,
+    ).all()
+    amounts = {}
+    for row in rows:
+        kind = 'expense' if row.transaction_type == TransactionType.EXPENSE else 'income'
+        amounts.setdefault((int(row.weekday), kind), []).append(abs(row.amount))
+    return {
+        key: (len(values), sum(values), min(values), max(values), float(np.median(values)))
+        for key, values in amounts.items()
+    }
+
+
+def in_sql(db):
+    return {
+        (group['weekday'], group['kind']): (group['count'], group['total'], group['min'], group['max'], group['median'])
+        for group in StatisticsQueryService.weekday_distribution(db)
+    }
+
+
+def measure(func, db):
+    db.expire_all()
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = func(db)
+    elapsed = (time.perf_counter() - started) * 1000
+    peak = tracemalloc.get_traced_memory()[1] / 1024 / 1024
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, nargs='+', default=[20000, 100000, 500000])
+    args = parser.parse_args()
+
+    print(f"{'rows':>9} {'per-row ms':>11} {'per-row MiB':>12} {'SQL ms':>8} {'SQL MiB':>8}")
+    for rows in args.rows:
+        with tempfile.TemporaryDirectory() as tmp:
+            engine, db = seeded_session(database_path(tmp, rows), rows)
+            before, before_ms, before_mib = measure(per_row, db)
+            after, after_ms, after_mib = measure(in_sql, db)
+            for key, expected in before.items():
+                assert np.allclose(after[key], expected), key
+            print(f"{rows:>9} {before_ms:>11.1f} {before_mib:>12.2f} {after_ms:>8.1f} {after_mib:>8.2f}")
+            db.close()
+            engine.dispose()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,57 @@
+"""
+Synthetic transaction histories shared by the statistics benchmarks.
+"""
+import os
+import random
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, insert
+from sqlalchemy.orm import sessionmaker
+
+from app.database import Base
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
+
+INSERT_CHUNK = 50000
+
+
+def random_rows(rows: int, years: int = 10, seed: int = 42):
+    """Yield ``rows`` categorized transactions spread over the last ``years`` years."""
+    rng = random.Random(seed)
+    start = date(2025 - years, 1, 1)
+    expense_categories = list(ExpenseCategory)
+    income_categories = list(IncomeCategory)
+    for i in range(rows):
+        income = rng.random() < 0.15
+        amount = round(rng.uniform(100, 4000) if income else -rng.uniform(1, 300), 2)
+        yield {
+            'account_number': 'BE1234567890',
+            'transaction_date': start + timedelta(days=rng.randrange(365 * years)),
+            'amount': amount,
+            'currency': 'EUR',
+            'description': f'Payment {i}',
+            'transaction_type': TransactionType.INCOME if income else TransactionType.EXPENSE,
+            'expense_category': None if income else rng.choice(expense_categories),
+            'income_category': rng.choice(income_categories) if income else None,
+            'source_bank': 'ING',
+        }
+
+
+def seeded_session(path: str, rows: int, years: int = 10):
+    """Create an on-disk SQLite database at ``path`` holding ``rows`` random
+    transactions and return ``(engine, session)``."""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(bind=engine)
+    with engine.begin() as conn:
+        chunk = []
+        for row in random_rows(rows, years):
+            chunk.append(row)
+            if len(chunk) >= INSERT_CHUNK:
+                conn.execute(insert(Transaction), chunk)
+                chunk = []
+        if chunk:
+            conn.execute(insert(Transaction), chunk)
+    return engine, sessionmaker(bind=engine)()
+
+
+def database_path(tmp_dir: str, rows: int) -> str:
+    return os.path.join(tmp_dir, f'bench_{rows}.db')
@@ -3,14 +3,24 @@ Shared test configuration: override the database with an in-memory SQLite
 instance so tests never touch the production database.
 
 Uses a shared-cache in-memory DB so all connections see the same tables.
+The category suggestion index is kept in memory as well, and statistics
+refreshes are applied synchronously unless a test sets up its own queue.
 """
+import os
+
+os.environ.setdefault("SUGGESTION_INDEX_PATH", ":memory:")
+os.environ.setdefault("STATISTICS_REFRESH_DELAY", "0")
+
 import pytest
 from sqlalchemy import create_engine, event
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import StaticPool
 
-from app.database import Base, get_db
+from app.database import Base, configure_sqlite_engine, get_db, get_read_db
 from app.main import app
+from app.services.data_version import data_version
+from app.services.statistics_refresh_queue import statistics_refresh_queue
+from app.services.transaction_export import TransactionExportService
 
 # Shared in-memory SQLite engine for tests.
 # StaticPool + check_same_thread=False ensures a single shared connection
@@ -20,7 +30,12 @@ _test_engine = create_engine(
     connect_args={"check_same_thread": False},
     poolclass=StaticPool,
 )
+# Same pragma profile as production (WAL falls back to the memory journal)
+configure_sqlite_engine(_test_engine)
 _TestSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=_test_engine)
+# Read sessions share the single in-memory connection; a read-only file engine
+# is exercised in test_read_write_split.py
+_TestReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=_test_engine)
 
 
 def _override_get_db():
@@ -31,13 +46,26 @@ def _override_get_db():
         db.close()
 
 
-# Override the get_db dependency globally for all tests
+def _override_get_read_db():
+    db = _TestReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+# Override the get_db and get_read_db dependencies globally for all tests
 app.dependency_overrides[get_db] = _override_get_db
+app.dependency_overrides[get_read_db] = _override_get_read_db
+statistics_refresh_queue.session_factory = _TestSessionLocal
+TransactionExportService.session_factory = _TestReadSessionLocal
 
 
 @pytest.fixture(autouse=True)
 def _setup_test_db():
     """Create all tables before each test and drop them after."""
     Base.metadata.create_all(bind=_test_engine)
+    # Results cached by an earlier test belong to other data
+    data_version.bump()
     yield
     Base.metadata.drop_all(bind=_test_engine)
@@ -0,0 +1,115 @@
+"""
+Tests for PATCH /transactions/categories: many recategorizations in one
+request, with one statistics refresh, one suggestion-index batch and one
+anomaly re-detection.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
+from app.routers import transactions as transactions_router
+from app.services.statistics_delta_service import StatisticsDeltaService
+from app.services.statistics_service import StatisticsService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def seeded(db):
+    for month in range(1, 7):
+        db.add(Transaction(account_number='BE1', transaction_date=date(2024, month, 3), amount=-10.0 * month,
+                           currency='EUR', description=f'Shop {month}', source_bank='ING',
+                           transaction_type=TransactionType.EXPENSE))
+    db.add(Transaction(account_number='BE1', transaction_date=date(2024, 2, 25), amount=2000.0, currency='EUR',
+                       description='Salary', source_bank='ING', transaction_type=TransactionType.INCOME))
+    db.commit()
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+    return {t.description: t.id for t in db.query(Transaction).all()}
+
+
+def _count_calls(monkeypatch, target, name):
+    calls = []
+    original = getattr(target, name)
+
+    def counting(*args, **kwargs):
+        calls.append((args, kwargs))
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(target, name, counting)
+    return calls
+
+
+def test_batch_update_applies_every_category(db, seeded):
+    updates = [
+        {'id': seeded[f'Shop {month}'], 'category': ExpenseCategory.GROCERIES.value, 'transaction_type': 'Expense'}
+        for month in range(1, 7)
+    ] + [{'id': seeded['Salary'], 'category': list(IncomeCategory)[0].value, 'transaction_type': 'Income'}]
+
+    resp = client.patch('/transactions/categories', json=updates)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body['updated'] == 7
+    assert body['affected_months'] == 6
+    assert set(body['timings_ms']) == {'update', 'statistics', 'suggestions', 'anomalies', 'total'}
+    assert {t['expense_category'] for t in body['transactions'] if t['transaction_type'] == 'Expense'} == {'Groceries'}
+
+    db.expire_all()
+    assert db.query(Transaction).filter(Transaction.expense_category == ExpenseCategory.GROCERIES).count() == 6
+    assert StatisticsDeltaService.check_consistency(db) == {'consistent': True, 'drift': []}
+
+
+def test_batch_update_runs_each_phase_once(db, seeded, monkeypatch):
+    refreshes = _count_calls(monkeypatch, StatisticsDeltaService, 'apply_deltas')
+    index_batches = _count_calls(monkeypatch, transactions_router.category_suggestion_service, 'add_transactions_batch')
+    detections = _count_calls(monkeypatch, transactions_router.AnomalyDetectionService, 'detect_anomalies')
+
+    updates = [
+        {'id': seeded[f'Shop {month}'], 'category': category.value, 'transaction_type': 'Expense'}
+        for month in range(1, 7)
+        for category in (ExpenseCategory.GROCERIES, ExpenseCategory.UTILITIES)
+    ]
+    assert client.patch('/transactions/categories', json=updates).status_code == 200
+
+    assert len(refreshes) == 1
+    assert len(index_batches) == 1
+    assert len(detections) == 1
+    assert sorted(detections[0][1]['transaction_ids']) == sorted(seeded[f'Shop {m}'] for m in range(1, 7))
+    # The last update of a transaction wins
+    db.expire_all()
+    assert db.query(Transaction).filter(Transaction.expense_category == ExpenseCategory.UTILITIES).count() == 6
+    assert StatisticsDeltaService.check_consistency(db)['consistent']
+
+
+def test_unknown_transaction_rejects_the_whole_batch(db, seeded):
+    updates = [
+        {'id': seeded['Shop 1'], 'category': 'Groceries', 'transaction_type': 'Expense'},
+        {'id': 9999, 'category': 'Groceries', 'transaction_type': 'Expense'},
+    ]
+    resp = client.patch('/transactions/categories', json=updates)
+    assert resp.status_code == 404
+    assert '9999' in resp.json()['detail']
+    db.expire_all()
+    assert db.get(Transaction, seeded['Shop 1']).expense_category is None
+
+
+def test_invalid_category_is_rejected(seeded):
+    resp = client.patch('/transactions/categories', json=[
+        {'id': seeded['Salary'], 'category': 'Groceries', 'transaction_type': 'Income'},
+    ])
+    assert resp.status_code == 422
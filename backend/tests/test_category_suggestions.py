@@ -0,0 +1,265 @@
+"""
+Tests for the CategorySuggestionService index: batched indexing and lookups,
+the incremental, persisted sync with the transactions table, the
+description embedding cache and the background warm-up.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
+from app.routers.suggestions import category_suggestion_service
+from app.schemas.transaction import Transaction as TransactionSchema
+from app.services.category_suggestion_service import CategorySuggestionService
+
+client = TestClient(app)
+
+
+def _clear_vector_collections():
+    for name in ("expense_embeddings", "income_embeddings"):
+        category_suggestion_service.store.clear(name)
+
+
+def _transaction(tx_id, description, amount, expense_category=None, income_category=None):
+    return TransactionSchema(
+        id=tx_id,
+        account_number='BE1',
+        transaction_date=date(2025, 1, 1),
+        amount=amount,
+        currency='EUR',
+        description=description,
+        transaction_type=TransactionType.INCOME if amount > 0 else TransactionType.EXPENSE,
+        expense_category=expense_category,
+        income_category=income_category,
+        source_bank='ING',
+    )
+
+
+def test_add_transactions_batch_skips_uncategorized_and_splits_collections():
+    _clear_vector_collections()
+
+    indexed = category_suggestion_service.add_transactions_batch([
+        _transaction(1, 'Supermarket weekly shop', -80.0, expense_category=ExpenseCategory.GROCERIES),
+        _transaction(2, 'Monthly salary', 3000.0, income_category=IncomeCategory.SALARY),
+        _transaction(3, 'Unknown payment', -5.0),
+    ])
+
+    assert indexed == 2
+    expense = category_suggestion_service.store.retrieve("expense_embeddings", [1, 3])
+    income = category_suggestion_service.store.retrieve("income_embeddings", [2])
+    assert [payload['category'] for _, payload in expense] == ['Groceries']
+    assert [payload['category'] for _, payload in income] == ['Salary']
+
+
+def test_suggest_categories_batch_matches_single_lookups():
+    _clear_vector_collections()
+    category_suggestion_service.add_transactions_batch([
+        _transaction(1, 'Supermarket weekly shop', -80.0, expense_category=ExpenseCategory.GROCERIES),
+        _transaction(2, 'Cinema tickets', -25.0, expense_category=ExpenseCategory.ENTERTAINMENT),
+    ])
+
+    items = [
+        ('Supermarket weekly shop', -80.0, TransactionType.EXPENSE),
+        ('Monthly salary', 3000.0, TransactionType.INCOME),  # empty income collection
+        ('Cinema tickets', -25.0, TransactionType.EXPENSE),
+    ]
+    batch = category_suggestion_service.suggest_categories_batch(items)
+
+    assert len(batch) == 3
+    assert batch[1] == []
+    assert batch[0][0][0] == 'Groceries'
+    assert batch[2][0][0] == 'Entertainment'
+    for item, suggestions in zip(items, batch):
+        single = category_suggestion_service.suggest_category(*item)
+        assert [c for c, _ in single] == [c for c, _ in suggestions]
+
+
+def _seed(db, tx_id, description, amount, expense_category=None):
+    db.add(Transaction(
+        id=tx_id, account_number='BE1', transaction_date=date(2025, 1, 1), amount=amount,
+        currency='EUR', description=description, source_bank='ING',
+        transaction_type=TransactionType.EXPENSE, expense_category=expense_category,
+    ))
+    db.commit()
+
+
+def _count_encoded(service, monkeypatch):
+    encoded = []
+    original = service._encode
+
+    def counting_encode(texts):
+        encoded.extend(texts)
+        return original(texts)
+
+    monkeypatch.setattr(service, '_encode', counting_encode)
+    return encoded
+
+
+def _count_encoded_by_model(service, monkeypatch):
+    encoded = []
+    original = service.model.encode
+
+    def counting_encode(texts, **kwargs):
+        encoded.extend(texts)
+        return original(texts, **kwargs)
+
+    monkeypatch.setattr(service.model, 'encode', counting_encode)
+    return encoded
+
+
+def test_training_only_embeds_new_or_changed_transactions(monkeypatch):
+    _clear_vector_collections()
+    encoded = _count_encoded(category_suggestion_service, monkeypatch)
+    db = next(app.dependency_overrides[get_db]())
+    try:
+        _seed(db, 1, 'Supermarket weekly shop', -80.0, ExpenseCategory.GROCERIES)
+        _seed(db, 2, 'Cinema tickets', -25.0, ExpenseCategory.ENTERTAINMENT)
+        _seed(db, 3, 'Unknown payment', -5.0)
+
+        category_suggestion_service.train_on_existing_transactions(db)
+        assert len(encoded) == 2
+
+        # Nothing changed: nothing is re-embedded
+        encoded.clear()
+        category_suggestion_service.train_on_existing_transactions(db)
+        assert encoded == []
+
+        # A recategorized transaction is re-embedded, a deleted one is removed
+        db.query(Transaction).filter(Transaction.id == 2).update({'expense_category': ExpenseCategory.SHOPPING})
+        db.query(Transaction).filter(Transaction.id == 1).delete()
+        db.commit()
+        category_suggestion_service.train_on_existing_transactions(db)
+        assert len(encoded) == 1
+
+        points = category_suggestion_service.store.retrieve("expense_embeddings", [1, 2])
+        assert [(point_id, payload['category']) for point_id, payload in points] == [(2, 'Shopping')]
+    finally:
+        db.close()
+
+
+@pytest.mark.parametrize('vector_store', ['qdrant', 'numpy'])
+def test_index_persists_between_service_instances(tmp_path, vector_store):
+    index_path = str(tmp_path / 'index')
+    first = CategorySuggestionService(index_path=index_path, vector_store=vector_store)
+    first.add_transactions_batch([
+        _transaction(7, 'Supermarket weekly shop', -80.0, expense_category=ExpenseCategory.GROCERIES),
+    ])
+    first.store.close()
+
+    second = CategorySuggestionService(index_path=index_path, vector_store=vector_store)
+    try:
+        points = second.store.retrieve("expense_embeddings", [7])
+        assert [payload['category'] for _, payload in points] == ['Groceries']
+    finally:
+        second.store.close()
+
+
+def test_recurring_descriptions_hit_the_embedding_cache(monkeypatch):
+    _clear_vector_collections()
+    encoded = _count_encoded_by_model(category_suggestion_service, monkeypatch)
+    before = category_suggestion_service.embedding_cache.stats()
+
+    # Same merchant, different amounts: one embedding serves every row
+    category_suggestion_service.add_transactions_batch([
+        _transaction(tx_id, 'Netflix subscription', -amount, expense_category=ExpenseCategory.ENTERTAINMENT)
+        for tx_id, amount in [(11, 12.99), (12, 13.99), (13, 15.99)]
+    ])
+    category_suggestion_service.suggest_category('Netflix subscription', -17.99, TransactionType.EXPENSE)
+
+    assert encoded.count(category_suggestion_service._preprocess_description('Netflix subscription')) <= 1
+    after = client.get('/suggestions/cache-stats').json()
+    assert after['hits'] - before['hits'] >= 1
+    assert after['size'] >= 1
+
+
+def test_amount_breaks_ties_between_identical_descriptions():
+    _clear_vector_collections()
+    category_suggestion_service.add_transactions_batch([
+        _transaction(21, 'Transfer to J. Doe', -900.0, expense_category=ExpenseCategory.HOUSING),
+        _transaction(22, 'Transfer to J. Doe', -20.0, expense_category=ExpenseCategory.GIFTS),
+    ])
+
+    assert category_suggestion_service.suggest_category('Transfer to J. Doe', -900.0, TransactionType.EXPENSE)[0][0] == 'Housing'
+    assert category_suggestion_service.suggest_category('Transfer to J. Doe', -25.0, TransactionType.EXPENSE)[0][0] == 'Gifts'
+
+
+def test_embedding_cache_persists_to_disk(tmp_path):
+    import numpy as np
+    from app.services.embedding_cache import EmbeddingCache
+
+    path = str(tmp_path / 'cache.npz')
+    cache = EmbeddingCache(max_size=2, path=path)
+    for key in ('a', 'b', 'c'):
+        cache.put(key, np.full(4, ord(key), dtype=np.float32))
+    cache.save()
+
+    reloaded = EmbeddingCache(max_size=2, path=path)
+    assert len(reloaded) == 2
+    assert reloaded.get('a') is None  # evicted as least recently used
+    assert reloaded.get('c')[0] == ord('c')
+    assert reloaded.stats()['hits'] == 1 and reloaded.stats()['misses'] == 1
+
+
+def test_model_is_loaded_lazily_and_warm_up_reports_readiness():
+    service = CategorySuggestionService(index_path=':memory:')
+    assert service.status() == {
+        'state': 'pending', 'ready': False, 'model_loaded': False, 'warmup_seconds': None, 'error': None,
+    }
+
+    db = next(app.dependency_overrides[get_db]())
+    try:
+        _seed(db, 31, 'Supermarket weekly shop', -80.0, ExpenseCategory.GROCERIES)
+        service.warm_up(lambda: next(app.dependency_overrides[get_db]()))
+    finally:
+        db.close()
+
+    status = service.status()
+    assert status['state'] == 'ready' and status['ready'] and status['model_loaded']
+    points = service.store.retrieve("expense_embeddings", [31])
+    assert [payload['category'] for _, payload in points] == ['Groceries']
+
+
+def test_suggestions_for_empty_collections_do_not_load_the_model(monkeypatch):
+    service = CategorySuggestionService(index_path=':memory:')
+    items = [('Supermarket weekly shop', -80.0, TransactionType.EXPENSE), ('Salary', 3000.0, TransactionType.INCOME)]
+    assert service.suggest_categories_batch(items) == [[], []]
+    assert service.status()['model_loaded'] is False
+
+    # Only the items whose collection has points are embedded
+    service.add_transactions_batch([
+        _transaction(1, 'Supermarket weekly shop', -80.0, expense_category=ExpenseCategory.GROCERIES),
+    ])
+    encoded = []
+    encode = service._encode
+    monkeypatch.setattr(service, '_encode', lambda texts: encoded.extend(texts) or encode(texts))
+    suggestions = service.suggest_categories_batch(items)
+    assert suggestions[0][0][0] == 'Groceries' and suggestions[1] == []
+    assert len(encoded) == 1
+
+
+def test_failed_warm_up_is_reported():
+    service = CategorySuggestionService(index_path=':memory:')
+
+    def broken_session():
+        raise RuntimeError('database unavailable')
+
+    service.warm_up(broken_session)
+    assert service.status()['state'] == 'failed'
+    assert service.status()['error'] == 'database unavailable'
+
+
+def test_readiness_endpoint_returns_503_until_warmed_up(monkeypatch):
+    monkeypatch.setattr(category_suggestion_service, 'warmup_state', 'warming')
+    resp = client.get('/suggestions/ready')
+    assert resp.status_code == 503
+    assert resp.json()['state'] == 'warming'
+
+    monkeypatch.setattr(category_suggestion_service, 'warmup_state', 'ready')
+    resp = client.get('/suggestions/ready')
+    assert resp.status_code == 200
+    assert resp.json()['ready'] is True
@@ -0,0 +1,213 @@
+"""
+Tests for ETag / 304 Not Modified support and response memoization on the
+read endpoints (ConditionalGetMiddleware), and for the data-version bumps of
+the write paths they rely on.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+import csv
+import io
+import sqlite3
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.database import get_db
+from app import http_cache
+from app.http_cache import make_etag
+from app.models.anomaly import TransactionAnomaly, AnomalyType, AnomalySeverity
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory
+from app.routers import transactions as tx_router
+from app.services.data_version import DataVersion, data_version
+from app.services.statistics_service import StatisticsService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def seeded(db):
+    for month in range(1, 7):
+        db.add(Transaction(account_number='BE1', transaction_date=date(2024, month, 5), amount=-20.0 * month,
+                           currency='EUR', description=f'Shop {month}', source_bank='ING',
+                           transaction_type=TransactionType.EXPENSE, expense_category=ExpenseCategory.GROCERIES))
+    db.commit()
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+    transaction = db.query(Transaction).first()
+    db.add(TransactionAnomaly(transaction_id=transaction.id, anomaly_type=AnomalyType.STATISTICAL_OUTLIER,
+                              severity=AnomalySeverity.LOW, anomaly_score=10.0, confidence=0.5,
+                              detection_method='test', reason='test'))
+    db.commit()
+    return db
+
+
+@contextmanager
+def counted_statements(db):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _ing_csv() -> bytes:
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter=';')
+    writer.writerow(['Account Number', 'Account Name', 'Counterparty account', 'Booking date', 'Amount',
+                     'Currency', 'Description'])
+    writer.writerow(['BE1', 'Main Account', 'BE2', '03/07/2024', '-12,50', 'EUR', 'Bakery'])
+    return output.getvalue().encode()
+
+
+@pytest.mark.parametrize('path, params', [
+    ('/statistics/overview', {}),
+    ('/statistics/timeseries', {'time_period': '6M'}),
+    ('/financial-health/history', {'months': 6}),
+    ('/projections/scenarios', {}),
+    ('/budgets/', {}),
+    ('/anomalies/', {}),
+    ('/transactions/', {'page_size': 5}),
+])
+def test_unchanged_data_returns_304(seeded, path, params):
+    # Some GETs store what they compute on a miss (default scenarios, scores)
+    client.get(path, params=params)
+    first = client.get(path, params=params)
+    assert first.status_code == 200
+    etag = first.headers['etag']
+    assert first.headers['cache-control'] == 'no-cache'
+
+    second = client.get(path, params=params, headers={'If-None-Match': etag})
+    assert second.status_code == 304
+    assert second.content == b''
+    assert second.headers['etag'] == etag
+
+
+def test_etag_depends_on_params_and_version(seeded):
+    six = client.get('/statistics/timeseries', params={'time_period': '6M'}).headers['etag']
+    year = client.get('/statistics/timeseries', params={'time_period': '1Y'}).headers['etag']
+    assert six != year
+    # Parameter order does not matter
+    assert (client.get('/transactions/?page=1&page_size=5').headers['etag']
+            == client.get('/transactions/?page_size=5&page=1').headers['etag'])
+
+    data_version.bump()
+    resp = client.get('/statistics/timeseries', params={'time_period': '6M'}, headers={'If-None-Match': six})
+    assert resp.status_code == 200
+    assert resp.headers['etag'] != six
+
+
+def test_etags_differ_between_processes():
+    assert (make_etag(DataVersion().epoch, 1, '2024-06-01', '/x', '')
+            != make_etag(DataVersion().epoch, 1, '2024-06-01', '/x', ''))
+
+
+def test_cached_responses_expire_with_the_day(seeded, monkeypatch):
+    class Tomorrow(date):
+        @classmethod
+        def today(cls):
+            return date.fromordinal(date.today().toordinal() + 1)
+
+    first = client.get('/statistics/overview')
+    assert first.status_code == 200
+    monkeypatch.setattr(http_cache, 'date', Tomorrow)
+    # Endpoints defaulting to the current date are computed again on a new day
+    with counted_statements(seeded) as statements:
+        resp = client.get('/statistics/overview', headers={'If-None-Match': first.headers['etag']})
+    assert resp.status_code == 200
+    assert resp.headers['etag'] != first.headers['etag']
+    assert statements
+
+
+def test_writes_of_other_processes_change_the_version(tmp_path):
+    path = str(tmp_path / 'shared.db')
+    other = sqlite3.connect(path)
+    other.execute('PRAGMA journal_mode=WAL')
+    other.execute('CREATE TABLE t (a INTEGER)')
+    other.commit()
+
+    version = DataVersion()
+    version.watch(path)
+    try:
+        start = version.value
+        other.execute('SELECT * FROM t').fetchall()
+        assert version.value == start
+
+        # e.g. the reset CLI or a second worker
+        other.execute('INSERT INTO t VALUES (1)')
+        other.commit()
+        assert version.value == start + 1
+        assert version.value == start + 1
+
+        version.bump()
+        assert version.value == start + 2
+    finally:
+        version.unwatch()
+        other.close()
+
+
+def test_repeated_requests_are_memoized(seeded):
+    first = client.get('/statistics/overview')
+    with counted_statements(seeded) as statements:
+        again = client.get('/statistics/overview')
+    assert again.status_code == 200
+    assert again.json() == first.json()
+    assert again.headers['x-statistics-stale'] == first.headers['x-statistics-stale']
+    assert statements == []
+
+
+def test_status_and_write_endpoints_are_not_cached(seeded):
+    assert 'etag' not in client.get('/statistics/refresh-status').headers
+    assert 'etag' not in client.get('/statistics/cache-stats').headers
+    assert 'etag' not in client.post('/statistics/refresh').headers
+
+
+def _write_paths(db):
+    transaction = db.query(Transaction).order_by(Transaction.id.desc()).first()
+    anomaly = db.query(TransactionAnomaly).first()
+    restore = {
+        'account_number': 'BE1', 'transaction_date': '2024-06-20', 'amount': -3.0, 'currency': 'EUR',
+        'description': 'Restored', 'source_bank': 'ING', 'transaction_type': 'Expense',
+    }
+    return {
+        'upload': lambda: client.post('/transactions/upload/', files={'file': ('x.csv', _ing_csv(), 'text/csv')}),
+        'category change': lambda: client.patch(f'/transactions/{transaction.id}/category',
+                                                params={'category': 'Utilities', 'transaction_type': 'Expense'}),
+        'batch category change': lambda: client.patch('/transactions/categories', json=[
+            {'id': transaction.id, 'category': 'Groceries', 'transaction_type': 'Expense'}]),
+        'delete': lambda: client.delete(f'/transactions/{transaction.id}'),
+        'restore': lambda: client.post('/transactions/restore', json=restore),
+        'budget create': lambda: client.post('/budgets/', json={'category': 'Groceries', 'limit_amount': 200}),
+        'budget update': lambda: client.put('/budgets/1', json={'limit_amount': 250}),
+        'budget delete': lambda: client.delete('/budgets/1'),
+        'anomaly status': lambda: client.patch(f'/anomalies/{anomaly.id}/status', json={'status': 'Reviewed'}),
+    }
+
+
+def test_every_write_path_changes_the_etags(seeded):
+    tx_router._upload_attempts.clear()
+    for name, write in _write_paths(seeded).items():
+        before = client.get('/transactions/')
+        version = data_version.value
+        assert write().status_code in (200, 201), name
+        assert data_version.value > version, name
+        after = client.get('/transactions/', headers={'If-None-Match': before.headers['etag']})
+        assert after.status_code == 200, name
@@ -0,0 +1,126 @@
+"""
+Tests for the columnar CSV parsers: every bank parser must produce exactly the
+transactions the original row-by-row implementation produced for the mock
+exports under tests/mock_data.
+"""
+import csv
+import glob
+import os
+from datetime import date
+
+import pytest
+
+from app.models.transaction import TransactionType
+from app.services.csv_parser import CSVParser
+
+MOCK_DATA_DIR = os.path.join(os.path.dirname(__file__), 'mock_data')
+
+
+def _reference_date(value: str) -> date:
+    # Row-wise semantics of CSVParser.convert_date
+    parts = value.split('/')
+    if len(parts) == 3:
+        value = f"{parts[2]}-{parts[1]}-{parts[0]}"
+    return date.fromisoformat(value)
+
+
+def _reference_rows(path: str):
+    with open(path, newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f, delimiter=';'))
+
+
+def _mock_files(bank: str):
+    return sorted(glob.glob(os.path.join(MOCK_DATA_DIR, bank, f'{bank}-*.csv')))
+
+
+@pytest.mark.parametrize('path', _mock_files('ing'), ids=os.path.basename)
+def test_ing_parser_matches_row_wise_reference(path):
+    parsed = CSVParser.parse_csv(path)
+    rows = _reference_rows(path)
+    assert len(parsed) == len(rows)
+
+    for trans, row in zip(parsed, rows):
+        amount = float(row['Amount'].strip().replace(',', '.'))
+        assert trans.account_number == row['Account Number']
+        assert trans.transaction_date == _reference_date(row['Booking date'])
+        assert trans.amount == amount
+        assert trans.currency == row['Currency']
+        assert trans.description == row['Description']
+        assert trans.counterparty_account == (row['Counterparty account'] or None)
+        assert trans.counterparty_name is None
+        assert trans.transaction_type == (TransactionType.INCOME if amount > 0 else TransactionType.EXPENSE)
+        assert trans.source_bank == 'ING'
+
+
+@pytest.mark.parametrize('path', _mock_files('kbc'), ids=os.path.basename)
+def test_kbc_parser_matches_row_wise_reference(path):
+    parsed = CSVParser.parse_csv(path)
+    rows = _reference_rows(path)
+    assert len(parsed) == len(rows)
+
+    for trans, row in zip(parsed, rows):
+        amount = float(row['Amount'].strip().replace(',', '.'))
+        assert trans.account_number == row['Account number']
+        assert trans.transaction_date == _reference_date(row['Date'])
+        assert trans.amount == amount
+        assert trans.currency == row['Currency']
+        assert trans.description == row['Description']
+        assert trans.counterparty_name == (row['Counterparty name'] or None)
+        assert trans.counterparty_account == (row["counterparty's account number"] or None)
+        assert trans.transaction_type == (TransactionType.INCOME if amount > 0 else TransactionType.EXPENSE)
+        assert trans.source_bank == 'KBC'
+
+
+def test_beobank_parser_splits_debit_and_credit(tmp_path):
+    path = tmp_path / 'beobank.csv'
+    path.write_text(
+        'Date;Debit;Credit;Message;Balance\n'
+        '05/02/2025;12,50;;Supermarket;100,00\n'
+        '06/02/2025;;1000,00;Salary;1100,00\n'
+        '07/02/2025;;;Balance check;1100,00\n'
+        '08/02/2025; ;3,20;Refund;1103,20\n',
+        encoding='utf-8',
+    )
+
+    parsed = CSVParser.parse_csv(str(path))
+
+    assert [(t.transaction_date, t.amount, t.transaction_type, t.description) for t in parsed] == [
+        (date(2025, 2, 5), -12.5, TransactionType.EXPENSE, 'Supermarket'),
+        (date(2025, 2, 6), 1000.0, TransactionType.INCOME, 'Salary'),
+        (date(2025, 2, 8), 3.2, TransactionType.INCOME, 'Refund'),
+    ]
+    assert all(t.account_number == '' and t.currency == 'EUR' and t.source_bank == 'Beobank' for t in parsed)
+
+
+def test_date_column_conversion_matches_scalar_conversion():
+    import pandas as pd
+
+    values = ['31/01/2024', '2024-01-31', '1/2/2024', 'not a date', '01/02']
+    converted = CSVParser.convert_date_column(pd.Series(values)).tolist()
+    assert converted == [CSVParser.convert_date(v) for v in values]
+
+
+def test_latin1_export_is_decoded_once_and_parsed():
+    content = (
+        'Account Number;Account Name;Counterparty account;Booking date;Amount;Currency;Description\n'
+        'BE1234567890;Main Account;;01/03/2025;-4,50;EUR;Caf\xe9 cr\xe8me\n'
+    ).encode('latin1')
+
+    assert CSVParser.detect_encoding(content) == 'latin1'
+    parsed = CSVParser.parse_csv_bytes(content)
+
+    assert len(parsed) == 1
+    assert parsed[0].description == 'Caf\xe9 cr\xe8me'
+    assert parsed[0].transaction_date == date(2025, 3, 1)
+
+
+def test_utf8_bom_and_late_non_utf8_bytes():
+    header = 'Account Number;Account Name;Counterparty account;Booking date;Amount;Currency;Description\n'
+    assert CSVParser.detect_encoding(b'\xef\xbb\xbf' + header.encode('utf-8')) == 'utf-8-sig'
+    assert CSVParser.read_headers(CSVParser.decode_csv_bytes(b'\xef\xbb\xbf' + header.encode('utf-8')))[0] == 'Account Number'
+
+    # Invalid UTF-8 beyond the sampled prefix still decodes via the latin1 fallback
+    filler = 'BE1234567890;Main Account;;01/03/2025;-1,00;EUR;Filler\n' * 2000
+    content = (header + filler).encode('utf-8') + 'BE1234567890;Main Account;;02/03/2025;-2,00;EUR;Fa\xe7ade\n'.encode('latin1')
+    parsed = CSVParser.parse_csv_bytes(content)
+    assert parsed[-1].description == 'Fa\xe7ade'
@@ -0,0 +1,32 @@
+"""
+Golden-file test for the description normalizer: its output must stay
+identical to the original sequential regex implementation for every
+description in the bank mock exports and a set of synthetic, realistic bank
+descriptions (tests/mock_data/normalized_descriptions.json).
+"""
+import glob
+import json
+import os
+
+import pandas as pd
+import pytest
+
+from app.services.description_normalizer import normalize_description
+
+MOCK_DATA_DIR = os.path.join(os.path.dirname(__file__), 'mock_data')
+
+with open(os.path.join(MOCK_DATA_DIR, 'normalized_descriptions.json'), encoding='utf-8') as f:
+    GOLDEN = {entry['description']: entry['normalized'] for entry in json.load(f)}
+
+
+@pytest.mark.parametrize('description', sorted(GOLDEN))
+def test_matches_golden_output(description):
+    assert normalize_description(description) == GOLDEN[description]
+
+
+def test_golden_file_covers_bank_mock_data():
+    descriptions = set()
+    for path in glob.glob(os.path.join(MOCK_DATA_DIR, '*', '*.csv')):
+        descriptions |= set(pd.read_csv(path, sep=';')['Description'].dropna())
+    assert descriptions
+    assert descriptions <= set(GOLDEN)
@@ -0,0 +1,173 @@
+"""
+Tests for the ExpenseTypeStatistics rollup: maintained with the category
+statistics, served by the expense type endpoints and backfilled for databases
+that predate it.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.migrations.migrate_expense_type_statistics import migrate_expense_type_statistics
+from app.models.statistics import CategoryStatistics, ExpenseTypeStatistics, StatisticsPeriod
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory, ExpenseType
+from app.services.statistics_delta_service import StatisticsDeltaService
+from app.services.statistics_service import StatisticsService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def seeded(db):
+    rng = random.Random(7)
+    start = date(2023, 1, 1)
+    for _ in range(300):
+        amount = round(rng.uniform(-400, 1500), 2)
+        income = amount > 0
+        db.add(Transaction(
+            account_number='BE1', transaction_date=start + timedelta(days=rng.randrange(500)),
+            amount=amount, currency='EUR', description=f'Shop {rng.randrange(20)}', source_bank='ING',
+            transaction_type=TransactionType.INCOME if income else TransactionType.EXPENSE,
+            income_category=rng.choice(list(IncomeCategory)) if income else None,
+            expense_category=None if income else rng.choice(list(ExpenseCategory)),
+        ))
+    db.commit()
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+    return db
+
+
+def _summed_categories(db, period, period_date=None):
+    """The expense type sums the endpoints used to compute per request."""
+    CS = CategoryStatistics
+    query = db.query(CS).filter(CS.period == period, CS.transaction_type == TransactionType.EXPENSE,
+                                CS.expense_type != None)  # noqa: E711
+    if period_date is not None:
+        query = query.filter(CS.date == period_date)
+    sums = defaultdict(lambda: defaultdict(float))
+    for row in query.all():
+        for field in ('period_amount', 'period_transaction_count', 'period_percentage', 'total_amount', 'yearly_amount'):
+            sums[row.expense_type][field] += getattr(row, field)
+    return sums
+
+
+def test_rollup_sums_the_category_rows(seeded):
+    ETS = ExpenseTypeStatistics
+    rows = seeded.query(ETS).filter(ETS.period == StatisticsPeriod.MONTHLY, ETS.date == date(2023, 6, 30)).all()
+    expected = _summed_categories(seeded, StatisticsPeriod.MONTHLY, date(2023, 6, 30))
+    assert {row.expense_type for row in rows} == set(expected)
+    for row in rows:
+        assert row.period_amount == pytest.approx(expected[row.expense_type]['period_amount'])
+        assert row.period_transaction_count == expected[row.expense_type]['period_transaction_count']
+        assert row.average_transaction_amount == pytest.approx(row.period_amount / row.period_transaction_count)
+    assert StatisticsDeltaService.check_consistency(seeded)['consistent']
+
+
+@pytest.mark.parametrize("period, period_date", [
+    ('monthly', '2023-06-30'),
+    ('yearly', '2023-12-31'),
+    ('all_time', None),
+])
+def test_by_expense_type_serves_the_rollup(seeded, period, period_date):
+    params = {'period': period, **({'date': period_date} if period_date else {})}
+    resp = client.get('/statistics/by-expense-type', params=params)
+    assert resp.status_code == 200
+
+    expected = _summed_categories(
+        seeded, StatisticsPeriod(period), date.fromisoformat(period_date) if period_date else None)
+    body = {item['expense_type']: item for item in resp.json()}
+    served = [t for t in (ExpenseType.FIXED_ESSENTIAL, ExpenseType.GUILT_FREE_DISCRETIONARY) if t in expected]
+    assert list(body) == [t.value for t in served]
+    for expense_type in served:
+        item, sums = body[expense_type.value], expected[expense_type]
+        assert item['period_amount'] == pytest.approx(sums['period_amount'])
+        assert item['period_transaction_count'] == sums['period_transaction_count']
+        assert item['period_percentage'] == pytest.approx(sums['period_percentage'])
+        assert item['total_amount_cumulative'] == pytest.approx(sums['total_amount'])
+        assert item['yearly_amount'] == pytest.approx(sums['yearly_amount'])
+        assert sum(c['period_amount'] for c in item['categories']) == pytest.approx(sums['period_amount'])
+
+
+def test_expense_type_timeseries_serves_the_rollup(seeded):
+    resp = client.get('/statistics/expense-type/timeseries', params={'start_date': '2023-01-01', 'end_date': '2024-05-31'})
+    assert resp.status_code == 200
+    series = resp.json()
+    dates = [item['date'] for item in series]
+    assert dates == sorted(dates)
+    assert len(set(zip(dates, (item['expense_type'] for item in series)))) == len(series)
+
+    month = next(item for item in series if item['date'] == '2023-06-30'
+                 and item['expense_type'] == ExpenseType.FIXED_ESSENTIAL.value)
+    sums = _summed_categories(seeded, StatisticsPeriod.MONTHLY, date(2023, 6, 30))[ExpenseType.FIXED_ESSENTIAL]
+    assert month['period_amount'] == pytest.approx(round(sums['period_amount'], 2))
+    assert month['period_transaction_count'] == sums['period_transaction_count']
+
+    filtered = client.get('/statistics/expense-type/timeseries', params={
+        'start_date': '2023-01-01', 'end_date': '2024-05-31', 'expense_type': ExpenseType.FIXED_ESSENTIAL.value,
+    }).json()
+    assert filtered == [item for item in series if item['expense_type'] == ExpenseType.FIXED_ESSENTIAL.value]
+
+
+def test_edits_keep_the_rollup_consistent(seeded):
+    expense = seeded.query(Transaction).filter(
+        Transaction.transaction_type == TransactionType.EXPENSE).order_by(Transaction.transaction_date).first()
+    before = StatisticsDeltaService.snapshot(expense)
+    # Move an early expense to another expense type, month and amount
+    expense.expense_category = (ExpenseCategory.RESTAURANTS if expense.expense_category.expense_type
+                                == ExpenseType.FIXED_ESSENTIAL else ExpenseCategory.HOUSING)
+    expense.transaction_date = date(2024, 3, 5)
+    expense.amount = -123.45
+    StatisticsDeltaService.record_change(seeded, before, StatisticsDeltaService.snapshot(expense))
+    seeded.commit()
+    assert StatisticsDeltaService.check_consistency(seeded) == {'consistent': True, 'drift': []}
+
+    before = StatisticsDeltaService.snapshot(expense)
+    seeded.delete(expense)
+    StatisticsDeltaService.record_change(seeded, before, None)
+    seeded.commit()
+    assert StatisticsDeltaService.check_consistency(seeded) == {'consistent': True, 'drift': []}
+
+
+def test_drifted_rollup_is_reported(seeded):
+    row = seeded.query(ExpenseTypeStatistics).filter(ExpenseTypeStatistics.period == StatisticsPeriod.ALL_TIME).first()
+    row.period_amount += 10
+    seeded.commit()
+    drift = StatisticsDeltaService.check_consistency(seeded)['drift']
+    assert [(d['table'], d['period'], d['field']) for d in drift] == [
+        ('expense_type_statistics', 'all_time', 'period_amount')]
+
+
+def test_backfill_populates_an_existing_database(seeded):
+    expected = {
+        (row.period, row.date, row.expense_type): row.period_amount
+        for row in seeded.query(ExpenseTypeStatistics).all()
+    }
+    engine = seeded.get_bind()
+    ExpenseTypeStatistics.__table__.drop(bind=engine)
+
+    assert migrate_expense_type_statistics(engine) == len(expected)
+    assert migrate_expense_type_statistics(engine) == 0  # already populated
+
+    seeded.expire_all()
+    backfilled = {
+        (row.period, row.date, row.expense_type): row.period_amount
+        for row in seeded.query(ExpenseTypeStatistics).all()
+    }
+    assert backfilled.keys() == expected.keys()
+    assert all(backfilled[key] == pytest.approx(value) for key, value in expected.items())
+    assert StatisticsDeltaService.check_consistency(seeded)['consistent']
@@ -0,0 +1,216 @@
+"""
+EXPLAIN QUERY PLAN regression tests for the hottest query shapes: each one
+must search the index it was designed for (see the models' __table_args__
+and migrations/migrate_composite_indexes.py).
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+import re
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import event, func, inspect
+
+from app.main import app
+from app.database import get_db
+from app.migrations.migrate_composite_indexes import COMPOSITE_INDEXES, migrate_composite_indexes
+from app.models.statistics import FinancialStatistics, CategoryStatistics, ExpenseTypeStatistics, StatisticsPeriod
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory, ExpenseType
+from app.services.period_range import date_filters, month_range, year_range
+
+FS = FinancialStatistics
+CS = CategoryStatistics
+ETS = ExpenseTypeStatistics
+MARCH = month_range(2024, 3)
+MONTH_END = date(2024, 3, 31)
+EXPENSE = TransactionType.EXPENSE
+
+# name: (query builder, index the plan must search)
+HOT_QUERIES = {
+    "period type totals": (
+        lambda db: db.query(func.sum(Transaction.amount)).filter(*date_filters(Transaction.transaction_date, MARCH)),
+        "ix_transactions_transaction_date",
+    ),
+    "cumulative totals": (
+        lambda db: db.query(func.sum(Transaction.amount)).filter(Transaction.transaction_date < MARCH[1]),
+        "ix_transactions_transaction_date",
+    ),
+    "type total for percentages": (
+        lambda db: db.query(func.sum(func.abs(Transaction.amount))).filter(
+            Transaction.transaction_type == EXPENSE, *date_filters(Transaction.transaction_date, year_range(2024))),
+        "ix_transactions_type_date",
+    ),
+    "budget month spend": (
+        lambda db: db.query(func.sum(func.abs(Transaction.amount))).filter(
+            Transaction.transaction_type == EXPENSE,
+            Transaction.expense_category == ExpenseCategory.GROCERIES,
+            *date_filters(Transaction.transaction_date, MARCH)),
+        "ix_transactions_expense_category_type_date",
+    ),
+    "anomaly category history": (
+        lambda db: db.query(Transaction.amount).filter(
+            Transaction.id != 1, Transaction.transaction_type == EXPENSE,
+            Transaction.expense_category == ExpenseCategory.GROCERIES,
+            Transaction.transaction_date >= MONTH_END - timedelta(days=180)),
+        "ix_transactions_expense_category_type_date",
+    ),
+    "anomaly batch category history": (
+        lambda db: db.query(Transaction.expense_category, Transaction.amount).filter(
+            Transaction.transaction_type == EXPENSE,
+            Transaction.expense_category.in_([ExpenseCategory.GROCERIES, ExpenseCategory.UTILITIES]),
+            Transaction.transaction_date >= date(2023, 9, 1), Transaction.transaction_date < MONTH_END),
+        "ix_transactions_expense_category_type_date",
+    ),
+    "anomaly category usage": (
+        lambda db: db.query(Transaction.expense_category, func.count(Transaction.id)).filter(
+            Transaction.expense_category.in_([ExpenseCategory.GROCERIES]), Transaction.transaction_type == EXPENSE,
+        ).group_by(Transaction.expense_category),
+        "ix_transactions_expense_category_type_date",
+    ),
+    "anomaly global amounts": (
+        lambda db: db.query(Transaction.amount).filter(
+            Transaction.transaction_type == EXPENSE,
+            Transaction.transaction_date >= date(2023, 3, 1), Transaction.transaction_date < MONTH_END),
+        "ix_transactions_type_date",
+    ),
+    "anomaly merchant frequency": (
+        lambda db: db.query(Transaction).filter(
+            Transaction.counterparty_account == 'BE99', Transaction.transaction_type == EXPENSE,
+            Transaction.transaction_date >= MONTH_END - timedelta(days=30), Transaction.id != 1),
+        "ix_transactions_counterparty_type_date",
+    ),
+    "anomaly merchant history": (
+        lambda db: db.query(func.count(Transaction.id)).filter(
+            Transaction.counterparty_account == 'BE99', Transaction.transaction_type == EXPENSE,
+            Transaction.id != 1),
+        "ix_transactions_counterparty_type_date",
+    ),
+    "anomaly merchant counts": (
+        lambda db: db.query(Transaction.counterparty_account, func.count(Transaction.id)).filter(
+            Transaction.counterparty_account.in_(['BE98', 'BE99']), Transaction.transaction_type == EXPENSE,
+        ).group_by(Transaction.counterparty_account),
+        "ix_transactions_counterparty_type_date",
+    ),
+    "import dedup fingerprints": (
+        lambda db: db.query(
+            Transaction.account_number, Transaction.transaction_date, Transaction.amount,
+            Transaction.description, Transaction.source_bank,
+        ).filter(
+            Transaction.transaction_date >= date(2024, 1, 1), Transaction.transaction_date <= MONTH_END,
+            Transaction.source_bank.in_(['ING', 'KBC'])),
+        "ix_transactions_dedup",
+    ),
+    "transactions page by date": (
+        lambda db: db.query(Transaction).filter(
+            *date_filters(Transaction.transaction_date, MARCH)).order_by(Transaction.transaction_date.desc()).limit(10),
+        "ix_transactions_transaction_date",
+    ),
+    "monthly statistics row": (
+        lambda db: db.query(FS).filter(FS.period == StatisticsPeriod.MONTHLY, FS.date == MONTH_END),
+        "ix_financial_statistics_period_date",
+    ),
+    "all-time statistics row": (
+        lambda db: db.query(FS).filter(FS.period == StatisticsPeriod.ALL_TIME, FS.date == None),  # noqa: E711
+        "ix_financial_statistics_period_date",
+    ),
+    "statistics timeseries": (
+        lambda db: db.query(FS).filter(
+            FS.period == StatisticsPeriod.MONTHLY, FS.date >= date(2023, 4, 1), FS.date <= MONTH_END,
+        ).order_by(FS.date),
+        "ix_financial_statistics_period_date",
+    ),
+    "previous monthly statistics row": (
+        lambda db: db.query(FS).filter(
+            FS.period == StatisticsPeriod.MONTHLY, FS.date < MONTH_END).order_by(FS.date.desc()).limit(1),
+        "ix_financial_statistics_period_date",
+    ),
+    "category statistics of a period": (
+        lambda db: db.query(CS).filter(CS.period == StatisticsPeriod.MONTHLY, CS.date == MONTH_END),
+        "ix_category_statistics_period_date_type_name",
+    ),
+    "category statistics of a type": (
+        lambda db: db.query(CS).filter(
+            CS.period == StatisticsPeriod.YEARLY, CS.date == date(2024, 12, 31), CS.transaction_type == EXPENSE,
+            CS.period_percentage != 0),
+        "ix_category_statistics_period_date_type_name",
+    ),
+    "category statistics row": (
+        lambda db: db.query(CS).filter(
+            CS.period == StatisticsPeriod.MONTHLY, CS.date == MONTH_END,
+            CS.transaction_type == EXPENSE, CS.category_name == ExpenseCategory.GROCERIES.value),
+        "ix_category_statistics_period_date_type_name",
+    ),
+    "expense type statistics of a period": (
+        lambda db: db.query(ETS).filter(ETS.period == StatisticsPeriod.MONTHLY, ETS.date == MONTH_END),
+        "ix_expense_type_statistics_period_date_type",
+    ),
+    "expense type timeseries": (
+        lambda db: db.query(ETS).filter(
+            ETS.period == StatisticsPeriod.MONTHLY, ETS.expense_type == ExpenseType.FIXED_ESSENTIAL,
+            ETS.date >= date(2023, 4, 1), ETS.date <= MONTH_END,
+        ).order_by(ETS.date, ETS.expense_type),
+        "ix_expense_type_statistics_period_date_type",
+    ),
+}
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _plan(db, build):
+    """Run the query and return the plan details of the statement it issued."""
+    engine = db.get_bind()
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        build(db).all()
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+    statement, parameters = statements[-1]
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()]
+
+
+@pytest.mark.parametrize("name", list(HOT_QUERIES))
+def test_hot_query_searches_its_index(db, name):
+    build, index = HOT_QUERIES[name]
+    plan = _plan(db, build)
+    assert any(re.match(rf"SEARCH \w+ USING (COVERING )?INDEX {index}\b", step) for step in plan), plan
+    assert not any(step.startswith("SCAN") for step in plan), plan
+
+
+def test_dedup_lookup_is_covered_by_its_index(db):
+    plan = _plan(db, HOT_QUERIES["import dedup fingerprints"][0])
+    assert any("USING COVERING INDEX ix_transactions_dedup" in step for step in plan), plan
+
+
+def test_models_declare_every_migrated_index():
+    for name, table, columns in COMPOSITE_INDEXES:
+        model = {'transactions': Transaction, 'financial_statistics': FS, 'category_statistics': CS}[table]
+        declared = {index.name: tuple(column.name for column in index.columns) for index in model.__table__.indexes}
+        assert declared.get(name) == columns, name
+
+
+def test_migration_adds_missing_indexes(db):
+    engine = db.get_bind()
+    with engine.begin() as conn:
+        for name, _, _ in COMPOSITE_INDEXES:
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+
+    migrate_composite_indexes(engine)
+    migrate_composite_indexes(engine)  # idempotent
+
+    inspector = inspect(engine)
+    for name, table, columns in COMPOSITE_INDEXES:
+        indexes = {index['name']: tuple(index['column_names']) for index in inspector.get_indexes(table)}
+        assert indexes.get(name) == columns, name
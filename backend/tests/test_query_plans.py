@@ -0,0 +1,152 @@
+"""
+Query-plan tests: every query that filters transactions by date must search
+the ``transaction_date`` index instead of scanning the table.
+
+The statements issued by the statistics, budget, financial-health, anomaly
+and summary code paths (services and routers) are captured and each one that
+compares ``transactions.transaction_date`` is run through
+``EXPLAIN QUERY PLAN``.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+import random
+import re
+from contextlib import contextmanager
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event
+
+from app.main import app
+from app.database import get_db
+from app.models.statistics import StatisticsPeriod
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
+from app.schemas.budget import BudgetCreate
+from app.services.anomaly_detection_service import AnomalyDetectionService
+from app.services.budget_service import BudgetService
+from app.services.financial_health_service import FinancialHealthService
+from app.services.statistics_delta_service import StatisticsDeltaService
+from app.services.statistics_service import StatisticsService
+
+client = TestClient(app)
+
+# A comparison on the date column, e.g. "transactions.transaction_date >= ?"
+DATE_COMPARISON = re.compile(r"transactions\.transaction_date\s*(>=|<=|<|>|=|BETWEEN)", re.IGNORECASE)
+# extract('year'/'month', transaction_date) used as a predicate
+EXTRACT_PREDICATE = re.compile(
+    r"STRFTIME\('%[a-zA-Z]', transactions\.transaction_date\) AS INTEGER\)\s*(=|<|>|!=|IN\b)", re.IGNORECASE
+)
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def seeded(db):
+    rng = random.Random(11)
+    start = date(2023, 1, 1)
+    for _ in range(400):
+        amount = round(rng.uniform(-300, 2000), 2)
+        income = amount > 0
+        db.add(Transaction(
+            account_number='BE1', transaction_date=start + timedelta(days=rng.randrange(700)),
+            amount=amount, currency='EUR', description=f'Shop {rng.randrange(20)}', source_bank='ING',
+            transaction_type=TransactionType.INCOME if income else TransactionType.EXPENSE,
+            income_category=rng.choice(list(IncomeCategory)) if income else None,
+            expense_category=None if income else rng.choice(list(ExpenseCategory)),
+        ))
+    db.commit()
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+    BudgetService.create_budget(db, BudgetCreate(category=ExpenseCategory.GROCERIES.value, limit_amount=300.0))
+    return db
+
+
+@contextmanager
+def captured_selects(engine):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not executemany and statement.lstrip().upper().startswith(("SELECT", "WITH")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+def _plan(engine, statement, parameters):
+    with engine.connect() as conn:
+        return [row[3] for row in conn.exec_driver_sql(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()]
+
+
+def _assert_date_filters_use_index(engine, statements):
+    checked = 0
+    for statement, parameters in statements:
+        assert not EXTRACT_PREDICATE.search(statement), f"extract() predicate cannot use an index:\n{statement}"
+        if not DATE_COMPARISON.search(statement):
+            continue
+        plan = _plan(engine, statement, parameters)
+        scans = [step for step in plan if re.match(r"SCAN transactions\b", step)]
+        searches = [step for step in plan if re.match(r"SEARCH transactions USING (COVERING )?INDEX", step)]
+        assert searches and not scans, f"{plan}\n{statement}"
+        checked += 1
+    return checked
+
+
+def test_statistics_calculations_search_the_date_index(seeded):
+    engine = seeded.get_bind()
+    with captured_selects(engine) as statements:
+        for period, target_date in [
+            (StatisticsPeriod.MONTHLY, date(2023, 6, 30)),
+            (StatisticsPeriod.MONTHLY, date(2023, 12, 31)),
+            (StatisticsPeriod.YEARLY, date(2024, 12, 31)),
+        ]:
+            StatisticsService.calculate_statistics(seeded, period, target_date)
+            StatisticsService.calculate_category_statistics(seeded, period, target_date)
+            for transaction_type in (TransactionType.INCOME, TransactionType.EXPENSE):
+                StatisticsDeltaService._type_total(seeded, transaction_type, period, target_date)
+    assert _assert_date_filters_use_index(engine, statements) > 50
+
+
+def test_budget_and_health_services_search_the_date_index(seeded):
+    engine = seeded.get_bind()
+    with captured_selects(engine) as statements:
+        BudgetService.get_progress(seeded, date(2024, 3, 15))
+        BudgetService._month_spend(seeded, ExpenseCategory.GROCERIES.value, 2024, 3)
+        FinancialHealthService.calculate_health_score(seeded, date(2024, 3, 31), force=True)
+        AnomalyDetectionService.detect_anomalies(seeded, start_date=date(2024, 1, 1), end_date=date(2024, 3, 31))
+    assert _assert_date_filters_use_index(engine, statements) > 0
+
+
+def test_routers_search_the_date_index(seeded):
+    engine = seeded.get_bind()
+    with captured_selects(engine) as statements:
+        for path, params in [
+            ('/transactions/', {'start_date': '2023-03-01', 'end_date': '2023-05-31'}),
+            ('/statistics/timeseries', {'start_date': '2023-03-01', 'end_date': '2024-05-31'}),
+            ('/statistics/timeseries', {'time_period': '6M', 'live': True}),
+            ('/statistics/overview', {}),
+            ('/statistics/by-category', {'period': 'monthly', 'date': '2024-03-31'}),
+            ('/statistics/category/averages', {'time_period': '1Y'}),
+            ('/statistics/weekday-distribution', {'start_date': '2023-03-01', 'end_date': '2023-05-31'}),
+            ('/budgets/progress', {'target_date': '2024-03-15'}),
+            ('/financial-summary', {}),
+        ]:
+            assert client.get(path, params=params).status_code == 200, path
+    assert _assert_date_filters_use_index(engine, statements) > 0
+
+
+def test_extract_predicates_are_detected():
+    statement = ("SELECT count(*) FROM transactions WHERE "
+                 "CAST(STRFTIME('%Y', transactions.transaction_date) AS INTEGER) = ?")
+    assert EXTRACT_PREDICATE.search(statement)
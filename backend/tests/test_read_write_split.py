@@ -0,0 +1,136 @@
+"""
+Tests for the read-only engine and the get_read_db dependency used by the
+GET endpoints.
+
+The read-only engine is checked against a throwaway database under tmp_path;
+the route tests use the in-memory SQLite DB from conftest.py — never touches
+production data.
+"""
+from datetime import date
+
+import pytest
+from fastapi.routing import APIRoute
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, insert
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.main import app
+from app.database import (
+    Base, ReadSessionLocal, configure_sqlite_engine, create_read_engine, get_db, get_read_db,
+)
+from app.models.transaction import Transaction, TransactionType
+
+client = TestClient(app)
+
+# GET endpoints that compute and store results on a miss stay on the write engine
+WRITING_GETS = {'/projections/scenarios', '/financial-summary'}
+
+
+def _row(description='Shop'):
+    return dict(account_number='BE1', transaction_date=date(2024, 1, 1), amount=-5.0, currency='EUR',
+                description=description, source_bank='ING', transaction_type=TransactionType.EXPENSE)
+
+
+@pytest.fixture
+def engines(tmp_path):
+    path = str(tmp_path / 'split.db')
+    write_engine = configure_sqlite_engine(create_engine(f"sqlite:///{path}"))
+    Base.metadata.create_all(bind=write_engine, tables=[Transaction.__table__])
+    read_engine = create_read_engine(path, pool_size=2)
+    yield write_engine, read_engine
+    read_engine.dispose()
+    write_engine.dispose()
+
+
+def _dependencies(dependant):
+    for dependency in dependant.dependencies:
+        yield dependency.call
+        yield from _dependencies(dependency)
+
+
+def _routes_using(dependency):
+    return {
+        (method, route.path)
+        for route in app.routes if isinstance(route, APIRoute) and dependency in _dependencies(route.dependant)
+        for method in route.methods
+    }
+
+
+def test_read_engine_sees_committed_writes(engines):
+    write_engine, read_engine = engines
+    with write_engine.begin() as conn:
+        conn.execute(insert(Transaction), [_row()])
+    read = sessionmaker(bind=read_engine)()
+    assert read.query(Transaction).count() == 1
+
+    with write_engine.begin() as conn:
+        conn.execute(insert(Transaction), [_row('Other shop')])
+    read.rollback()  # a new read transaction sees the new snapshot
+    assert read.query(Transaction).count() == 2
+    read.close()
+
+
+def test_read_engine_rejects_writes(engines):
+    _, read_engine = engines
+    read = sessionmaker(bind=read_engine)()
+    read.add(Transaction(**_row()))
+    with pytest.raises(OperationalError, match='readonly'):
+        read.flush()
+    read.close()
+
+
+def test_read_engine_has_its_own_pool(engines):
+    write_engine, read_engine = engines
+    assert read_engine.pool is not write_engine.pool
+    assert read_engine.pool.size() == 2
+    with read_engine.connect() as conn:
+        assert conn.exec_driver_sql("PRAGMA query_only").scalar() == 1
+        assert conn.exec_driver_sql("PRAGMA journal_mode").scalar() == 'wal'
+
+
+def test_read_sessions_skip_autoflush_and_expire_on_commit():
+    assert ReadSessionLocal.kw['autoflush'] is False
+    assert ReadSessionLocal.kw['expire_on_commit'] is False
+
+
+def test_mutating_routes_use_the_write_engine():
+    read_routes = _routes_using(get_read_db)
+    assert read_routes
+    assert {method for method, _ in read_routes} == {'GET'}
+
+
+def test_dashboard_routes_use_the_read_engine():
+    read_paths = {path for _, path in _routes_using(get_read_db)}
+    write_gets = {path for method, path in _routes_using(get_db) if method == 'GET'}
+    for path in ['/statistics/overview', '/statistics/timeseries', '/statistics/by-category',
+                 '/statistics/weekday-distribution', '/anomalies/', '/anomalies/statistics',
+                 '/transactions/', '/budgets/progress', '/financial-health/history']:
+        assert path in read_paths, path
+    assert write_gets == WRITING_GETS
+
+
+def test_read_routes_work_on_a_read_only_database(engines):
+    write_engine, read_engine = engines
+    Base.metadata.create_all(bind=write_engine)
+    with write_engine.begin() as conn:
+        conn.execute(insert(Transaction), [_row()])
+    read_sessions = sessionmaker(autoflush=False, expire_on_commit=False, bind=read_engine)
+
+    def override():
+        db = read_sessions()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    original = app.dependency_overrides[get_read_db]
+    app.dependency_overrides[get_read_db] = override
+    try:
+        resp = client.get('/transactions/')
+        assert resp.status_code == 200
+        assert resp.json()['total'] == 1
+        assert client.get('/anomalies/').status_code == 200
+        assert client.get('/budgets/progress', params={'target_date': '2024-01-15'}).status_code == 200
+    finally:
+        app.dependency_overrides[get_read_db] = original
@@ -0,0 +1,111 @@
+"""
+Tests for the SQLite connection profile (database.SQLITE_PRAGMAS) and the
+optimize maintenance command.
+
+Profiles are checked on throwaway databases under tmp_path; the foreign-key
+test uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+from datetime import date
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from app.main import app
+from app.database import Base, SQLITE_PRAGMAS, configure_sqlite_engine, get_db
+from app.database_manager import optimize_database
+from app.models.anomaly import TransactionAnomaly, AnomalyType, AnomalySeverity
+from app.models.transaction import Transaction, TransactionType
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def file_engine(tmp_path):
+    engine = configure_sqlite_engine(
+        create_engine(f"sqlite:///{tmp_path / 'profile.db'}", connect_args={"check_same_thread": False})
+    )
+    yield engine
+    engine.dispose()
+
+
+def _pragma(conn, name):
+    return conn.exec_driver_sql(f"PRAGMA {name}").scalar()
+
+
+def test_profile_is_applied_to_every_connection(file_engine):
+    for _ in range(2):
+        with file_engine.connect() as conn:
+            assert _pragma(conn, "journal_mode") == SQLITE_PRAGMAS["journal_mode"].lower()
+            assert _pragma(conn, "synchronous") == 1  # NORMAL
+            assert _pragma(conn, "mmap_size") == int(SQLITE_PRAGMAS["mmap_size"])
+            assert _pragma(conn, "cache_size") == int(SQLITE_PRAGMAS["cache_size"])
+            assert _pragma(conn, "temp_store") == 2  # MEMORY
+            assert _pragma(conn, "foreign_keys") == 1
+        file_engine.dispose()  # the next connection is a new one
+
+
+def test_empty_values_keep_sqlite_defaults(tmp_path):
+    engine = configure_sqlite_engine(
+        create_engine(f"sqlite:///{tmp_path / 'defaults.db'}"),
+        {"journal_mode": "", "synchronous": None, "temp_store": "MEMORY"},
+    )
+    with engine.connect() as conn:
+        assert _pragma(conn, "journal_mode") == "delete"
+        assert _pragma(conn, "synchronous") == 2  # FULL
+        assert _pragma(conn, "temp_store") == 2
+    engine.dispose()
+
+
+def test_readers_are_not_blocked_by_an_open_write(file_engine):
+    Base.metadata.create_all(bind=file_engine, tables=[Transaction.__table__])
+    row = dict(account_number='BE1', transaction_date=date(2024, 1, 1), amount=-5.0, currency='EUR',
+               description='Shop', source_bank='ING', transaction_type='EXPENSE')
+    with file_engine.begin() as conn:
+        conn.execute(Transaction.__table__.insert(), row)
+
+    writer = file_engine.connect()
+    try:
+        writer.execute(Transaction.__table__.insert(), row)  # uncommitted write holds the lock
+        with file_engine.connect() as reader:
+            reader.exec_driver_sql("PRAGMA busy_timeout=0")
+            # WAL readers see the last committed snapshot instead of waiting
+            assert reader.execute(text("SELECT count(*) FROM transactions")).scalar() == 1
+        writer.commit()
+    finally:
+        writer.close()
+
+
+def test_foreign_keys_cascade_transaction_deletes(db):
+    transaction = Transaction(account_number='BE1', transaction_date=date(2024, 1, 1), amount=-5.0, currency='EUR',
+                              description='Shop', source_bank='ING', transaction_type=TransactionType.EXPENSE)
+    db.add(transaction)
+    db.flush()
+    db.add(TransactionAnomaly(transaction_id=transaction.id, anomaly_type=AnomalyType.STATISTICAL_OUTLIER,
+                              severity=AnomalySeverity.LOW, anomaly_score=10.0, confidence=0.5,
+                              detection_method='test', reason='test'))
+    db.commit()
+
+    db.execute(text("DELETE FROM transactions WHERE id = :id"), {"id": transaction.id})
+    db.commit()
+    assert db.query(TransactionAnomaly).count() == 0
+
+
+def test_optimize_database(file_engine):
+    Base.metadata.create_all(bind=file_engine, tables=[Transaction.__table__])
+
+    result = optimize_database(bind=file_engine)
+    assert result["analyzed"] == "optimize"
+    assert result["journal_mode"] == "wal"
+    assert result["checkpoint"]["busy"] is False
+
+    result = optimize_database(full=True, bind=file_engine)
+    assert result["analyzed"] == "full"
+    with file_engine.connect() as conn:
+        assert conn.execute(text("SELECT count(*) FROM sqlite_master WHERE name = 'sqlite_stat1'")).scalar() == 1
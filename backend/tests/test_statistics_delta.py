@@ -0,0 +1,139 @@
+"""
+Tests for incremental statistics maintenance: after any sequence of inserts,
+deletes and recategorizations the delta-maintained tables must match a full
+rebuild, as reported by the consistency checker.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+import random
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.models.statistics import FinancialStatistics, CategoryStatistics, StatisticsPeriod
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
+from app.services.statistics_delta_service import StatisticsDeltaService
+from app.services.statistics_service import StatisticsService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _random_transaction(rng, start=date(2023, 1, 1), days=730):
+    amount = round(rng.uniform(-400, 2500), 2)
+    income = amount > 0
+    return Transaction(
+        account_number='BE1', transaction_date=start + timedelta(days=rng.randrange(days)),
+        amount=amount, currency='EUR', description='Row', source_bank='ING',
+        transaction_type=TransactionType.INCOME if income else TransactionType.EXPENSE,
+        income_category=rng.choice(list(IncomeCategory)) if income and rng.random() < 0.8 else None,
+        expense_category=rng.choice(list(ExpenseCategory)) if not income and rng.random() < 0.8 else None,
+    )
+
+
+def _recategorize(rng, transaction):
+    if transaction.transaction_type == TransactionType.INCOME:
+        transaction.income_category = rng.choice(list(IncomeCategory) + [None])
+    else:
+        transaction.expense_category = rng.choice(list(ExpenseCategory) + [None])
+
+
+def test_random_edits_keep_statistics_consistent(db):
+    rng = random.Random(3)
+    for _ in range(150):
+        db.add(_random_transaction(rng))
+    db.commit()
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+    assert StatisticsDeltaService.check_consistency(db)['consistent']
+
+    for step in range(60):
+        action = rng.choice(['insert', 'delete', 'recategorize'])
+        if action == 'insert':
+            # Also lands in months and years that have no statistics yet
+            transaction = _random_transaction(rng, start=date(2022, 6, 1), days=1400)
+            db.add(transaction)
+            StatisticsDeltaService.record_change(db, None, StatisticsDeltaService.snapshot(transaction))
+        else:
+            transaction = rng.choice(db.query(Transaction).all())
+            before = StatisticsDeltaService.snapshot(transaction)
+            if action == 'delete':
+                db.delete(transaction)
+                StatisticsDeltaService.record_change(db, before, None)
+            else:
+                _recategorize(rng, transaction)
+                StatisticsDeltaService.record_change(db, before, StatisticsDeltaService.snapshot(transaction))
+        db.commit()
+
+        report = StatisticsDeltaService.check_consistency(db)
+        assert report['consistent'], (step, action, report['drift'][:5])
+
+
+def test_deleting_the_only_transaction_of_a_month_removes_its_rows(db):
+    db.add_all([
+        Transaction(account_number='BE1', transaction_date=date(2024, 1, 10), amount=-20.0, currency='EUR',
+                    description='A', source_bank='ING', transaction_type=TransactionType.EXPENSE,
+                    expense_category=ExpenseCategory.GROCERIES),
+        Transaction(account_number='BE1', transaction_date=date(2024, 3, 5), amount=-30.0, currency='EUR',
+                    description='B', source_bank='ING', transaction_type=TransactionType.EXPENSE,
+                    expense_category=ExpenseCategory.GROCERIES),
+    ])
+    db.commit()
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+
+    january = db.query(Transaction).filter(Transaction.description == 'A').one()
+    before = StatisticsDeltaService.snapshot(january)
+    db.delete(january)
+    StatisticsDeltaService.record_change(db, before, None)
+    db.commit()
+
+    monthly_dates = [row.date for row in db.query(FinancialStatistics).filter(
+        FinancialStatistics.period == StatisticsPeriod.MONTHLY)]
+    assert monthly_dates == [date(2024, 3, 31)]
+    march = db.query(CategoryStatistics).filter(
+        CategoryStatistics.period == StatisticsPeriod.MONTHLY).one()
+    assert (march.total_amount, march.yearly_amount, march.period_percentage) == (30.0, 30.0, 100.0)
+    assert StatisticsDeltaService.check_consistency(db)['consistent']
+
+
+def test_consistency_checker_reports_drift(db):
+    db.add(Transaction(account_number='BE1', transaction_date=date(2024, 1, 10), amount=-20.0, currency='EUR',
+                       description='A', source_bank='ING', transaction_type=TransactionType.EXPENSE))
+    db.commit()
+    StatisticsService.initialize_statistics(db)
+    db.query(FinancialStatistics).filter(FinancialStatistics.period == StatisticsPeriod.ALL_TIME).update(
+        {'period_expenses': 99.0})
+    db.commit()
+
+    report = client.get('/statistics/consistency').json()
+    assert report['consistent'] is False
+    assert {'table': 'financial_statistics', 'period': 'all_time', 'date': None, 'issue': 'value',
+            'field': 'period_expenses', 'stored': 99.0, 'expected': 20.0} in report['drift']
+
+
+def test_category_edit_endpoint_keeps_statistics_consistent(db):
+    db.add(Transaction(account_number='BE1', transaction_date=date(2024, 1, 10), amount=-20.0, currency='EUR',
+                       description='A', source_bank='ING', transaction_type=TransactionType.EXPENSE))
+    db.commit()
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+    tx_id = db.query(Transaction.id).scalar()
+
+    resp = client.patch(f'/transactions/{tx_id}/category', params={'category': 'Groceries', 'transaction_type': 'Expense'})
+    assert resp.status_code == 200
+    assert client.get('/statistics/consistency').json() == {'consistent': True, 'drift': []}
+
+    assert client.delete(f'/transactions/{tx_id}').status_code == 200
+    assert client.get('/statistics/consistency').json() == {'consistent': True, 'drift': []}
@@ -0,0 +1,231 @@
+"""
+Tests for the deferred statistics refresh: bursts of edits are merged per
+month, applied once, and readers can see or force away the staleness.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+import random
+import time
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.models.statistics import StatisticsDirtyMonth
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
+from app.services.statistics_delta_service import StatisticsDeltaService
+from app.services.statistics_rebuild_service import StatisticsRebuildService
+from app.services.statistics_refresh_queue import StatisticsRefreshQueue, statistics_refresh_queue
+from app.services.statistics_service import StatisticsService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _random_transaction(rng, start=date(2023, 1, 1), days=730):
+    amount = round(rng.uniform(-400, 2500), 2)
+    income = amount > 0
+    return Transaction(
+        account_number='BE1', transaction_date=start + timedelta(days=rng.randrange(days)),
+        amount=amount, currency='EUR', description='Row', source_bank='ING',
+        transaction_type=TransactionType.INCOME if income else TransactionType.EXPENSE,
+        income_category=rng.choice(list(IncomeCategory)) if income else None,
+        expense_category=rng.choice(list(ExpenseCategory)) if not income else None,
+    )
+
+
+def _recategorize(rng, transaction):
+    if transaction.transaction_type == TransactionType.INCOME:
+        transaction.income_category = rng.choice(list(IncomeCategory) + [None])
+    else:
+        transaction.expense_category = rng.choice(list(ExpenseCategory) + [None])
+
+
+def _seed(db, rng, rows=120):
+    for _ in range(rows):
+        db.add(_random_transaction(rng))
+    db.commit()
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+
+
+def _recategorize_many(db, rng, queue, edits):
+    transactions = db.query(Transaction).all()
+    for _ in range(edits):
+        transaction = rng.choice(transactions)
+        before = StatisticsDeltaService.snapshot(transaction)
+        _recategorize(rng, transaction)
+        db.commit()
+        queue.mark(before, StatisticsDeltaService.snapshot(transaction))
+
+
+def test_burst_of_edits_is_applied_once(db):
+    rng = random.Random(5)
+    _seed(db, rng)
+    queue = StatisticsRefreshQueue(statistics_refresh_queue.session_factory, delay=60)
+
+    _recategorize_many(db, rng, queue, 50)
+    status = queue.status()
+    assert status['stale'] is True
+    assert status['pending_changes'] == 50
+    assert queue.refresh_count == 0
+
+    # Many months and years are touched by one merged refresh
+    assert queue.flush() == 50
+    assert queue.refresh_count == 1
+    assert queue.status()['stale'] is False
+    assert StatisticsDeltaService.check_consistency(db)['consistent']
+
+
+def test_insert_and_delete_across_months_in_one_refresh(db):
+    rng = random.Random(8)
+    _seed(db, rng, rows=60)
+    queue = StatisticsRefreshQueue(statistics_refresh_queue.session_factory, delay=60)
+
+    for _ in range(20):
+        transaction = _random_transaction(rng, start=date(2022, 6, 1), days=1400)
+        db.add(transaction)
+        db.commit()
+        queue.mark(None, StatisticsDeltaService.snapshot(transaction))
+    for transaction in rng.sample(db.query(Transaction).all(), 20):
+        before = StatisticsDeltaService.snapshot(transaction)
+        db.delete(transaction)
+        db.commit()
+        queue.mark(before, None)
+
+    queue.flush()
+    report = StatisticsDeltaService.check_consistency(db)
+    assert report['consistent'], report['drift'][:5]
+
+
+def test_worker_refreshes_after_the_delay(db):
+    rng = random.Random(2)
+    _seed(db, rng, rows=30)
+    queue = StatisticsRefreshQueue(statistics_refresh_queue.session_factory, delay=0.05)
+
+    _recategorize_many(db, rng, queue, 5)
+    deadline = time.monotonic() + 5
+    while queue.status()['stale'] and time.monotonic() < deadline:
+        time.sleep(0.02)
+
+    assert queue.status()['stale'] is False
+    assert queue.refresh_count == 1
+    assert StatisticsDeltaService.check_consistency(db)['consistent']
+
+
+def test_readers_see_staleness_and_can_force_a_refresh(db, monkeypatch):
+    rng = random.Random(4)
+    _seed(db, rng, rows=30)
+    monkeypatch.setattr(statistics_refresh_queue, 'delay', 60)
+    tx_id = db.query(Transaction.id).filter(Transaction.transaction_type == TransactionType.EXPENSE).first()[0]
+
+    resp = client.patch(f'/transactions/{tx_id}/category', params={'category': 'Groceries', 'transaction_type': 'Expense'})
+    assert resp.status_code == 200
+    assert client.get('/statistics/refresh-status').json()['pending_changes'] == 1
+    assert client.get('/statistics/overview').headers['X-Statistics-Stale'] == 'true'
+
+    assert client.get('/statistics/overview', params={'fresh': True}).headers['X-Statistics-Stale'] == 'false'
+    assert client.get('/statistics/consistency').json() == {'consistent': True, 'drift': []}
+
+    client.delete(f'/transactions/{tx_id}')
+    resp = client.post('/statistics/refresh')
+    assert resp.json()['applied_changes'] == 1
+    assert resp.json()['stale'] is False
+
+
+def test_failed_refresh_keeps_the_changes_pending(db, monkeypatch):
+    rng = random.Random(9)
+    _seed(db, rng, rows=40)
+    queue = StatisticsRefreshQueue(statistics_refresh_queue.session_factory, delay=60)
+    _recategorize_many(db, rng, queue, 6)
+
+    def locked(*args, **kwargs):
+        raise RuntimeError("database is locked")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(StatisticsDeltaService, 'apply_deltas', locked)
+        patched.setattr(StatisticsRebuildService, 'rebuild_financial_statistics', locked)
+        with pytest.raises(RuntimeError):
+            queue.flush()
+    assert queue.status()['pending_changes'] == 6
+    assert queue.status()['stale'] is True
+
+    failing_queue = StatisticsRefreshQueue(locked, delay=60)
+    _recategorize_many(db, rng, failing_queue, 2)
+    with pytest.raises(RuntimeError):
+        failing_queue.flush()
+    assert failing_queue.status()['pending_changes'] == 2
+    failing_queue.session_factory = statistics_refresh_queue.session_factory
+    assert failing_queue.flush() == 2
+
+    assert queue.flush() == 6
+    assert queue.status()['stale'] is False
+    report = StatisticsDeltaService.check_consistency(db)
+    assert report['consistent'], report['drift'][:5]
+
+
+def test_edits_record_their_months_until_applied(db, monkeypatch):
+    rng = random.Random(6)
+    _seed(db, rng, rows=30)
+    monkeypatch.setattr(statistics_refresh_queue, 'delay', 60)
+    transaction = db.query(Transaction).filter(Transaction.transaction_type == TransactionType.EXPENSE).first()
+    month = (transaction.transaction_date.year, transaction.transaction_date.month)
+
+    resp = client.patch(f'/transactions/{transaction.id}/category', params={'category': 'Groceries', 'transaction_type': 'Expense'})
+    assert resp.status_code == 200
+    assert db.query(StatisticsDirtyMonth.year, StatisticsDirtyMonth.month).all() == [month]
+
+    assert statistics_refresh_queue.flush() == 1
+    assert db.query(StatisticsDirtyMonth).count() == 0
+
+
+def test_recover_rebuilds_changes_lost_in_a_crash(db):
+    rng = random.Random(12)
+    _seed(db, rng, rows=60)
+    queue = StatisticsRefreshQueue(statistics_refresh_queue.session_factory, delay=60)
+    for transaction in rng.sample(db.query(Transaction).all(), 10):
+        before = StatisticsDeltaService.snapshot(transaction)
+        _recategorize(rng, transaction)
+        after = StatisticsDeltaService.snapshot(transaction)
+        dirty_ids = queue.persist(db, [(before, after)])
+        db.commit()
+        queue.mark(before, after, dirty_ids)
+    assert not StatisticsDeltaService.check_consistency(db)['consistent']
+
+    # The process dies before the refresh: the next one finds the dirty months
+    restarted = StatisticsRefreshQueue(statistics_refresh_queue.session_factory, delay=60)
+    assert restarted.recover() > 0
+    assert db.query(StatisticsDirtyMonth).count() == 0
+    assert StatisticsDeltaService.check_consistency(db)['consistent']
+    assert restarted.recover() == 0
+
+    # Changes the rebuild covered are not applied a second time
+    assert queue.flush() == 0
+    report = StatisticsDeltaService.check_consistency(db)
+    assert report['consistent'], report['drift'][:5]
+
+
+def test_initialize_does_not_count_pending_edits_twice(db, monkeypatch):
+    rng = random.Random(15)
+    _seed(db, rng, rows=40)
+    monkeypatch.setattr(statistics_refresh_queue, 'delay', 60)
+    tx_id = db.query(Transaction.id).filter(Transaction.transaction_type == TransactionType.EXPENSE).first()[0]
+    client.delete(f'/transactions/{tx_id}')
+    assert statistics_refresh_queue.status()['pending_changes'] == 1
+
+    assert client.post('/statistics/initialize').status_code == 200
+    assert statistics_refresh_queue.status()['stale'] is False
+    assert db.query(StatisticsDirtyMonth).count() == 0
+    assert statistics_refresh_queue.flush() == 0
+    report = StatisticsDeltaService.check_consistency(db)
+    assert report['consistent'], report['drift'][:5]
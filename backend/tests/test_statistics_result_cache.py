@@ -0,0 +1,181 @@
+"""
+Tests for the shared period resolution (PeriodResolver, with its cached data
+extent), the data-version counter and the response cache the statistics
+timeseries endpoints are served from.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import event, insert
+
+from app.main import app
+from app.database import get_db
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory
+from app.schemas.transaction import TimePeriod
+from app.services.data_version import data_version
+from app.services.period_resolver import DataExtent, PeriodResolver
+from app.services.result_cache import ResultCache, statistics_result_cache
+from app.services.statistics_service import StatisticsService
+
+client = TestClient(app)
+
+DASHBOARD = [
+    ('/statistics/timeseries', {'time_period': '1Y'}),
+    ('/statistics/category/averages', {'time_period': '1Y'}),
+    ('/statistics/category/timeseries', {'time_period': '1Y', 'transaction_type': 'Expense'}),
+    ('/statistics/expense-type/timeseries', {'time_period': '1Y'}),
+]
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def seeded(db):
+    for month in range(1, 13):
+        db.add(Transaction(account_number='BE1', transaction_date=date(2023, month, 10), amount=-10.0 * month,
+                           currency='EUR', description=f'Shop {month}', source_bank='ING',
+                           transaction_type=TransactionType.EXPENSE, expense_category=ExpenseCategory.GROCERIES))
+    db.add(Transaction(account_number='BE1', transaction_date=date(2024, 2, 15), amount=3000.0, currency='EUR',
+                       description='Salary', source_bank='ING', transaction_type=TransactionType.INCOME))
+    db.commit()
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+    return db
+
+
+@contextmanager
+def counted_statements(db):
+    statements = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.mark.parametrize('time_period, start', [
+    (TimePeriod.THREE_MONTHS, date(2024, 1, 1)),
+    (TimePeriod.SIX_MONTHS, date(2023, 10, 1)),
+    (TimePeriod.YEAR_TO_DATE, date(2024, 1, 1)),
+    (TimePeriod.ONE_YEAR, date(2023, 4, 1)),
+    (TimePeriod.TWO_YEARS, date(2022, 4, 1)),
+    (TimePeriod.ALL_TIME, date(2021, 6, 5)),
+])
+def test_relative_periods_end_on_the_latest_month(time_period, start):
+    extent = DataExtent(date(2021, 6, 5), date(2024, 3, 12))
+    assert PeriodResolver.resolve(extent, time_period) == (start, date(2024, 3, 31))
+
+
+def test_explicit_dates_take_precedence():
+    extent = DataExtent(date(2021, 6, 5), date(2024, 3, 12))
+    assert PeriodResolver.resolve(extent, TimePeriod.ONE_YEAR, '2023-02-01', None) == (date(2023, 2, 1), None)
+    assert PeriodResolver.resolve(extent, None, None, '2023-05-31') == (None, date(2023, 5, 31))
+    with pytest.raises(ValueError):
+        PeriodResolver.resolve(extent, None, '31/05/2023', None)
+
+
+def test_data_extent_is_cached_until_a_write(db, seeded):
+    assert PeriodResolver.data_extent(db) == (date(2023, 1, 10), date(2024, 2, 15))
+    with counted_statements(db) as statements:
+        PeriodResolver.data_extent(db)
+    assert statements == []
+
+    db.add(Transaction(account_number='BE1', transaction_date=date(2024, 5, 2), amount=-1.0, currency='EUR',
+                       description='Late', source_bank='ING', transaction_type=TransactionType.EXPENSE))
+    db.commit()
+    assert PeriodResolver.data_extent(db).last == date(2024, 5, 2)
+
+
+def test_data_version_counts_committed_writes_only(db):
+    version = data_version.value
+    db.query(Transaction).count()
+    db.commit()
+    assert data_version.value == version
+
+    db.execute(insert(Transaction), [dict(account_number='BE1', transaction_date=date(2024, 1, 1), amount=-1.0,
+                                          currency='EUR', description='Bulk', source_bank='ING',
+                                          transaction_type=TransactionType.EXPENSE)])
+    db.rollback()
+    db.commit()
+    assert data_version.value == version
+
+    db.query(Transaction).filter(Transaction.id == 1).update({'description': 'x'})
+    db.commit()
+    assert data_version.value == version + 1
+
+
+def test_result_cache_is_keyed_by_version_and_bounded():
+    cache = ResultCache(max_size=2)
+    calls = []
+
+    def compute(value):
+        return lambda: calls.append(value) or value
+
+    assert cache.get_or_compute('a', {'p': 1}, compute(1)) == 1
+    assert cache.get_or_compute('a', {'p': 1}, compute(2)) == 1
+    cache.get_or_compute('a', {'p': 2}, compute(3))
+    cache.get_or_compute('a', {'p': 3}, compute(4))
+    assert len(cache) == 2  # least recently used entry evicted
+    data_version.bump()
+    assert cache.get_or_compute('a', {'p': 1}, compute(5)) == 5
+    assert len(cache) == 1
+    assert calls == [1, 3, 4, 5]
+    assert cache.stats()['hits'] == 1
+
+
+def test_dashboard_calls_are_served_from_the_cache(db, seeded):
+    first = [client.get(path, params=params) for path, params in DASHBOARD]
+    assert all(resp.status_code == 200 for resp in first)
+    assert first[0].json() and first[2].json() and first[3].json()
+
+    with counted_statements(db) as statements:
+        again = [client.get(path, params=params) for path, params in DASHBOARD]
+    assert [resp.json() for resp in again] == [resp.json() for resp in first]
+    assert statements == []
+
+
+def test_responses_are_cached_once(seeded):
+    statistics_result_cache.clear()
+    assert client.get('/statistics/timeseries', params={'time_period': '1Y'}).status_code == 200
+    assert len(statistics_result_cache) == 1
+    hits = statistics_result_cache.hits
+    assert client.get('/statistics/timeseries', params={'time_period': '1Y'}).status_code == 200
+    assert statistics_result_cache.hits == hits + 1
+    assert client.get('/statistics/cache-stats').json()['entries'] == 1
+
+
+def test_writes_invalidate_cached_results(db, seeded):
+    params = {'time_period': 'ALL_TIME', 'transaction_type': 'Expense'}
+    before = client.get('/statistics/category/averages', params=params).json()
+    groceries = next(c for c in before['categories'] if c['category_name'] == 'Groceries')
+    shop = db.query(Transaction).filter(Transaction.description == 'Shop 12').one()
+
+    resp = client.patch('/transactions/categories', json=[
+        {'id': shop.id, 'category': ExpenseCategory.UTILITIES.value, 'transaction_type': 'Expense'},
+    ])
+    assert resp.status_code == 200
+
+    after = client.get('/statistics/category/averages', params=params).json()
+    groceries_after = next(c for c in after['categories'] if c['category_name'] == 'Groceries')
+    assert groceries_after['total_amount'] == pytest.approx(groceries['total_amount'] - 120.0)
+
+
+def test_invalid_dates_are_rejected_by_every_timeseries_endpoint(seeded):
+    for path, _ in DASHBOARD:
+        assert client.get(path, params={'start_date': '2023/01/01'}).status_code == 400, path
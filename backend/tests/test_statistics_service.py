@@ -0,0 +1,209 @@
+"""
+Tests for StatisticsService aggregates: the SQL-side computation must return
+the same figures as summing the matching transactions in Python, and the
+single-scan rebuild of the statistics tables must store exactly what the
+per-period calculations produce. The live timeseries, computed with window
+sums over the transactions, must match the stored rows.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+import calendar
+import random
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.models.statistics import FinancialStatistics, CategoryStatistics, StatisticsPeriod
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
+from app.services.statistics_service import StatisticsService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _seed_random(db, count=400, seed=7):
+    rng = random.Random(seed)
+    start = date(2023, 1, 1)
+    for _ in range(count):
+        amount = round(rng.uniform(-400, 2500), 2)
+        transaction_type = TransactionType.INCOME if amount > 0 else TransactionType.EXPENSE
+        if rng.random() < 0.05:
+            transaction_type = None  # counted as an expense
+        expense_category = income_category = None
+        if rng.random() < 0.8:
+            # Occasionally on the "wrong" type: categories match regardless of type
+            if (transaction_type == TransactionType.INCOME) != (rng.random() < 0.05):
+                income_category = rng.choice(list(IncomeCategory))
+            else:
+                expense_category = rng.choice(list(ExpenseCategory))
+        db.add(Transaction(
+            account_number='BE1', transaction_date=start + timedelta(days=rng.randrange(730)),
+            amount=amount, currency='EUR', description='Row', source_bank='ING',
+            transaction_type=transaction_type, expense_category=expense_category,
+            income_category=income_category,
+        ))
+    db.commit()
+
+
+def _python_totals(transactions):
+    income = [t.amount for t in transactions if t.transaction_type == TransactionType.INCOME]
+    expenses = [abs(t.amount) for t in transactions if t.transaction_type != TransactionType.INCOME]
+    return sum(income), sum(expenses), len(income), len(expenses)
+
+
+def _expected(db, period, target_date=None):
+    rows = db.query(Transaction).all()
+    if period == StatisticsPeriod.MONTHLY:
+        end = target_date.replace(day=calendar.monthrange(target_date.year, target_date.month)[1])
+        in_period = [t for t in rows if (t.transaction_date.year, t.transaction_date.month) == (target_date.year, target_date.month)]
+        cumulative = [t for t in rows if t.transaction_date <= end]
+        yearly = [t for t in rows if t.transaction_date.year == target_date.year and t.transaction_date <= end]
+    elif period == StatisticsPeriod.YEARLY:
+        in_period = [t for t in rows if t.transaction_date.year == target_date.year]
+        cumulative = [t for t in rows if t.transaction_date <= date(target_date.year, 12, 31)]
+        yearly = rows
+    else:
+        in_period = cumulative = yearly = rows
+
+    income, expenses, income_count, expense_count = _python_totals(in_period)
+    total_income, total_expenses, _, _ = _python_totals(cumulative)
+    yearly_income, yearly_expenses, _, _ = _python_totals(yearly)
+    return {
+        'period_income': income,
+        'period_expenses': expenses,
+        'income_count': income_count,
+        'expense_count': expense_count,
+        'period_net_savings': income - expenses,
+        'savings_rate': (income - expenses) / income * 100 if income > 0 else 0,
+        'average_income': income / income_count if income_count else 0,
+        'average_expense': expenses / expense_count if expense_count else 0,
+        'total_income': total_income,
+        'total_expenses': total_expenses,
+        'total_net_savings': total_income - total_expenses,
+        'yearly_income': yearly_income,
+        'yearly_expenses': yearly_expenses,
+    }
+
+
+@pytest.mark.parametrize('period, target_date', [
+    (StatisticsPeriod.MONTHLY, date(2023, 6, 30)),
+    (StatisticsPeriod.MONTHLY, date(2024, 2, 29)),
+    (StatisticsPeriod.MONTHLY, date(2026, 1, 31)),  # no transactions in the period
+    (StatisticsPeriod.YEARLY, date(2023, 12, 31)),
+    (StatisticsPeriod.YEARLY, date(2024, 12, 31)),
+    (StatisticsPeriod.ALL_TIME, None),
+])
+def test_calculate_statistics_matches_python_sums(db, period, target_date):
+    _seed_random(db)
+    result = StatisticsService.calculate_statistics(db, period, target_date)
+    expected = _expected(db, period, target_date)
+
+    assert result.keys() == expected.keys()
+    for key, value in expected.items():
+        assert result[key] == pytest.approx(value), key
+
+
+def test_calculate_statistics_on_empty_database(db):
+    result = StatisticsService.calculate_statistics(db, StatisticsPeriod.ALL_TIME)
+    assert all(value == 0 for value in result.values())
+
+
+def _columns(row, model):
+    return {c.name: getattr(row, c.name) for c in model.__table__.columns if c.name != 'id'}
+
+
+def _assert_rows_equal(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, float):
+            assert actual[key] == pytest.approx(value), key
+        else:
+            assert actual[key] == value, key
+
+
+def _stored_period_dates(db):
+    months = sorted({t.transaction_date.replace(day=calendar.monthrange(t.transaction_date.year, t.transaction_date.month)[1])
+                     for t in db.query(Transaction).all()})
+    years = sorted({date(d.year, 12, 31) for d in months})
+    return [(StatisticsPeriod.MONTHLY, d) for d in months] + [(StatisticsPeriod.YEARLY, d) for d in years] + [
+        (StatisticsPeriod.ALL_TIME, None)]
+
+
+def test_initialize_statistics_matches_per_period_calculation(db):
+    _seed_random(db)
+    StatisticsService.initialize_statistics(db)
+
+    stored = {(row.period, row.date): _columns(row, FinancialStatistics) for row in db.query(FinancialStatistics).all()}
+    periods = _stored_period_dates(db)
+    assert sorted(stored, key=str) == sorted(periods, key=str)
+    for period, period_date in periods:
+        expected = StatisticsService.calculate_statistics(db, period, period_date)
+        _assert_rows_equal(stored[(period, period_date)], {'period': period, 'date': period_date, **expected})
+
+
+def test_initialize_category_statistics_matches_per_period_calculation(db):
+    _seed_random(db)
+    StatisticsService.initialize_category_statistics(db)
+
+    stored = {
+        (row.period, row.date, row.category_name, row.transaction_type): _columns(row, CategoryStatistics)
+        for row in db.query(CategoryStatistics).all()
+    }
+    expected_keys = set()
+    for period, period_date in _stored_period_dates(db):
+        for cat_data in StatisticsService.calculate_category_statistics(db, period, period_date):
+            if cat_data['period_transaction_count'] == 0:
+                continue
+            key = (period, period_date, cat_data['category_name'], cat_data['transaction_type'])
+            expected_keys.add(key)
+            _assert_rows_equal(stored[key], {'period': period, 'date': period_date, 'expense_type': None, **cat_data})
+    assert set(stored) == expected_keys
+
+
+def test_initialize_statistics_on_empty_database(db):
+    StatisticsService.initialize_statistics(db)
+    StatisticsService.initialize_category_statistics(db)
+
+    rows = db.query(FinancialStatistics).all()
+    assert [(row.period, row.period_income, row.total_expenses) for row in rows] == [(StatisticsPeriod.ALL_TIME, 0, 0)]
+    assert db.query(CategoryStatistics).count() == 0
+
+
+@pytest.mark.parametrize('params', [
+    {},
+    {'start_date': '2023-04-01', 'end_date': '2024-06-30'},
+    {'start_date': '2023-04-15', 'end_date': '2024-06-20'},
+    {'time_period': 'YTD'},
+])
+def test_live_timeseries_matches_stored_rows(db, params):
+    _seed_random(db)
+    StatisticsService.initialize_statistics(db)
+
+    stored = client.get('/statistics/timeseries', params=params).json()
+    live = client.get('/statistics/timeseries', params={**params, 'live': True}).json()
+    assert stored
+    assert [row['date'] for row in live] == [row['date'] for row in stored]
+    for live_row, stored_row in zip(live, stored):
+        assert live_row['id'] is None
+        stored_row.pop('id')
+        live_row.pop('id')
+        _assert_rows_equal(live_row, stored_row)
+
+
+def test_live_timeseries_needs_no_stored_statistics(db):
+    _seed_random(db, count=50)
+    live = client.get('/statistics/timeseries', params={'live': True}).json()
+    assert db.query(FinancialStatistics).count() == 0
+    assert live[-1]['total_income'] == pytest.approx(sum(
+        t.amount for t in db.query(Transaction).filter(Transaction.transaction_type == TransactionType.INCOME)))
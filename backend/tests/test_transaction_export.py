@@ -0,0 +1,163 @@
+"""
+Tests for GET /transactions/export: streamed CSV, NDJSON and Parquet with the
+filters and ordering of GET /transactions/.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+import csv
+import io
+import json
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.models.transaction import Transaction, TransactionType, ExpenseCategory, IncomeCategory
+from app.services.transaction_export import EXPORT_FIELDS, TransactionExportService
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def seeded(db):
+    for day in range(1, 29):
+        expense = day % 4 != 0
+        db.add(Transaction(
+            account_number='BE1', transaction_date=date(2024, 2, day), amount=-day * 1.5 if expense else 1000.0 + day,
+            currency='EUR', description=f'Shop, "{day}"' if expense else f'Salary {day}', source_bank='ING',
+            counterparty_name='Grocer' if day % 2 else None,
+            transaction_type=TransactionType.EXPENSE if expense else TransactionType.INCOME,
+            expense_category=ExpenseCategory.GROCERIES if expense and day % 3 else None,
+            income_category=None if expense else IncomeCategory.SALARY,
+        ))
+    db.commit()
+    return db
+
+
+def _listed(params):
+    """Every transaction of GET /transactions/ with the same filters, page by page."""
+    items, page = [], 1
+    while True:
+        body = client.get('/transactions/', params={**params, 'page': page, 'page_size': 100}).json()
+        items += body['items']
+        if page >= body['total_pages']:
+            return items
+        page += 1
+
+
+@pytest.mark.parametrize("params", [
+    {},
+    {'sort_field': 'amount', 'sort_direction': 'asc'},
+    {'category': 'Groceries', 'start_date': '2024-02-05', 'end_date': '2024-02-20'},
+    {'search': 'salary'},
+    {'category': 'no such category'},
+])
+def test_csv_export_matches_the_listing(seeded, params):
+    resp = client.get('/transactions/export', params=params)
+    assert resp.status_code == 200
+    assert resp.headers['content-type'].startswith('text/csv')
+    assert resp.headers['content-disposition'] == 'attachment; filename="transactions.csv"'
+
+    rows = list(csv.DictReader(io.StringIO(resp.text)))
+    listed = _listed(params)
+    assert [int(row['id']) for row in rows] == [item['id'] for item in listed]
+    assert tuple(csv.reader(io.StringIO(resp.text)).__next__()) == EXPORT_FIELDS
+    for row, item in zip(rows, listed):
+        assert float(row['amount']) == item['amount']
+        assert row['description'] == item['description']
+        assert row['transaction_date'] == item['transaction_date']
+        assert row['expense_category'] == (item['expense_category'] or '')
+
+
+def test_ndjson_export_uses_the_api_representation(seeded):
+    resp = client.get('/transactions/export', params={'format': 'ndjson', 'sort_direction': 'asc'})
+    assert resp.status_code == 200
+    assert resp.headers['content-type'] == 'application/x-ndjson'
+    lines = [json.loads(line) for line in resp.text.splitlines()]
+    listed = _listed({'sort_direction': 'asc'})
+    assert len(lines) == len(listed) == 28
+    for line, item in zip(lines, listed):
+        assert line == {field: item[field] for field in EXPORT_FIELDS}
+
+
+def test_export_is_streamed_in_batches(seeded):
+    seeded.expunge_all()
+    query = seeded.query(Transaction).order_by(Transaction.id)
+    batches = list(TransactionExportService.batches(seeded, query, batch_size=5))
+    assert [len(batch) for batch in batches] == [5, 5, 5, 5, 5, 3]
+    assert not seeded.identity_map  # plain rows, no ORM objects kept
+
+    chunks = list(TransactionExportService.stream(query, 'ndjson', batch_size=5))
+    assert len(chunks) == 6
+    assert sum(chunk.count(b'\n') for chunk in chunks) == 28
+
+
+def test_export_reads_on_its_own_session(seeded):
+    query = seeded.query(Transaction).order_by(Transaction.id)
+    seeded.close()  # the request-scoped session is gone once the endpoint returns
+    opened = []
+
+    def session_factory():
+        session = TransactionExportService.session_factory()
+        opened.append(session)
+        return session
+
+    chunks = TransactionExportService.stream(query, 'csv', batch_size=10, session_factory=session_factory)
+    assert opened == []  # nothing is read before the response starts
+    assert len(list(csv.reader(io.StringIO(b''.join(chunks).decode())))) == 29
+    assert len(opened) == 1
+    assert not opened[0].in_transaction()  # closed after the last chunk
+
+
+def test_empty_export_still_has_a_header(db):
+    resp = client.get('/transactions/export')
+    assert resp.status_code == 200
+    assert resp.text.strip() == ','.join(EXPORT_FIELDS)
+    assert client.get('/transactions/export', params={'format': 'ndjson'}).text == ''
+
+
+def test_export_bypasses_the_response_cache(seeded):
+    resp = client.get('/transactions/export')
+    assert resp.status_code == 200
+    assert 'etag' not in resp.headers
+
+
+def test_invalid_format_is_rejected(seeded):
+    assert client.get('/transactions/export', params={'format': 'xlsx'}).status_code == 422
+
+
+def test_parquet_without_pyarrow_is_not_implemented(seeded, monkeypatch):
+    monkeypatch.setattr(TransactionExportService, 'parquet_available', staticmethod(lambda: False))
+    resp = client.get('/transactions/export', params={'format': 'parquet'})
+    assert resp.status_code == 501
+
+
+def test_parquet_export_round_trips(seeded):
+    pq = pytest.importorskip('pyarrow.parquet')
+    import pyarrow as pa
+
+    query = seeded.query(Transaction).order_by(Transaction.id)
+    chunks = list(TransactionExportService.stream(query, 'parquet', batch_size=10))
+    assert len(chunks) > 3  # row groups are sent as they are written
+    parquet = pq.ParquetFile(pa.BufferReader(b''.join(chunks)))
+    assert parquet.metadata.num_row_groups == 3
+
+    resp = client.get('/transactions/export', params={'format': 'parquet', 'category': 'Salary'})
+    assert resp.status_code == 200
+    assert resp.headers['content-type'] == 'application/vnd.apache.parquet'
+    table = pq.read_table(pa.BufferReader(resp.content))
+    assert table.column_names == list(EXPORT_FIELDS)
+    assert table.num_rows == 7
+    assert set(table.column('income_category').to_pylist()) == {'Salary'}
+    assert table.column('transaction_date').to_pylist()[0] == date(2024, 2, 28)
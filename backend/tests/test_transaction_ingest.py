@@ -0,0 +1,160 @@
+"""
+Tests for the transaction import path: set-based duplicate detection against
+stored rows and within a single file, and the bulk insert shared by upload
+and restore.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+import csv
+import io
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.models.transaction import Transaction
+from app.routers import transactions as tx_router
+from app.schemas.transaction import TransactionCreate
+from app.services.statistics_refresh_queue import StatisticsRefreshQueue
+from app.services.transaction_ingest_service import TransactionIngestService
+
+client = TestClient(app)
+
+
+def _reset_rate_limiter():
+    tx_router._upload_attempts.clear()
+
+
+def _make_ing_csv(rows) -> bytes:
+    """rows: iterable of (booking_date, amount, description)."""
+    output = io.StringIO()
+    writer = csv.writer(output, delimiter=';')
+    writer.writerow([
+        'Account Number', 'Account Name', 'Counterparty account',
+        'Booking date', 'Amount', 'Currency', 'Description',
+    ])
+    for booking_date, amount, description in rows:
+        writer.writerow(['BE1234567890', 'Main Account', 'BE0987654321', booking_date, amount, 'EUR', description])
+    return output.getvalue().encode('utf-8')
+
+
+def _upload(csv_bytes: bytes):
+    _reset_rate_limiter()
+    return client.post('/transactions/upload/', files={'file': ('data.csv', csv_bytes, 'text/csv')})
+
+
+def _count_transactions() -> int:
+    db = next(app.dependency_overrides[get_db]())
+    try:
+        return db.query(Transaction).count()
+    finally:
+        db.close()
+
+
+def test_duplicates_within_same_file_are_skipped():
+    resp = _upload(_make_ing_csv([
+        ('01/01/2025', '-10,00', 'Bakery'),
+        ('01/01/2025', '-10,00', 'Bakery'),
+        ('02/01/2025', '-10,00', 'Bakery'),
+    ]))
+    assert resp.status_code == 200
+    assert len(resp.json()) == 2
+    assert _count_transactions() == 2
+
+
+def test_reupload_only_imports_new_rows():
+    first = [('01/01/2025', '-10,00', 'Bakery'), ('03/01/2025', '2000,00', 'Salary')]
+    assert len(_upload(_make_ing_csv(first)).json()) == 2
+
+    resp = _upload(_make_ing_csv(first + [('04/01/2025', '-5,00', 'Coffee')]))
+    assert resp.status_code == 200
+    items = resp.json()
+    assert [t['description'] for t in items] == ['Coffee']
+    assert _count_transactions() == 3
+
+
+def test_filter_duplicates_only_matches_full_fingerprint():
+    db = next(app.dependency_overrides[get_db]())
+    try:
+        db.add(Transaction(
+            account_number='BE1', transaction_date=date(2025, 1, 1), amount=-10.0,
+            currency='EUR', description='Bakery', source_bank='ING',
+        ))
+        db.commit()
+
+        def create(**overrides):
+            data = dict(
+                account_number='BE1', transaction_date=date(2025, 1, 1), amount=-10.0,
+                currency='EUR', description='Bakery', source_bank='ING',
+            )
+            data.update(overrides)
+            return TransactionCreate(**data)
+
+        candidates = [
+            create(),
+            create(amount=-10.5),
+            create(source_bank='KBC'),
+            create(account_number='BE2'),
+            create(transaction_date=date(2025, 1, 2)),
+        ]
+        new, skipped = TransactionIngestService.filter_duplicates(db, candidates)
+        assert skipped == 1
+        assert new == candidates[1:]
+    finally:
+        db.close()
+
+
+def test_bulk_insert_returns_ids_in_input_order():
+    db = next(app.dependency_overrides[get_db]())
+    try:
+        batch = [
+            TransactionCreate(
+                account_number='BE1', transaction_date=date(2025, 1, day), amount=-float(day),
+                currency='EUR', description=f'Row {day}', source_bank='ING',
+            )
+            for day in range(1, 11)
+        ]
+        ids = TransactionIngestService.bulk_insert(db, batch)
+
+        assert len(ids) == 10
+        stored = {t.id: t.description for t in db.query(Transaction).all()}
+        assert [stored[i] for i in ids] == [t.description for t in batch]
+    finally:
+        db.close()
+
+
+def test_restore_uses_bulk_insert_and_returns_new_id():
+    payload = {
+        'id': 999,
+        'account_number': 'BE1',
+        'transaction_date': '2025-01-15',
+        'amount': -20.0,
+        'currency': 'EUR',
+        'description': 'Restored',
+        'transaction_type': 'Expense',
+        'expense_category': 'Groceries',
+        'source_bank': 'ING',
+    }
+    resp = client.post('/transactions/restore', json=payload)
+    assert resp.status_code == 200
+    body = resp.json()
+    assert body['description'] == 'Restored'
+    assert body['expense_category'] == 'Groceries'
+    assert body['id'] != 999
+    assert _count_transactions() == 1
+
+
+def test_restore_commits_the_row_with_its_dirty_month(monkeypatch):
+    def failing(db, changes):
+        raise RuntimeError("disk I/O error")
+
+    monkeypatch.setattr(StatisticsRefreshQueue, 'persist', staticmethod(failing))
+    payload = {
+        'account_number': 'BE1', 'transaction_date': '2025-01-15', 'amount': -20.0, 'currency': 'EUR',
+        'description': 'Restored', 'transaction_type': 'Expense', 'source_bank': 'ING',
+    }
+    resp = client.post('/transactions/restore', json=payload)
+    assert resp.status_code == 500
+    # Nothing was committed without the record of the statistics change
+    assert _count_transactions() == 0
@@ -0,0 +1,125 @@
+"""
+Tests for the vector store backends behind CategorySuggestionService: the
+NumPy store must return the same neighbours as the Qdrant store, keep its
+id/row bookkeeping straight across updates and deletes, and reload what it
+flushed to disk.
+"""
+import os
+
+import numpy as np
+import pytest
+
+from app.services.vector_store import NumpyVectorStore, QdrantVectorStore, create_vector_store
+
+DIMENSION = 16
+
+
+def _vectors(count, seed=0):
+    return np.random.default_rng(seed).normal(size=(count, DIMENSION)).astype(np.float32)
+
+
+def _filled(store, count=200):
+    store.ensure_collection('items', DIMENSION)
+    store.upsert('items', list(range(1, count + 1)), _vectors(count), [{'n': i} for i in range(1, count + 1)])
+    return store
+
+
+def test_numpy_search_matches_qdrant():
+    queries = _vectors(5, seed=1)
+    numpy_hits = _filled(NumpyVectorStore()).search_batch('items', queries, limit=10)
+    qdrant_hits = _filled(QdrantVectorStore()).search_batch('items', queries, limit=10)
+
+    for numpy_row, qdrant_row in zip(numpy_hits, qdrant_hits):
+        assert [payload['n'] for _, payload in numpy_row] == [payload['n'] for _, payload in qdrant_row]
+        np.testing.assert_allclose([s for s, _ in numpy_row], [s for s, _ in qdrant_row], atol=1e-5)
+
+
+def test_numpy_search_handles_small_and_empty_collections():
+    store = NumpyVectorStore()
+    store.ensure_collection('items', DIMENSION)
+    assert store.search_batch('items', _vectors(2), limit=3) == [[], []]
+
+    _filled(store, count=2)
+    hits = store.search_batch('items', _vectors(1, seed=3), limit=5)[0]
+    assert sorted(payload['n'] for _, payload in hits) == [1, 2]
+    assert hits[0][0] >= hits[1][0]
+
+
+def test_numpy_upsert_and_delete_keep_rows_consistent():
+    store = _filled(NumpyVectorStore(), count=5)
+    vectors = _vectors(5)
+
+    store.upsert('items', [3], vectors[[0]], [{'n': 'replaced'}])
+    store.delete('items', [1, 5, 42])
+
+    assert store.count('items') == 3
+    assert store.retrieve('items', [1, 2, 3, 4, 5]) == [(2, {'n': 2}), (3, {'n': 'replaced'}), (4, {'n': 4})]
+    assert store.payload_values('items', 'n') == {2: 2, 3: 'replaced', 4: 4}
+    # Point 3 now carries the first vector, so it is its own best match
+    best_score, best_payload = store.search_batch('items', vectors[[0]], limit=1)[0][0]
+    assert best_payload == {'n': 'replaced'}
+    assert best_score == pytest.approx(1.0, abs=1e-5)
+
+
+def test_numpy_store_reloads_flushed_collections(tmp_path):
+    path = str(tmp_path / 'index')
+    first = _filled(NumpyVectorStore(path), count=50)
+    first.delete('items', [10])
+    first.flush()
+    expected = first.search_batch('items', _vectors(3, seed=2), limit=4)
+
+    second = NumpyVectorStore(path)
+    second.ensure_collection('items', DIMENSION)
+    assert second.count('items') == 49
+    assert second.search_batch('items', _vectors(3, seed=2), limit=4) == expected
+
+    # The memory-mapped matrix becomes writable on the first change
+    second.upsert('items', [100], _vectors(1, seed=4), [{'n': 100}])
+    assert second.count('items') == 50
+
+
+def test_locked_qdrant_index_falls_back_to_memory(tmp_path):
+    path = str(tmp_path / 'index')
+    first = create_vector_store('qdrant', path)
+    try:
+        # A second worker cannot open the directory the first one holds
+        second = create_vector_store('qdrant', path)
+        assert isinstance(second, NumpyVectorStore)
+        assert second.path is None
+    finally:
+        first.close()
+
+
+def test_create_vector_store_rejects_unknown_kind():
+    with pytest.raises(ValueError):
+        create_vector_store('faiss', ':memory:')
+
+
+def test_numpy_store_switches_generations_atomically(tmp_path, monkeypatch):
+    path = str(tmp_path / 'index')
+    first = _filled(NumpyVectorStore(path), count=20)
+    first.flush()
+    first.flush()  # nothing changed, nothing written
+    first.upsert('items', [5], _vectors(1, seed=7), [{'n': 'new'}])
+    first.flush()
+    assert sorted(os.listdir(path)) == ['items.2.ids.npy', 'items.2.payloads.json', 'items.2.vectors.npy',
+                                        'items.manifest.json']
+
+    # A crash before the manifest is replaced leaves the last complete generation
+    first.upsert('items', [5], _vectors(1, seed=8), [{'n': 'lost'}])
+    def crash(*args):
+        raise OSError("crash")
+
+    with monkeypatch.context() as patched:
+        patched.setattr(os, 'replace', crash)
+        with pytest.raises(OSError):
+            first.flush()
+
+    second = NumpyVectorStore(path)
+    second.ensure_collection('items', DIMENSION)
+    assert second.count('items') == 20
+    assert second.retrieve('items', [5]) == [(5, {'n': 'new'})]
+    second.upsert('items', [21], _vectors(1, seed=9), [{'n': 21}])
+    second.flush()
+    assert sorted(name for name in os.listdir(path) if name.endswith('.npy')) == ['items.3.ids.npy',
+                                                                                 'items.3.vectors.npy']
@@ -0,0 +1,125 @@
+"""
+Tests for /statistics/weekday-distribution, aggregated in SQL by
+StatisticsQueryService.weekday_distribution.
+
+Uses the in-memory SQLite DB from conftest.py — never touches production data.
+"""
+import random
+import statistics
+from datetime import date, timedelta
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.main import app
+from app.database import get_db
+from app.models.transaction import Transaction, TransactionType
+from app.services.statistics_query_service import StatisticsQueryService
+
+client = TestClient(app)
+
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+
+@pytest.fixture
+def db():
+    session = next(app.dependency_overrides[get_db]())
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@pytest.fixture
+def seeded(db):
+    rng = random.Random(5)
+    rows = []
+    for i in range(600):
+        kind = rng.choice([TransactionType.EXPENSE, TransactionType.EXPENSE, TransactionType.INCOME,
+                           TransactionType.TRANSFER])
+        day = date(2023, 1, 1) + timedelta(days=rng.randrange(400))
+        amount = round(rng.uniform(1, 500), 2) * (-1 if kind == TransactionType.EXPENSE else 1)
+        db.add(Transaction(account_number='BE1', transaction_date=day, amount=amount, currency='EUR',
+                           description=f'Payment {i}', source_bank='ING', transaction_type=kind))
+        rows.append((day, amount, kind))
+    db.commit()
+    return rows
+
+
+def _expected(rows, transaction_type=None, start=None, end=None):
+    """The original in-Python computation of the endpoint."""
+    groups = {}
+    for day, amount, kind in rows:
+        if transaction_type and kind != transaction_type:
+            continue
+        if (start and day < start) or (end and day > end):
+            continue
+        key = (WEEKDAYS[day.weekday()], 'expense' if kind == TransactionType.EXPENSE else 'income')
+        groups.setdefault(key, []).append(abs(amount))
+    return {
+        key: {
+            'count': len(amounts),
+            'total': round(sum(amounts), 2),
+            'average': round(sum(amounts) / len(amounts), 2),
+            'median': round(statistics.median(amounts), 2),
+            'min': round(min(amounts), 2),
+            'max': round(max(amounts), 2),
+        }
+        for key, amounts in groups.items()
+    }
+
+
+def _assert_matches(body, expected):
+    assert body['transaction_count'] == sum(group['count'] for group in expected.values())
+    for day in WEEKDAYS:
+        for kind in ('expense', 'income'):
+            group = body['weekdays'][day][kind]
+            want = expected.get((day, kind))
+            if want is None:
+                assert group['count'] == 0
+            else:
+                assert group == pytest.approx(want, abs=0.011), (day, kind)
+
+
+def test_distribution_matches_per_row_computation(seeded):
+    resp = client.get('/statistics/weekday-distribution')
+    assert resp.status_code == 200
+    _assert_matches(resp.json(), _expected(seeded))
+
+
+@pytest.mark.parametrize('params, filters', [
+    ({'transaction_type': 'Expense'}, {'transaction_type': TransactionType.EXPENSE}),
+    ({'start_date': '2023-03-01', 'end_date': '2023-05-31'}, {'start': date(2023, 3, 1), 'end': date(2023, 5, 31)}),
+    ({'transaction_type': 'Income', 'end_date': '2023-06-30'},
+     {'transaction_type': TransactionType.INCOME, 'end': date(2023, 6, 30)}),
+])
+def test_distribution_filters(seeded, params, filters):
+    resp = client.get('/statistics/weekday-distribution', params=params)
+    assert resp.status_code == 200
+    _assert_matches(resp.json(), _expected(seeded, **filters))
+
+
+def test_medians_of_odd_and_even_groups(db):
+    # 2024-01-01 is a Monday, 2024-01-02 a Tuesday
+    for day, amounts in [(date(2024, 1, 1), [-10, -30, -20]), (date(2024, 1, 2), [-40, -10, -30, -20])]:
+        for amount in amounts:
+            db.add(Transaction(account_number='BE1', transaction_date=day, amount=amount, currency='EUR',
+                               description='Shop', source_bank='ING', transaction_type=TransactionType.EXPENSE))
+    db.commit()
+    weekdays = client.get('/statistics/weekday-distribution').json()['weekdays']
+    assert weekdays['Monday']['expense']['median'] == 20
+    assert weekdays['Tuesday']['expense']['median'] == 25
+    assert weekdays['Tuesday']['expense']['min'] == 10
+    assert weekdays['Tuesday']['expense']['max'] == 40
+
+
+def test_service_returns_one_row_per_weekday_and_kind(db, seeded):
+    groups = StatisticsQueryService.weekday_distribution(db)
+    assert len(groups) <= 14
+    assert sum(group['count'] for group in groups) == len(seeded)
+
+
+def test_empty_and_invalid_requests(seeded):
+    body = client.get('/statistics/weekday-distribution', params={'start_date': '2030-01-01'}).json()
+    assert body['weekdays'] == []
+    assert client.get('/statistics/weekday-distribution', params={'start_date': '01/01/2023'}).status_code == 400